@@ -0,0 +1,101 @@
+"""
+Compare the example flood-fill client with the incremental flood-fill.
+
+An exploration run is recorded with the incremental flood-fill on a random
+maze (or on the maze file given as argument) and then both implementations
+update their distances after each discovered cell, as a client would do.
+"""
+import sys
+import time
+
+import numpy
+from client_floodfill import FloodFill as ExampleFloodFill
+from common import DIRECTIONS
+
+from mmsim.floodfill import FloodFill
+from mmsim.generator import generate_maze
+from mmsim.mazes import EAST_BIT
+from mmsim.mazes import NORTH_BIT
+from mmsim.mazes import SOUTH_BIT
+from mmsim.mazes import WEST_BIT
+from mmsim.mazes import load_maze
+from mmsim.solvers import DIRECTION_BITS
+from mmsim.solvers import DIRECTION_DELTAS
+from mmsim.solvers import goal_cells
+
+DIRECTION_NAMES = dict(
+    zip(DIRECTIONS, (NORTH_BIT, EAST_BIT, SOUTH_BIT, WEST_BIT))
+)
+WALL_BITS = EAST_BIT | SOUTH_BIT | WEST_BIT | NORTH_BIT
+
+
+def explore(maze):
+    """
+    Record the cells visited by a mouse exploring until reaching the goal.
+    """
+    floodfill = FloodFill(len(maze))
+    x, y = 0, 0
+    cells = []
+    while floodfill.distances[x, y]:
+        cells.append((x, y))
+        floodfill.add_walls(x, y, maze[x, y] & WALL_BITS)
+        floodfill.update()
+        steps = [
+            (x + dx, y + dy)
+            for (dx, dy), bit in zip(DIRECTION_DELTAS, DIRECTION_BITS)
+            if not floodfill.walls[x, y] & bit
+        ]
+        x, y = min(steps, key=lambda cell: floodfill.distances[cell])
+    return cells
+
+
+def run_example(maze, cells):
+    example = ExampleFloodFill(len(maze), goals=goal_cells(maze.shape))
+    start = time.perf_counter()
+    for cell in cells:
+        example.position = cell
+        example._build_walls(
+            {
+                name: int(bool(maze[cell] & bit))
+                for name, bit in DIRECTION_NAMES.items()
+            }
+        )
+        example.calculate_distances()
+    return time.perf_counter() - start, numpy.array(example.distances)
+
+
+def run_incremental(maze, cells):
+    floodfill = FloodFill(len(maze))
+    start = time.perf_counter()
+    for x, y in cells:
+        floodfill.add_walls(x, y, maze[x, y] & WALL_BITS)
+        floodfill.update()
+    return time.perf_counter() - start, floodfill.distances.copy()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as fd:
+            maze = load_maze(fd)
+    else:
+        maze = generate_maze(16, random=numpy.random.RandomState(0))
+    cells = explore(maze)
+    example_time, example_distances = run_example(maze, cells)
+    incremental_time, incremental_distances = run_incremental(maze, cells)
+    reachable = numpy.isfinite(example_distances)
+    assert (
+        example_distances[reachable] == incremental_distances[reachable]
+    ).all()
+    print('{} steps'.format(len(cells)))
+    for name, elapsed in (
+        ('example', example_time),
+        ('incremental', incremental_time),
+    ):
+        print(
+            '{:>12}: {:8.3f} ms per step'.format(
+                name, elapsed / len(cells) * 1000
+            )
+        )
+    print(
+        '{:>12}: {:8.1f}x'.format('speedup', example_time / incremental_time)
+    )
@@ -44,5 +44,6 @@ class FloodFill(Simulator):
         return allowed[best]
 
 
-simulator = FloodFill(16, goals=[(7, 7), (7, 8), (8, 7), (8, 8)])
-simulator.run()
+if __name__ == '__main__':
+    simulator = FloodFill(16, goals=[(7, 7), (7, 8), (8, 7), (8, 8)])
+    simulator.run()
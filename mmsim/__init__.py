@@ -1 +1,3 @@
 __version__ = '0.1.7'
+
+from .session import Session  # noqa: E402,F401
@@ -0,0 +1,277 @@
+"""
+Vectorized analytics over a whole exploration run.
+
+All functions take the structured states array from `History.states` (or
+any slice of it) and compute their results in a single pass over the run.
+"""
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+import numpy
+
+from .mazes import MAZE_SIZE
+from .mazes import VISITED_BIT
+from .solvers import Cell
+from .solvers import goal_cells
+
+
+def _flat_positions(states: numpy.ndarray) -> numpy.ndarray:
+    return states['x'].astype('int64') * MAZE_SIZE + states['y']
+
+
+def discovered_cells(states: numpy.ndarray) -> numpy.ndarray:
+    """
+    Number of cells marked as visited by the mouse at each step.
+
+    Returns
+    -------
+        An array with the count for each state.
+    """
+    visited = (states['walls'] & VISITED_BIT) > 0
+    return visited.reshape(len(states), -1).sum(axis=1)
+
+
+def visit_counts(states: numpy.ndarray) -> numpy.ndarray:
+    """
+    Number of states in which the mouse was at each cell.
+
+    Returns
+    -------
+        An array with the counts, indexed as `[x][y]`.
+    """
+    counts = numpy.bincount(
+        _flat_positions(states), minlength=MAZE_SIZE * MAZE_SIZE
+    )
+    return counts.reshape(MAZE_SIZE, MAZE_SIZE)
+
+
+def revisits(states: numpy.ndarray) -> numpy.ndarray:
+    """
+    Whether the mouse moved into an already visited cell at each step.
+
+    Returns
+    -------
+        A boolean array for each state. Steps with no change of cell (i.e.:
+        turning in place) are not considered revisits.
+    """
+    positions = _flat_positions(states)
+    first = numpy.full(MAZE_SIZE * MAZE_SIZE, len(states))
+    _, indexes = numpy.unique(positions, return_index=True)
+    first[positions[indexes]] = indexes
+    moved = numpy.ones(len(states), dtype='bool')
+    moved[1:] = positions[1:] != positions[:-1]
+    return moved & (first[positions] < numpy.arange(len(states)))
+
+
+def backtracking_ratio(states: numpy.ndarray) -> float:
+    """
+    Ratio of moves into already visited cells.
+
+    Returns
+    -------
+        The ratio, from 0 to 1, or 0 if the mouse never moved.
+    """
+    positions = _flat_positions(states)
+    moves = (positions[1:] != positions[:-1]).sum()
+    if not moves:
+        return 0.0
+    return float(revisits(states).sum() / moves)
+
+
+def time_to_goal(
+    states: numpy.ndarray, goals: Optional[Iterable[Cell]] = None
+) -> int:
+    """
+    Index of the first state in which the mouse reached the goal.
+
+    Parameters
+    ----------
+    states
+        The states array.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+
+    Returns
+    -------
+        The state index, or -1 if the goal was never reached.
+    """
+    if goals is None:
+        goals = goal_cells((MAZE_SIZE, MAZE_SIZE))
+    goal = numpy.zeros((MAZE_SIZE, MAZE_SIZE), dtype='bool')
+    for x, y in goals:
+        goal[x, y] = True
+    reached = numpy.flatnonzero(goal[states['x'], states['y']])
+    return int(reached[0]) if len(reached) else -1
+
+
+def summary(
+    states: numpy.ndarray, goals: Optional[Iterable[Cell]] = None
+) -> Dict[str, float]:
+    """
+    Summarize an exploration run.
+
+    Parameters
+    ----------
+    states
+        The states array.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+
+    Returns
+    -------
+        A dictionary with the number of `steps`, the number of `discovered`
+        cells at the end of the run, the number of distinct `visited` cells,
+        the number of `revisits`, the `backtracking` ratio and the
+        `time_to_goal`.
+    """
+    if not len(states):
+        return {
+            'steps': 0,
+            'discovered': 0,
+            'visited': 0,
+            'revisits': 0,
+            'backtracking': 0.0,
+            'time_to_goal': -1,
+        }
+    return {
+        'steps': len(states),
+        'discovered': int(discovered_cells(states[-1:])[0]),
+        'visited': int((visit_counts(states) > 0).sum()),
+        'revisits': int(revisits(states).sum()),
+        'backtracking': backtracking_ratio(states),
+        'time_to_goal': time_to_goal(states, goals),
+    }
+
+
+def think_time_percentiles(states: numpy.ndarray) -> Dict[str, float]:
+    """
+    Percentiles of the client think time before each state.
+
+    Returns
+    -------
+        A dictionary with the `count` of states with a known think time and
+        the `p50`, `p95`, `p99` and `max` think times, in seconds (NaN if
+        there are no known think times).
+    """
+    think_times = states['think_time']
+    think_times = think_times[numpy.isfinite(think_times)]
+    result = {'count': len(think_times)}
+    for q in (50, 95, 99, 100):
+        key = 'max' if q == 100 else 'p{}'.format(q)
+        result[key] = numpy.nan
+        if len(think_times):
+            result[key] = float(numpy.percentile(think_times, q))
+    return result
+
+
+def _heading_changes(
+    states: numpy.ndarray, start: int, stop: int
+) -> numpy.ndarray:
+    """
+    Whether the mouse heading changed at each state of a range of states.
+    """
+    directions = states['direction'][:stop]
+    previous = directions[max(start - 1, 0)]
+    directions = directions[start:]
+    return directions != numpy.append(previous, directions[:-1])
+
+
+class VisitHeatmap:
+    """
+    Per-cell visit and heading change counts, up to any state of a run.
+
+    The cell and whether the heading changed are stored for every state as
+    they are added (3 bytes per state), along with cumulative count
+    snapshots every `interval` states. Counts up to any state are rebuilt
+    from the closest previous snapshot, adding at most `interval` states.
+
+    Parameters
+    ----------
+    interval
+        Number of states between snapshots.
+    """
+
+    def __init__(self, interval: int = 256):
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all the states.
+        """
+        cells = MAZE_SIZE * MAZE_SIZE
+        self.cells = numpy.zeros(self.interval, dtype='uint16')
+        self.changed = numpy.zeros(self.interval, dtype='bool')
+        zeros = numpy.zeros(cells, dtype='uint32')
+        self.snapshots = [(zeros, zeros)]
+        self.size = 0
+
+    def _reserve(self, size: int):
+        if size <= len(self.cells):
+            return
+        capacity = max(size, 2 * len(self.cells))
+        for name in ('cells', 'changed'):
+            array = numpy.zeros(capacity, dtype=getattr(self, name).dtype)
+            array[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, array)
+
+    def _counts(self, start: int, stop: int):
+        """
+        Count visits and heading changes per cell for a range of states.
+        """
+        cells = self.cells[start:stop]
+        visits = numpy.bincount(cells, minlength=MAZE_SIZE * MAZE_SIZE)
+        turns = numpy.bincount(
+            cells,
+            weights=self.changed[start:stop],
+            minlength=MAZE_SIZE * MAZE_SIZE,
+        )
+        return visits.astype('uint32'), turns.astype('uint32')
+
+    def update(self, states: numpy.ndarray):
+        """
+        Add the new states of a run.
+
+        Parameters
+        ----------
+        states
+            The states array of the run. States already added are skipped.
+        """
+        start, stop = self.size, len(states)
+        if stop <= start:
+            return
+        self._reserve(stop)
+        self.cells[start:stop] = _flat_positions(states[start:stop])
+        self.changed[start:stop] = _heading_changes(states, start, stop)
+        self.size = stop
+        while len(self.snapshots) * self.interval <= stop:
+            end = len(self.snapshots) * self.interval
+            visits, turns = self._counts(end - self.interval, end)
+            last_visits, last_turns = self.snapshots[-1]
+            self.snapshots.append((last_visits + visits, last_turns + turns))
+
+    def at(self, index: int):
+        """
+        Get the counts up to a state.
+
+        Parameters
+        ----------
+        index
+            The last state index to take into account, already added with
+            `update()`.
+
+        Returns
+        -------
+            The visit and heading change counts, indexed as `[x][y]`.
+        """
+        snapshot = (index + 1) // self.interval
+        visits, turns = self.snapshots[snapshot]
+        more_visits, more_turns = self._counts(
+            snapshot * self.interval, index + 1
+        )
+        shape = (MAZE_SIZE, MAZE_SIZE)
+        return (
+            (visits + more_visits).reshape(shape),
+            (turns + more_turns).reshape(shape),
+        )
@@ -0,0 +1,63 @@
+"""
+Thread-safe least recently used cache.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Hashable
+
+
+class LRUCache:
+    """
+    Mapping that keeps, at most, the `maxsize` most recently used items.
+
+    All operations are thread-safe, so items can be put from a background
+    thread (i.e.: when prefetching) and read from another one.
+
+    Parameters
+    ----------
+    maxsize
+        Maximum number of items to keep.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        if maxsize < 1:
+            raise ValueError('Cache size must be at least 1!')
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            return key in self.items
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get an item, marking it as the most recently used.
+        """
+        with self.lock:
+            if key not in self.items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Add an item, evicting the least recently used one if full.
+        """
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            if len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
@@ -0,0 +1,480 @@
+"""
+Python client library to communicate with the simulation server.
+"""
+import struct
+from typing import Optional
+from typing import Tuple
+
+import numpy
+import zmq
+
+from .mazes import MAZE_SIZE
+from .shared import SharedStatesWriter
+from .states import CELLS
+from .states import DELTA_DTYPE
+from .states import DELTA_HEADER_SIZE
+from .states import POSITION_SIZE
+
+DEFAULT_ENDPOINT = 'tcp://127.0.0.1:6574'
+DEFAULT_PIPELINED_ENDPOINT = 'tcp://127.0.0.1:6575'
+DEFAULT_STREAM_ENDPOINT = 'tcp://127.0.0.1:6576'
+
+DISTANCES_OFFSET = 5
+WALLS_OFFSET = DISTANCES_OFFSET + CELLS + 1
+STATE_SIZE = WALLS_OFFSET + CELLS
+
+
+def direction_byte(direction: str) -> int:
+    """
+    Convert a direction into its protocol byte.
+
+    Parameters
+    ----------
+    direction
+        Either the direction name (i.e.: `'north'`) or its initial.
+
+    Returns
+    -------
+        The protocol byte for the direction (i.e.: `ord('N')`).
+    """
+    return ord(direction[0].upper())
+
+
+class StateBuffer:
+    """
+    Preallocated exploration state request.
+
+    The buffer is allocated once and reused for every state, exposing the
+    distances and walls sections as NumPy views indexed as `[x][y]`, so they
+    can be written in place and sent with no intermediate copies.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray(STATE_SIZE)
+        self.buffer[0] = ord('S')
+        self.buffer[DISTANCES_OFFSET - 1] = ord('F')
+        self.buffer[WALLS_OFFSET - 1] = ord('F')
+        self.distances = numpy.frombuffer(
+            self.buffer, dtype='uint8', count=CELLS, offset=DISTANCES_OFFSET
+        ).reshape(MAZE_SIZE, MAZE_SIZE)
+        self.walls = numpy.frombuffer(
+            self.buffer, dtype='uint8', count=CELLS, offset=WALLS_OFFSET
+        ).reshape(MAZE_SIZE, MAZE_SIZE)
+
+    def set_position(self, x: int, y: int, direction: str):
+        """
+        Set the mouse position and orientation.
+        """
+        self.buffer[1] = x
+        self.buffer[2] = y
+        self.buffer[3] = direction_byte(direction)
+
+    def encode(
+        self, x: int, y: int, direction: str, distances=None, walls=None
+    ) -> bytearray:
+        """
+        Encode a full exploration state into the buffer.
+
+        Parameters
+        ----------
+        x
+            Mouse x-position.
+        y
+            Mouse y-position.
+        direction
+            Mouse orientation.
+        distances
+            Cell distances indexed as `[x][y]`. Any array-like or bytes-like
+            object is accepted. If `None`, the current buffer values are
+            kept (i.e.: if they were already written in `self.distances`).
+        walls
+            Cell walls bitmask indexed as `[x][y]`, with the same rules as
+            for `distances`.
+
+        Returns
+        -------
+            The encoded state request buffer.
+        """
+        self.set_position(x, y, direction)
+        if distances is not None:
+            _copy_cells(self.distances, distances)
+        if walls is not None:
+            _copy_cells(self.walls, walls)
+        return self.buffer
+
+
+class DeltaBuffer:
+    """
+    Preallocated delta state request.
+
+    Delta states carry only the cells that changed since the previous state.
+    They are encoded into a buffer large enough to hold the changes for all
+    the cells, which is allocated once and reused for every delta.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray(1 + DELTA_HEADER_SIZE + CELLS * 4)
+        self.buffer[0] = ord('D')
+        self.changes = numpy.frombuffer(
+            self.buffer,
+            dtype=DELTA_DTYPE,
+            count=CELLS,
+            offset=1 + DELTA_HEADER_SIZE,
+        )
+
+    def encode(
+        self,
+        position: bytes,
+        cells: numpy.ndarray,
+        distances: numpy.ndarray,
+        walls: numpy.ndarray,
+    ) -> memoryview:
+        """
+        Encode a delta state into the buffer.
+
+        Parameters
+        ----------
+        position
+            The position bytes (x-position, y-position and orientation).
+        cells
+            Flat indexes of the changed cells.
+        distances
+            Flat cell distances.
+        walls
+            Flat cell walls.
+
+        Returns
+        -------
+            The encoded delta state request.
+        """
+        count = len(cells)
+        header = 1 + POSITION_SIZE
+        self.buffer[1:header] = position
+        struct.pack_into('<H', self.buffer, header, count)
+        changes = self.changes[:count]
+        changes['cell'] = cells
+        changes['distance'] = distances[cells]
+        changes['walls'] = walls[cells]
+        size = 1 + DELTA_HEADER_SIZE + count * DELTA_DTYPE.itemsize
+        return memoryview(self.buffer)[:size]
+
+
+def _copy_cells(destination: numpy.ndarray, source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = numpy.frombuffer(source, dtype='uint8')
+    source = numpy.asarray(source)
+    if source.dtype != destination.dtype:
+        source = source.clip(0, 255)
+    destination[...] = source.reshape(destination.shape)
+
+
+class Client:
+    """
+    Client to communicate with the simulation server.
+
+    Parameters
+    ----------
+    endpoint
+        Server endpoint to connect to.
+    context
+        ZeroMQ context to use. The global instance is used if not provided.
+    stream
+        Server stream endpoint to push states to, with no acknowledgement.
+        If `None`, states are sent as regular requests.
+    hwm
+        Maximum number of streamed states queued before sending blocks.
+    resync
+        If set, states are sent as deltas with respect to the previous
+        state, with a full state sent every `resync` states. Full states are
+        sent too when a delta would not be smaller.
+    """
+
+    socket_type = zmq.REQ
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_ENDPOINT,
+        context=None,
+        stream: Optional[str] = None,
+        hwm: int = 100,
+        resync: Optional[int] = None,
+    ):
+        self.context = context or zmq.Context.instance()
+        self.socket = self.context.socket(self.socket_type)
+        self.socket.connect(endpoint)
+        self.stream = None
+        if stream is not None:
+            self.stream = self.context.socket(zmq.PUSH)
+            self.stream.setsockopt(zmq.SNDHWM, hwm)
+            self.stream.connect(stream)
+        self.state = StateBuffer()
+        self.position = bytearray(b'W\x00\x00N')
+        self.resync = resync
+        self.delta = DeltaBuffer()
+        self.previous = StateBuffer()
+        self.states_sent = 0
+        self.shared = None
+
+    def close(self):
+        self.socket.close(linger=0)
+        if self.stream is not None:
+            self.stream.close()
+        if self.shared is not None:
+            self.shared.close()
+
+    def share(self, fname, slots: int = 1024) -> bytes:
+        """
+        Send the states distances and walls through a shared states file.
+
+        Only for clients running on the same host as the server. See
+        `mmsim.shared` for details.
+
+        Parameters
+        ----------
+        fname
+            Path of the shared states file to create.
+        slots
+            Number of slots in the file, which must be greater than the
+            number of states that may be in flight (i.e.: not yet processed
+            by the server) at any time.
+
+        Returns
+        -------
+            The server reply, `ok` if the file was registered.
+        """
+        self.shared = SharedStatesWriter(fname, slots=slots)
+        return self.request(self.shared.register_request())
+
+    def request(self, message) -> bytes:
+        self.socket.send(message, copy=False)
+        return self.socket.recv()
+
+    def ping(self) -> bytes:
+        return self.request(b'ping')
+
+    def reset(self) -> bytes:
+        self.previous.encode(0, 0, 'N', bytes(CELLS), bytes(CELLS))
+        self.states_sent = 0
+        return self.request(b'reset')
+
+    def read_walls(
+        self, x: int, y: int, direction: str
+    ) -> Tuple[int, int, int]:
+        """
+        Read the walls at the given position.
+
+        Returns
+        -------
+            Whether there is a wall to the left, to the front and to the
+            right of the mouse.
+        """
+        self.position[1] = x
+        self.position[2] = y
+        self.position[3] = direction_byte(direction)
+        return struct.unpack('3B', self.request(self.position))
+
+    def send_state(
+        self, x: int, y: int, direction: str, distances=None, walls=None
+    ) -> bytes:
+        """
+        Send the exploration state to the server.
+
+        See `StateBuffer.encode()` for details on the accepted parameters.
+
+        Returns
+        -------
+            The server reply, or `None` if the state was streamed.
+        """
+        state = self.encode_state(x, y, direction, distances, walls)
+        if self.stream is not None:
+            return self.push(state)
+        return self.request(state)
+
+    def encode_state(
+        self, x: int, y: int, direction: str, distances=None, walls=None
+    ):
+        """
+        Encode the exploration state, as a delta state if possible.
+
+        See `StateBuffer.encode()` for details on the accepted parameters.
+
+        Returns
+        -------
+            The encoded state or delta state request.
+        """
+        if self.shared is not None:
+            return self.shared.encode(x, y, direction, distances, walls)
+        state = self.state.encode(x, y, direction, distances, walls)
+        if self.resync is None:
+            return state
+        distances = self.state.distances.reshape(-1)
+        walls = self.state.walls.reshape(-1)
+        cells = numpy.flatnonzero(
+            (distances != self.previous.distances.reshape(-1))
+            | (walls != self.previous.walls.reshape(-1))
+        )
+        full = self.states_sent % self.resync == 0
+        full |= DELTA_DTYPE.itemsize * len(cells) >= CELLS * 2
+        self.states_sent += 1
+        self.previous.buffer[:] = state
+        if full:
+            return state
+        return self.delta.encode(state[1:4], cells, distances, walls)
+
+    def push(self, message):
+        """
+        Push a message to the server stream endpoint.
+
+        Blocks only when the high-water mark is reached.
+        """
+        # Copy the message, as buffers are reused before it is sent
+        self.stream.send(message)
+
+    def goals(self) -> numpy.ndarray:
+        """
+        Get the goal cells of the current maze, as `(x, y)` rows.
+        """
+        reply = self.request(b'goals')
+        return numpy.frombuffer(reply, dtype='uint8').reshape(-1, 2)
+
+    def distances(self) -> Optional[numpy.ndarray]:
+        """
+        Get the optimal distances to the goal, indexed as `[x][y]`.
+
+        Returns
+        -------
+            The distances, or `None` if the server has no maze loaded.
+        """
+        reply = self.request(b'distances')
+        if not reply:
+            return None
+        distances = numpy.frombuffer(reply, dtype='uint8')
+        return distances.reshape(MAZE_SIZE, MAZE_SIZE)
+
+    def length(self) -> int:
+        """
+        Get the shortest path length from the start to the goal.
+        """
+        return struct.unpack('<H', self.request(b'length'))[0]
+
+    def path(self) -> numpy.ndarray:
+        """
+        Get the shortest path from the start to the goal, as `(x, y)` rows.
+        """
+        reply = self.request(b'path')
+        return numpy.frombuffer(reply, dtype='uint8').reshape(-1, 2)
+
+
+class PipelinedClient(Client):
+    """
+    Client that pipelines requests to the server ROUTER socket.
+
+    Every request is sent with a sequence number and replies are matched
+    asynchronously, so requests whose reply is not needed right away (i.e.:
+    exploration states) do not need to wait for a round trip.
+
+    Parameters
+    ----------
+    endpoint
+        Server pipelined endpoint to connect to.
+    context
+        ZeroMQ context to use. The global instance is used if not provided.
+    window
+        Maximum number of requests waiting for a reply.
+
+    Other keyword arguments are passed to `Client`.
+    """
+
+    socket_type = zmq.DEALER
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_PIPELINED_ENDPOINT,
+        context=None,
+        window: int = 64,
+        **kwargs
+    ):
+        super().__init__(endpoint=endpoint, context=context, **kwargs)
+        self.window = window
+        self.sequence = 0
+        self.pending = {}
+        self.replies = {}
+
+    def submit(self, message, keep: bool = True) -> int:
+        """
+        Send a request without waiting for its reply.
+
+        Parameters
+        ----------
+        message
+            The request to send.
+        keep
+            Whether to keep the reply to be retrieved with `wait()`. If
+            `False`, the reply is discarded when received.
+
+        Returns
+        -------
+            The request sequence number.
+        """
+        while len(self.pending) >= self.window:
+            self.receive()
+        sequence = self.sequence
+        self.sequence = (sequence + 1) & 0xFFFFFFFF
+        # Copy the message, as buffers are reused before the reply arrives
+        self.socket.send_multipart([struct.pack('<I', sequence), message])
+        self.pending[sequence] = keep
+        return sequence
+
+    def receive(self):
+        """
+        Receive a single reply and store it if it is to be kept.
+        """
+        sequence, reply = self.socket.recv_multipart()
+        sequence = struct.unpack('<I', sequence)[0]
+        if self.pending.pop(sequence):
+            self.replies[sequence] = reply
+
+    def wait(self, sequence: int) -> bytes:
+        """
+        Wait for the reply to a request.
+
+        Parameters
+        ----------
+        sequence
+            The request sequence number, as returned by `submit()`.
+
+        Returns
+        -------
+            The reply received from the server.
+        """
+        while sequence not in self.replies:
+            self.receive()
+        return self.replies.pop(sequence)
+
+    def flush(self):
+        """
+        Wait for the replies to all the submitted requests.
+        """
+        while self.pending:
+            self.receive()
+
+    def request(self, message) -> bytes:
+        return self.wait(self.submit(message))
+
+    def send_state(
+        self, x: int, y: int, direction: str, distances=None, walls=None
+    ) -> int:
+        """
+        Send the exploration state to the server, without waiting for the
+        reply.
+
+        See `StateBuffer.encode()` for details on the accepted parameters.
+
+        Returns
+        -------
+            The request sequence number, or `None` if the state was streamed.
+        """
+        state = self.encode_state(x, y, direction, distances, walls)
+        if self.stream is not None:
+            return self.push(state)
+        return self.submit(state, keep=False)
@@ -1,12 +1,63 @@
 from pathlib import Path
+from typing import Optional
 
 import click
+import numpy
 
+from .client import DEFAULT_ENDPOINT
+from .download import DEFAULT_SOURCES
+from .download import download_mazes
 from .download import download_micromouseonline_mazes
+from .features import INDEX_FILE
+from .features import build_features
+from .features import load_features
+from .features import query as query_features
+from .features import save_features
+from .generator import generate_mazes
+from .ingress import POLICIES
+from .loadgen import DEFAULT_MIX
+from .loadgen import latency_report
+from .loadgen import parse_mix
+from .loadgen import replay_messages
+from .loadgen import run_load
+from .loadgen import synthetic_messages
+from .mazes import save_maze
+from .symmetry import build_index
+from .symmetry import duplicates
+from .symmetry import save_index
 from .ui import run
 
 
-@click.command()
+class DefaultGroup(click.Group):
+    """
+    Command group that falls back to a default command when the first
+    argument is not a command name.
+    """
+
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands and args[0] != '--help':
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
+
+@click.group(
+    cls=DefaultGroup,
+    default_command='launch',
+    context_settings={'ignore_unknown_options': True},
+)
+def main():
+    """
+    Micromouse Maze Simulator.
+
+    Launches the simulator interface if no command is given.
+    """
+
+
+@main.command()
 @click.argument(
     'mazes_path', type=click.Path(), default=Path.home() / '.mmsim'
 )
@@ -24,11 +75,391 @@ from .ui import run
     default=6574,
     help='Listen on port (default: 6574).',
 )
-def launch(mazes_path: Path, host: str = '127.0.0.1', port: int = 6574):
+@click.option(
+    '-r',
+    '--router-port',
+    type=int,
+    default=6575,
+    help='Listen for pipelined requests on port (default: 6575).',
+)
+@click.option(
+    '-s',
+    '--stream-port',
+    type=int,
+    default=6576,
+    help='Listen for streamed states on port (default: 6576).',
+)
+@click.option(
+    '-q',
+    '--queue-size',
+    type=click.IntRange(min=1),
+    default=1000,
+    help='Maximum number of queued messages (default: 1000).',
+)
+@click.option(
+    '--overflow',
+    type=click.Choice(POLICIES),
+    default='coalesce',
+    help='Policy for streamed states when the queue is full '
+    '(default: coalesce).',
+)
+@click.option(
+    '--profile',
+    is_flag=True,
+    help='Profile the interface and write a report on exit.',
+)
+@click.option(
+    '--profile-output',
+    type=click.Path(dir_okay=False),
+    default='mmsim-profile',
+    help='Profile output files, with no suffix (default: mmsim-profile).',
+)
+def launch(
+    mazes_path: Path,
+    host: str = '127.0.0.1',
+    port: int = 6574,
+    router_port: int = 6575,
+    stream_port: int = 6576,
+    queue_size: int = 1000,
+    overflow: str = 'coalesce',
+    profile: bool = False,
+    profile_output: str = 'mmsim-profile',
+):
     """
     Launch the Micromouse Maze Simulator interface.
+
+    With --profile, the GUI and listener threads call stacks are sampled and
+    the event-loop lag and memory growth are tracked. On exit, a report is
+    written to PROFILE_OUTPUT.txt and the folded stacks, which can be loaded
+    by flamegraph tools, to PROFILE_OUTPUT.folded.
     """
     mazes_path = Path(mazes_path)
     if not mazes_path.exists():
         download_micromouseonline_mazes(mazes_path)
-    run(host, port, Path(mazes_path))
+    run(
+        host,
+        port,
+        Path(mazes_path),
+        router_port=router_port,
+        stream_port=stream_port,
+        profile=Path(profile_output) if profile else None,
+        queue_size=queue_size,
+        overflow=overflow,
+    )
+
+
+@main.command()
+@click.argument(
+    'mazes_path', type=click.Path(), default=Path.home() / '.mmsim'
+)
+@click.option(
+    '-s',
+    '--source',
+    'sources',
+    multiple=True,
+    help=(
+        'Archive URL, local archive or local directory, optionally followed '
+        'by #sha256=DIGEST. May be repeated (default: micromouseonline).'
+    ),
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of sources fetched at the same time (default: all).',
+)
+@click.option(
+    '-t',
+    '--timeout',
+    type=click.FloatRange(min=0),
+    default=60.0,
+    help='Maximum time to wait for each server, in seconds (default: 60).',
+)
+def download(
+    mazes_path: str,
+    sources=(),
+    jobs: Optional[int] = None,
+    timeout: float = 60.0,
+):
+    """
+    Fetch maze files from several sources into a collection.
+
+    Interrupted downloads are resumed when the command is run again. Maze
+    files are stored once in MAZES_PATH/.store, no matter how many sources
+    provide them.
+    """
+    try:
+        manifest = download_mazes(
+            Path(mazes_path),
+            sources or DEFAULT_SOURCES,
+            jobs=jobs,
+            timeout=timeout,
+        )
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    click.echo(
+        '{} mazes, {} unique'.format(
+            len(manifest), len(set(manifest.values()))
+        )
+    )
+
+
+@main.command()
+@click.argument('output', type=click.Path())
+@click.option(
+    '-n',
+    '--count',
+    type=click.IntRange(min=1),
+    default=1000,
+    help='Number of mazes to generate (default: 1000).',
+)
+@click.option(
+    '-s',
+    '--size',
+    type=click.IntRange(min=4, max=255),
+    default=16,
+    help='Cells on each side of the mazes (default: 16).',
+)
+@click.option(
+    '-l',
+    '--loops',
+    type=click.FloatRange(min=0),
+    default=0.05,
+    help='Extra walls removed, relative to the cells (default: 0.05).',
+)
+@click.option(
+    '-f',
+    '--format',
+    'output_format',
+    type=click.Choice(['text', 'npy']),
+    default='text',
+    help='Text files in a directory or a packed .npy file (default: text).',
+)
+@click.option('--seed', type=int, default=None, help='Random seed.')
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of processes (default: number of CPUs).',
+)
+def generate(
+    output: str,
+    count: int = 1000,
+    size: int = 16,
+    loops: float = 0.05,
+    output_format: str = 'text',
+    seed: Optional[int] = None,
+    jobs: Optional[int] = None,
+):
+    """
+    Generate random mazes following the competition rules.
+
+    Text mazes are written as numbered files in the OUTPUT directory, which
+    can be loaded by the simulator. Packed mazes are written as a single
+    array with shape (count, size, size) in the OUTPUT file.
+    """
+    mazes = generate_mazes(count, size, loops=loops, seed=seed, jobs=jobs)
+    output = Path(output)
+    if output_format == 'npy':
+        numpy.save(str(output), mazes)
+        return
+    output.mkdir(parents=True, exist_ok=True)
+    digits = len(str(count - 1))
+    for i, maze in enumerate(mazes):
+        save_maze(maze, output / 'generated-{:0{}}.txt'.format(i, digits))
+
+
+@main.command()
+@click.argument(
+    'mazes_path',
+    type=click.Path(exists=True, file_okay=False),
+    default=Path.home() / '.mmsim',
+)
+@click.option(
+    '-i',
+    '--index',
+    'index_path',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='Index file to write (default: MAZES_PATH/index.json).',
+)
+@click.option(
+    '--delete',
+    is_flag=True,
+    help='Delete duplicated maze files, keeping the first of each group.',
+)
+def dedupe(
+    mazes_path: str, index_path: Optional[str] = None, delete: bool = False
+):
+    """
+    Find equivalent mazes, including rotated and reflected versions.
+
+    Each group of equivalent maze files is listed in a line. An index mapping
+    the symmetry-canonical hash of each maze to its files is written too.
+    """
+    mazes_path = Path(mazes_path)
+    index = build_index(mazes_path)
+    total = sum(len(names) for names in index.values())
+    for group in duplicates(index):
+        click.echo(' '.join(group))
+        if delete:
+            for name in group[1:]:
+                (mazes_path / name).unlink()
+            del group[1:]
+    index_path = Path(index_path or mazes_path / 'index.json')
+    save_index(index, index_path)
+    click.echo('{} mazes, {} unique'.format(total, len(index)))
+
+
+@main.command()
+@click.argument(
+    'mazes_path',
+    type=click.Path(exists=True, file_okay=False),
+    default=Path.home() / '.mmsim',
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of processes (default: number of CPUs).',
+)
+def index(mazes_path: str, jobs: Optional[int] = None):
+    """
+    Precompute the features index of a maze collection.
+
+    The index is written in the collection path and is used by the query
+    command and by the simulator interface search box.
+    """
+    mazes_path = Path(mazes_path)
+    features = build_features(mazes_path, jobs=jobs)
+    save_features(features, mazes_path / INDEX_FILE)
+    click.echo('{} mazes indexed'.format(len(features['name'])))
+
+
+@main.command()
+@click.argument('predicates', nargs=-1, required=True)
+@click.option(
+    '-m',
+    '--mazes-path',
+    type=click.Path(exists=True, file_okay=False),
+    default=Path.home() / '.mmsim',
+    help='Maze collection path (default: ~/.mmsim).',
+)
+def query(predicates, mazes_path: str):
+    """
+    List the mazes matching all the given PREDICATES.
+
+    Predicates compare a feature with a value, as in "path_len>80" or
+    "competition=apec". Features are read from the collection index, which
+    must have been built with the index command.
+    """
+    features = load_features(Path(mazes_path) / INDEX_FILE)
+    try:
+        mask = query_features(features, ' '.join(predicates))
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint='PREDICATES')
+    for name in features['name'][mask]:
+        click.echo(name)
+
+
+@main.command()
+@click.option(
+    '-e',
+    '--endpoint',
+    type=str,
+    default=DEFAULT_ENDPOINT,
+    help='Server endpoint (default: {}).'.format(DEFAULT_ENDPOINT),
+)
+@click.option(
+    '-c',
+    '--clients',
+    type=click.IntRange(min=1),
+    default=4,
+    help='Number of concurrent clients (default: 4).',
+)
+@click.option(
+    '-n',
+    '--count',
+    type=click.IntRange(min=1),
+    default=1000,
+    help='Number of messages per client (default: 1000).',
+)
+@click.option(
+    '-m',
+    '--mix',
+    type=str,
+    default=DEFAULT_MIX,
+    help='Message type weights (default: {}).'.format(DEFAULT_MIX),
+)
+@click.option(
+    '-r',
+    '--replay',
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help='Recorded run (.npy states array) to replay instead of the mix.',
+)
+@click.option('--seed', type=int, default=None, help='Random seed.')
+@click.option(
+    '-t',
+    '--timeout',
+    type=click.FloatRange(min=0),
+    default=5.0,
+    help='Maximum time to wait for each reply, in seconds (default: 5).',
+)
+def loadgen(
+    endpoint: str = DEFAULT_ENDPOINT,
+    clients: int = 4,
+    count: int = 1000,
+    mix: str = DEFAULT_MIX,
+    replay: Optional[str] = None,
+    seed: Optional[int] = None,
+    timeout: float = 5.0,
+):
+    """
+    Load a running simulator with concurrent synthetic clients.
+
+    Each client sends a random mix of ping, W (read walls), S (exploration
+    state) and reset requests or, with --replay, the requests of a recorded
+    run. Throughput and latency percentiles are reported per message type.
+    """
+    sequences = _load_sequences(clients, count, mix, replay, seed)
+    try:
+        result = run_load(endpoint, sequences, timeout=timeout)
+    except TimeoutError as error:
+        raise click.ClickException(str(error))
+    _echo_latency_report(latency_report(*result))
+
+
+def _load_sequences(clients, count, mix, replay, seed):
+    if replay is not None:
+        return [replay_messages(numpy.load(replay))] * clients
+    try:
+        weights = parse_mix(mix)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint='--mix')
+    random = numpy.random.RandomState(seed)
+    return [
+        synthetic_messages(count, weights, random=random)
+        for _ in range(clients)
+    ]
+
+
+def _echo_latency_report(rows):
+    click.echo(
+        '{:>6} {:>8} {:>10} {:>8} {:>8} {:>8} {:>8}'.format(
+            'type', 'count', 'msg/s', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'
+        )
+    )
+    for row in rows:
+        milliseconds = {
+            key: row[key] * 1000 for key in ('p50', 'p95', 'p99', 'max')
+        }
+        click.echo(
+            '{type:>6} {count:>8} {throughput:>10.0f} {p50:>8.3f} '
+            '{p95:>8.3f} {p99:>8.3f} {max:>8.3f}'.format(
+                **dict(row, **milliseconds)
+            )
+        )
@@ -1,10 +1,45 @@
+"""
+Maze collections fetching.
+
+Maze files are fetched from a list of sources: remote or local `.tar.gz`
+archives (i.e.: repository snapshots and their mirrors) and local
+directories. Sources are fetched concurrently, remote downloads are resumed
+if interrupted and archives may be verified against a SHA-256 checksum.
+"""
+import hashlib
+import json
 import os
+import shutil
 import tarfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from pathlib import Path
-from urllib.request import urlretrieve
+from pathlib import PurePosixPath
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+from urllib.request import Request
+from urllib.request import url2pathname
+from urllib.request import urlopen
 
 from .typing import TarMembers
 
+DEFAULT_SOURCES = (
+    'https://github.com/micromouseonline/mazefiles/archive/master.tar.gz',
+)
+STORE_DIRECTORY = '.store'
+MANIFEST_FILE = 'manifest.json'
+CHUNK_SIZE = 1 << 16
+HEX_DIGITS = set('0123456789abcdef')
+
+Source = namedtuple('Source', ['location', 'sha256'])
+
 
 def clean_tar_members(members: TarMembers) -> TarMembers:
     """
@@ -60,6 +95,318 @@ def select_tar_members(
     return clean
 
 
+def parse_source(text: str) -> Source:
+    """
+    Parse a maze source.
+
+    Parameters
+    ----------
+    text
+        The source location, which is either a URL (`http://`, `https://`
+        or `file://`) or a local path, of a `.tar.gz` archive or of a
+        directory with maze files. It may be followed by `#sha256=<digest>`
+        to verify the archive checksum.
+
+    Returns
+    -------
+        The parsed source.
+
+    Raises
+    ------
+    ValueError
+        If the source is not valid.
+    """
+    location, _, fragment = text.partition('#')
+    if not location:
+        raise ValueError('Empty maze source!')
+    if not fragment:
+        return Source(location, None)
+    key, _, digest = fragment.partition('=')
+    digest = digest.lower()
+    if key != 'sha256' or len(digest) != 64 or set(digest) - HEX_DIGITS:
+        raise ValueError('Invalid checksum "{}"!'.format(fragment))
+    return Source(location, digest)
+
+
+def _local_path(location: str) -> Optional[Path]:
+    """
+    Get the local path of a source location, or `None` for remote sources.
+    """
+    url = urlparse(location)
+    if url.scheme == 'file':
+        return Path(url2pathname(url.path))
+    if url.scheme in ('http', 'https'):
+        return None
+    return Path(location)
+
+
+def file_sha256(fname: Path) -> str:
+    """
+    Compute the SHA-256 hexadecimal digest of a file.
+    """
+    digest = hashlib.sha256()
+    with open(str(fname), 'rb') as fd:
+        for chunk in iter(lambda: fd.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify(fname: Path, sha256: Optional[str]):
+    if sha256 is None or file_sha256(fname) == sha256:
+        return
+    raise ValueError('Checksum mismatch for "{}"!'.format(fname))
+
+
+def _etag_path(fname: Path) -> Path:
+    return fname.with_suffix('.etag')
+
+
+def _remove_download(fname: Path):
+    """
+    Remove a downloaded file, along with its stored ETag.
+    """
+    fname.unlink()
+    if _etag_path(fname).exists():
+        _etag_path(fname).unlink()
+
+
+def _resume_headers(fname: Path, verified: bool) -> Dict[str, str]:
+    """
+    Get the request headers to resume a partial download.
+
+    Downloads are only resumed if the server sent a strong ETag for them,
+    which is sent back in an `If-Range` header so that the server sends the
+    whole file again if it changed, or if they are verified with a checksum.
+    """
+    offset = fname.stat().st_size if fname.exists() else 0
+    etag = None
+    if _etag_path(fname).exists():
+        etag = _etag_path(fname).read_text()
+    if not offset or not (etag or verified):
+        return {}
+    headers = {'Range': 'bytes={}-'.format(offset)}
+    if etag:
+        headers['If-Range'] = etag
+    return headers
+
+
+def _store_etag(fname: Path, etag: Optional[str]):
+    """
+    Store the ETag of a download, if strong, to validate its resumption.
+    """
+    if etag and not etag.startswith('W/'):
+        _etag_path(fname).write_text(etag)
+    elif _etag_path(fname).exists():
+        _etag_path(fname).unlink()
+
+
+def _download(url: str, fname: Path, timeout: float, verified: bool):
+    """
+    Download a URL into a file, resuming from its current size if it exists
+    and the resumed download can be validated.
+    """
+    headers = _resume_headers(fname, verified)
+    try:
+        response = urlopen(Request(url, headers=headers), timeout=timeout)
+    except HTTPError as error:
+        # The partial download was already complete
+        if error.code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            return
+        raise
+    # Servers with no range support, or with a changed file, send the whole
+    # file again
+    partial = response.status == HTTPStatus.PARTIAL_CONTENT
+    if not partial:
+        _store_etag(fname, response.headers.get('ETag'))
+    with response, open(str(fname), 'ab' if partial else 'wb') as fd:
+        shutil.copyfileobj(response, fd, CHUNK_SIZE)
+
+
+def fetch_archive(
+    source: Source, downloads_path: Path, timeout: float = 60.0
+) -> Path:
+    """
+    Fetch a maze source archive, verifying its checksum.
+
+    Remote archives are downloaded into a `.part` file named after the URL.
+    If a previous download was interrupted, it is resumed with an HTTP range
+    request, as long as it can be validated: either the server sent an ETag,
+    so the whole file is sent again if it changed, or the source has a
+    checksum. Otherwise, it is downloaded again from the start. Corrupted
+    downloads are removed, so they are not resumed.
+
+    Parameters
+    ----------
+    source
+        The maze source.
+    downloads_path
+        Where to download remote archives to.
+    timeout
+        Maximum time to wait for the server, in seconds.
+
+    Returns
+    -------
+        The path of the archive, or of the directory, with the maze files.
+
+    Raises
+    ------
+    ValueError
+        If the checksum does not match.
+    """
+    path = _local_path(source.location)
+    if path is not None:
+        if not path.is_dir():
+            _verify(path, source.sha256)
+        return path
+    downloads_path.mkdir(parents=True, exist_ok=True)
+    name = hashlib.sha256(source.location.encode()).hexdigest()[:16]
+    fname = downloads_path / (name + '.part')
+    _download(source.location, fname, timeout, bool(source.sha256))
+    try:
+        _verify(fname, source.sha256)
+    except ValueError:
+        _remove_download(fname)
+        raise
+    return fname
+
+
+def iter_maze_files(path: Path) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the maze files of an archive or of a directory.
+
+    Parameters
+    ----------
+    path
+        A `.tar` archive, which may be compressed, or a directory.
+
+    Yields
+    ------
+        The relative name and the contents of each `.txt` file. The top-level
+        directory of archives is stripped, as in `clean_tar_members()`.
+    """
+    if path.is_dir():
+        for fname in sorted(path.glob('**/*.txt')):
+            yield str(fname.relative_to(path)), fname.read_bytes()
+        return
+    with tarfile.open(str(path)) as tar:
+        for member in tar:
+            name = PurePosixPath(member.name)
+            if not member.isfile() or name.suffix != '.txt':
+                continue
+            if name.is_absolute() or '..' in name.parts:
+                continue
+            name = name.relative_to(name.parts[0])
+            yield str(name), tar.extractfile(member).read()
+
+
+class MazeStore:
+    """
+    Content-addressed store of maze files.
+
+    Each distinct maze file is stored once, named after its SHA-256 digest,
+    and copied into the collection. Files are not linked, so that editing a
+    maze in the collection never changes the stored contents.
+
+    Parameters
+    ----------
+    path
+        The store directory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.objects_path = self.path / 'objects'
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_path / digest[:2] / digest[2:]
+
+    def add(self, data: bytes) -> str:
+        """
+        Store some contents, if not already stored.
+
+        Returns
+        -------
+            The SHA-256 hexadecimal digest of the contents.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        fname = self.object_path(digest)
+        if not fname.exists():
+            fname.parent.mkdir(parents=True, exist_ok=True)
+            temporary = fname.with_suffix('.tmp')
+            temporary.write_bytes(data)
+            os.replace(str(temporary), str(fname))
+        return digest
+
+    def checkout(self, digest: str, fname: Path):
+        """
+        Write the stored contents with the given digest into a file.
+        """
+        fname.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(str(self.object_path(digest)), str(fname))
+
+
+def download_mazes(
+    download_path: Path,
+    sources: Iterable[Union[str, Source]] = DEFAULT_SOURCES,
+    jobs: Optional[int] = None,
+    timeout: float = 60.0,
+) -> Dict[str, str]:
+    """
+    Fetch maze files from several sources into a collection.
+
+    Sources are fetched concurrently and merged in order: when the same
+    relative name comes from several sources, the first one is kept. Maze
+    files are kept in a content-addressed store in the `.store` directory
+    of the collection, so identical mazes are stored only once. A manifest
+    with the digest of each maze file is saved in the store too.
+
+    Parameters
+    ----------
+    download_path
+        Where to download the maze files to.
+    sources
+        The maze sources, as `Source` instances or as accepted by
+        `parse_source()`.
+    jobs
+        Number of sources fetched at the same time. Defaults to all.
+    timeout
+        Maximum time to wait for each server, in seconds.
+
+    Returns
+    -------
+        The digest of each maze file, by relative name.
+
+    Raises
+    ------
+    ValueError
+        If a source checksum does not match.
+    """
+    download_path = Path(download_path)
+    sources = [
+        parse_source(source) if isinstance(source, str) else source
+        for source in sources
+    ]
+    store = MazeStore(download_path / STORE_DIRECTORY)
+    downloads_path = store.path / 'downloads'
+    manifest = {}
+    with ThreadPoolExecutor(max_workers=jobs or len(sources)) as executor:
+        paths = executor.map(
+            lambda source: fetch_archive(source, downloads_path, timeout),
+            sources,
+        )
+        for source, path in zip(sources, paths):
+            for name, data in iter_maze_files(path):
+                digest = store.add(data)
+                if manifest.setdefault(name, digest) == digest:
+                    store.checkout(digest, download_path / name)
+            if _local_path(source.location) is None:
+                _remove_download(path)
+    (store.path / MANIFEST_FILE).write_text(
+        json.dumps(manifest, indent=0, sort_keys=True)
+    )
+    return manifest
+
+
 def download_micromouseonline_mazes(download_path: Path):
     """
     Download Micromouseonline mazes.
@@ -69,12 +416,4 @@ def download_micromouseonline_mazes(download_path: Path):
     download_path
         Where to download the maze files to.
     """
-    url = (
-        'https://github.com/micromouseonline/mazefiles/'
-        'archive/master.tar.gz'
-    )
-    reveal_tar, headers = urlretrieve(url)
-    with tarfile.open(reveal_tar) as tar:
-        members = clean_tar_members(tar.getmembers())
-        tar.extractall(str(download_path), members)
-    os.remove(reveal_tar)
+    download_mazes(download_path, DEFAULT_SOURCES)
@@ -0,0 +1,154 @@
+"""
+Batched maze environments to simulate many robots at once.
+
+All mazes are stacked in a single `uint8` array with the wall bitmask
+representation from `load_maze()` and every operation (sensor readings,
+moves and goal checks) is applied to the whole batch with NumPy indexing.
+
+Headings are represented as integers following the wall bits order, which
+is clockwise: east (0), south (1), west (2) and north (3). Actions are
+relative to the current heading: front (0), right (1), back (2) and left (3).
+"""
+from typing import Iterable
+from typing import Optional
+from typing import Sequence
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import VISITED_BIT
+from .mazes import WEST_BIT
+from .solvers import goal_cells
+
+HEADINGS = 'ESWN'
+EAST, SOUTH, WEST, NORTH = range(4)
+FRONT, RIGHT, BACK, LEFT = range(4)
+
+HEADING_BITS = numpy.array(
+    [EAST_BIT, SOUTH_BIT, WEST_BIT, NORTH_BIT], dtype='uint8'
+)
+HEADING_DX = numpy.array([1, 0, -1, 0])
+HEADING_DY = numpy.array([0, -1, 0, 1])
+# Left, front and right headings for each heading
+SENSOR_HEADINGS = (numpy.arange(4)[:, None] + [LEFT, FRONT, RIGHT]) % 4
+
+
+class VectorEnvironment:
+    """
+    Batch of robots exploring a batch of mazes.
+
+    Parameters
+    ----------
+    mazes
+        Mazes walls arrays, either stacked with shape `(batch, width,
+        height)` or as a sequence of arrays with the same shape.
+    goals
+        Goal cells, as `(x, y)` tuples, shared among all mazes. Defaults to
+        `goal_cells()`.
+    start
+        Starting cell, as an `(x, y)` tuple.
+    heading
+        Starting heading.
+    """
+
+    def __init__(
+        self,
+        mazes: Sequence[numpy.ndarray],
+        goals: Optional[Iterable] = None,
+        start=(0, 0),
+        heading: int = NORTH,
+    ):
+        self.mazes = numpy.array(mazes, dtype='uint8')
+        self.batch, width, height = self.mazes.shape
+        # Make sure robots can never leave the maze
+        self.mazes[:, -1, :] |= EAST_BIT
+        self.mazes[:, :, 0] |= SOUTH_BIT
+        self.mazes[:, 0, :] |= WEST_BIT
+        self.mazes[:, :, -1] |= NORTH_BIT
+        if goals is None:
+            goals = goal_cells((width, height))
+        self.goals = numpy.zeros((width, height), dtype='bool')
+        for x, y in goals:
+            self.goals[x, y] = True
+        self.start = start
+        self.start_heading = heading
+        self.index = numpy.arange(self.batch)
+        self.x = numpy.empty(self.batch, dtype='int64')
+        self.y = numpy.empty(self.batch, dtype='int64')
+        self.heading = numpy.empty(self.batch, dtype='int64')
+        self.steps = numpy.empty(self.batch, dtype='int64')
+        self.done = numpy.empty(self.batch, dtype='bool')
+        self.discovered = numpy.empty_like(self.mazes)
+        self.reset()
+
+    def reset(self, mask: Optional[numpy.ndarray] = None):
+        """
+        Move robots back to the starting cell and forget discovered walls.
+
+        Parameters
+        ----------
+        mask
+            Boolean array selecting the environments to reset. All of them
+            are reset if not provided.
+        """
+        if mask is None:
+            mask = numpy.ones(self.batch, dtype='bool')
+        self.x[mask] = self.start[0]
+        self.y[mask] = self.start[1]
+        self.heading[mask] = self.start_heading
+        self.steps[mask] = 0
+        self.done[mask] = False
+        self.discovered[mask] = 0
+        self._discover(mask)
+
+    def _cells(self):
+        return self.mazes[self.index, self.x, self.y]
+
+    def _discover(self, mask):
+        cells = self._cells()[mask]
+        self.discovered[self.index[mask], self.x[mask], self.y[mask]] = (
+            cells | VISITED_BIT
+        )
+
+    def read_walls(self) -> numpy.ndarray:
+        """
+        Read the walls around every robot.
+
+        Returns
+        -------
+            A boolean array with shape `(batch, 3)` indicating whether there
+            is a wall to the left, to the front and to the right of each
+            robot.
+        """
+        bits = HEADING_BITS[SENSOR_HEADINGS[self.heading]]
+        return (self._cells()[:, None] & bits) != 0
+
+    def step(self, actions: numpy.ndarray):
+        """
+        Move all robots one step.
+
+        Robots that already reached the goal do not move.
+
+        Parameters
+        ----------
+        actions
+            Integer array with the action for each robot.
+
+        Returns
+        -------
+            The walls read after moving (see `read_walls()`), whether each
+            robot reached the goal and whether the move was blocked by a
+            wall (robots still turn if blocked).
+        """
+        heading = (self.heading + actions) % 4
+        blocked = (self._cells() & HEADING_BITS[heading]) != 0
+        moving = ~blocked & ~self.done
+        self.heading = numpy.where(self.done, self.heading, heading)
+        self.x += HEADING_DX[heading] * moving
+        self.y += HEADING_DY[heading] * moving
+        self.steps += moving
+        self._discover(moving)
+        self.done |= self.goals[self.x, self.y]
+        return self.read_walls(), self.done.copy(), blocked
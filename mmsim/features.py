@@ -0,0 +1,238 @@
+"""
+Precomputed maze features, to query maze collections without reparsing them.
+
+Features are stored in a columnar index (a NumPy `.npz` file) with one array
+per feature and one row per maze file:
+
+- `name`: maze file path, relative to the collection path.
+- `competition` and `year`: parsed from the file name, if available.
+- `width` and `height`: maze size, in cells.
+- `path_len`: shortest path length from the start to the goal, in steps.
+- `dead_ends`: number of cells with three walls.
+- `loops`: number of independent loops (walls that can be removed without
+  isolating any cell).
+- `longest_straight`: number of cells in the longest straight corridor.
+- `turns`: number of turns in the shortest path.
+
+Unreachable goals are stored with `-1` path length and turns.
+
+The index can be queried with space-separated predicates, such as
+`path_len>80 turns<30` or `competition=apec`.
+"""
+import operator
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import WEST_BIT
+from .mazes import load_maze
+from .scoring import path_runs
+from .scoring import run_lengths
+from .solvers import UNREACHABLE
+from .solvers import adjacency
+from .solvers import solve
+
+FEATURES = (
+    'width',
+    'height',
+    'path_len',
+    'dead_ends',
+    'loops',
+    'longest_straight',
+    'turns',
+)
+TEXT_COLUMNS = ('name', 'competition')
+COLUMNS = TEXT_COLUMNS + ('year',) + FEATURES
+
+# Default index file name, in the collection path
+INDEX_FILE = 'features.npz'
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+PREDICATE = re.compile(r'^(\w+)(<=|>=|==|!=|<|>|=)(.+)$')
+YEAR = re.compile(r'(?<!\d)((?:19|20)\d\d)(?!\d)')
+
+
+def parse_name(fname: str) -> Tuple[str, int]:
+    """
+    Parse the competition and year from a maze file name.
+
+    Parameters
+    ----------
+    fname
+        The maze file name (i.e.: `'classic/apec2010.txt'`).
+
+    Returns
+    -------
+        The competition name, in lower case, and the year. The competition
+        is empty and the year is 0 if they cannot be parsed.
+    """
+    stem = Path(fname).stem.lower()
+    match = YEAR.search(stem)
+    if not match:
+        return '', 0
+    competition = re.sub(r'[^a-z]', '', stem[: match.start()])
+    return competition, int(match.group(1))
+
+
+def _loops(neighbors: numpy.ndarray) -> int:
+    """
+    Count independent loops as the cyclomatic number of the cells graph.
+    """
+    opened = neighbors != UNREACHABLE
+    targets = numpy.where(
+        opened, neighbors, numpy.arange(len(neighbors))[:, None]
+    )
+    labels = numpy.arange(len(neighbors))
+    while True:
+        updated = numpy.minimum(labels, labels[targets].min(axis=1))
+        if (updated == labels).all():
+            break
+        labels = updated
+    components = len(numpy.unique(labels))
+    return int(opened.sum() // 2 - len(neighbors) + components)
+
+
+def maze_features(walls: numpy.ndarray) -> Dict[str, int]:
+    """
+    Compute the features of a maze.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+
+    Returns
+    -------
+        A dictionary with the value of each one of the `FEATURES`.
+    """
+    neighbors = adjacency(walls)
+    path = solve(walls).path
+    wall_count = sum(
+        (walls & bit) > 0 for bit in (EAST_BIT, SOUTH_BIT, WEST_BIT, NORTH_BIT)
+    )
+    return {
+        'width': walls.shape[0],
+        'height': walls.shape[1],
+        'path_len': len(path) - 1,
+        'dead_ends': int((wall_count == 3).sum()),
+        'loops': _loops(neighbors),
+        'longest_straight': int(run_lengths(neighbors).max()) + 1,
+        'turns': len(path_runs(path)[1]) if len(path) else -1,
+    }
+
+
+def _file_features(arguments):
+    path, fname = arguments
+    competition, year = parse_name(fname)
+    features = maze_features(load_maze(path / fname))
+    return dict(features, name=fname, competition=competition, year=year)
+
+
+def build_features(
+    path: Path, jobs: Optional[int] = None
+) -> Dict[str, numpy.ndarray]:
+    """
+    Compute the features of all the mazes in a collection.
+
+    Parameters
+    ----------
+    path
+        Path of the collection, with maze files in text format.
+    jobs
+        Number of processes to use. Defaults to the number of CPUs. If 1,
+        features are computed in the current process.
+
+    Returns
+    -------
+        The features index, as a dictionary with an array for each one of
+        the `COLUMNS`.
+    """
+    fnames = sorted(
+        str(fname.relative_to(path)) for fname in path.glob('**/*.txt')
+    )
+    arguments = [(path, fname) for fname in fnames]
+    if jobs == 1:
+        rows = list(map(_file_features, arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            rows = list(executor.map(_file_features, arguments, chunksize=16))
+    features = {}
+    for column in COLUMNS:
+        dtype = 'str' if column in TEXT_COLUMNS else 'int32'
+        features[column] = numpy.array(
+            [row[column] for row in rows], dtype=dtype
+        )
+    return features
+
+
+def save_features(features: Dict[str, numpy.ndarray], fname: Path):
+    """
+    Save a features index as a compressed `.npz` file.
+    """
+    numpy.savez_compressed(str(fname), **features)
+
+
+def load_features(fname: Path) -> Dict[str, numpy.ndarray]:
+    """
+    Load a features index saved with `save_features()`.
+    """
+    with numpy.load(str(fname)) as data:
+        return {column: data[column] for column in data.files}
+
+
+def is_predicate(text: str) -> bool:
+    """
+    Check whether a query term is a predicate (i.e.: `path_len>80`).
+    """
+    return bool(PREDICATE.match(text))
+
+
+def query(features: Dict[str, numpy.ndarray], text: str) -> numpy.ndarray:
+    """
+    Query a features index.
+
+    Parameters
+    ----------
+    features
+        The features index.
+    text
+        Space-separated predicates, all of which must be true, as in
+        `path_len>80 turns<30`. Text columns are compared as strings.
+
+    Returns
+    -------
+        A boolean mask selecting the matching rows.
+
+    Raises
+    ------
+    ValueError
+        If the query is not valid.
+    """
+    mask = numpy.ones(len(features['name']), dtype='bool')
+    for term in text.split():
+        match = PREDICATE.match(term)
+        if not match:
+            raise ValueError('Invalid predicate "{}"!'.format(term))
+        column, symbol, value = match.groups()
+        if column not in features:
+            raise ValueError('Unknown feature "{}"!'.format(column))
+        if column not in TEXT_COLUMNS:
+            value = int(value)
+        mask &= OPERATORS[symbol](features[column], value)
+    return mask
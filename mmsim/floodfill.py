@@ -0,0 +1,206 @@
+"""
+Incremental flood-fill, the classic micromouse exploration algorithm.
+
+The mouse keeps the walls it has discovered and, for each cell, the number
+of steps to the goal assuming there are no walls where none were found yet.
+Discovering walls can only make distances longer, so instead of flooding the
+whole maze again after each discovery, only the distances that depended on
+the new walls are recomputed (a modified flood-fill with a worklist):
+
+1. Cells that lost their shortest path to the goal (i.e.: no open neighbor
+   is one step closer anymore) are invalidated, along with the cells that
+   depended on them.
+2. Invalidated cells are flooded again from their valid neighbors, in order
+   of distance.
+
+Walls and distances are stored in compact integer arrays, exposed as NumPy
+views indexed as `[x][y]`, which can be sent to the server directly (see
+`mmsim.client.StateBuffer`).
+"""
+import heapq
+from array import array
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import MAZE_SIZE
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import VISITED_BIT
+from .mazes import WEST_BIT
+from .solvers import DIRECTION_BITS
+from .solvers import DIRECTION_DELTAS
+from .solvers import OPPOSITE_BITS
+from .solvers import Cell
+from .solvers import goal_cells
+
+INFINITY = 0xFFFF
+
+
+def _neighbor_table(size: int) -> List[tuple]:
+    """
+    Precompute the flat neighbor of each cell in each direction.
+
+    Directions follow the `DIRECTION_BITS` order. Neighbors outside the maze
+    are `None`.
+    """
+    table = []
+    for x in range(size):
+        for y in range(size):
+            neighbors = []
+            for dx, dy in DIRECTION_DELTAS:
+                nx, ny = x + dx, y + dy
+                inside = 0 <= nx < size and 0 <= ny < size
+                neighbors.append(nx * size + ny if inside else None)
+            table.append(tuple(neighbors))
+    return table
+
+
+class FloodFill:
+    """
+    Incremental flood-fill distances to the goal.
+
+    Parameters
+    ----------
+    size
+        Number of cells on each side of the maze.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+    """
+
+    def __init__(
+        self, size: int = MAZE_SIZE, goals: Optional[Iterable[Cell]] = None
+    ):
+        self.size = size
+        if goals is None:
+            goals = goal_cells((size, size))
+        self.goals = tuple(goals)
+        self.neighbors = _neighbor_table(size)
+        self.flat_walls = bytearray(size * size)
+        self.flat_distances = array('H', bytes(2 * size * size))
+        self.walls = numpy.frombuffer(self.flat_walls, dtype='uint8')
+        self.walls = self.walls.reshape(size, size)
+        self.distances = numpy.frombuffer(self.flat_distances, dtype='uint16')
+        self.distances = self.distances.reshape(size, size)
+        self.dirty = []
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all the discovered walls, except for the maze boundaries.
+        """
+        self.walls[:] = 0
+        self.walls[0, :] |= WEST_BIT
+        self.walls[-1, :] |= EAST_BIT
+        self.walls[:, 0] |= SOUTH_BIT
+        self.walls[:, -1] |= NORTH_BIT
+        self.distances[:] = INFINITY
+        self.dirty = []
+        queue = []
+        for x, y in self.goals:
+            self.flat_distances[x * self.size + y] = 0
+            queue.append((0, x * self.size + y))
+        self._flood(queue)
+
+    def add_walls(self, x: int, y: int, walls: int, visited: bool = True):
+        """
+        Add the walls discovered at a cell.
+
+        Walls are added to the neighbor cells too. Distances are not updated
+        until `update()` is called.
+
+        Parameters
+        ----------
+        x
+            Cell x-position.
+        y
+            Cell y-position.
+        walls
+            Bitmask of the discovered walls, using the `mazes` wall bits.
+        visited
+            Whether to mark the cell as visited too.
+        """
+        cell = x * self.size + y
+        if visited:
+            self.flat_walls[cell] |= VISITED_BIT
+        for i, neighbor in enumerate(self.neighbors[cell]):
+            bit = DIRECTION_BITS[i]
+            if not walls & bit or self.flat_walls[cell] & bit:
+                continue
+            self.flat_walls[cell] |= bit
+            self.dirty.append(cell)
+            if neighbor is not None:
+                self.flat_walls[neighbor] |= OPPOSITE_BITS[i]
+                self.dirty.append(neighbor)
+
+    def _open_neighbors(self, cell: int):
+        walls = self.flat_walls[cell]
+        return [
+            neighbor
+            for bit, neighbor in zip(DIRECTION_BITS, self.neighbors[cell])
+            if not walls & bit
+        ]
+
+    def _invalidate(self, cells: List[int]) -> List[int]:
+        """
+        Invalidate the distances that lost their path to the goal.
+
+        Returns
+        -------
+            The invalidated cells.
+        """
+        distances = self.flat_distances
+        invalid = []
+        while cells:
+            cell = cells.pop()
+            distance = distances[cell]
+            if distance in (0, INFINITY):
+                continue
+            neighbors = self._open_neighbors(cell)
+            if any(distances[n] == distance - 1 for n in neighbors):
+                continue
+            distances[cell] = INFINITY
+            invalid.append(cell)
+            cells.extend(n for n in neighbors if distances[n] == distance + 1)
+        return invalid
+
+    def _flood(self, queue: List[tuple]):
+        """
+        Flood the maze from the `(distance, cell)` items in the queue.
+        """
+        distances = self.flat_distances
+        heapq.heapify(queue)
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            if distance != distances[cell]:
+                continue
+            distance += 1
+            for neighbor in self._open_neighbors(cell):
+                if distances[neighbor] <= distance:
+                    continue
+                distances[neighbor] = distance
+                heapq.heappush(queue, (distance, neighbor))
+
+    def update(self) -> List[int]:
+        """
+        Update the distances after adding walls.
+
+        Returns
+        -------
+            The flat indexes (`x * size + y`) of the cells that were
+            invalidated and flooded again.
+        """
+        invalid = self._invalidate(self.dirty)
+        distances = self.flat_distances
+        queue = []
+        for cell in invalid:
+            known = [distances[n] for n in self._open_neighbors(cell)]
+            distance = min(known, default=INFINITY)
+            if distance < INFINITY:
+                distances[cell] = distance + 1
+                queue.append((distance + 1, cell))
+        self._flood(queue)
+        return invalid
@@ -0,0 +1,247 @@
+"""
+Random maze generation following the competition rules.
+
+Mazes are generated as random spanning trees of the cells grid (randomized
+Kruskal algorithm), so every cell is always reachable, and a few extra walls
+are then removed to create loops. Generated mazes are guaranteed to have:
+
+- A starting cell, in the south-west corner, only open to the north.
+- An open goal region (see `goal_cells()`) with a single entrance, as loops
+  never open the walls around the goal.
+- At least one wall attached to every post, except for the post in the
+  center of the goal region.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import WEST_BIT
+from .solvers import goal_cells
+
+START = (0, 0)
+CHUNK_SIZE = 1000
+
+
+Grid = namedtuple(
+    'Grid',
+    [
+        'cells',
+        'posts',
+        'counts',
+        'inside',
+        'entrances',
+        'allowed',
+        'candidates',
+    ],
+)
+
+
+@lru_cache(maxsize=None)
+def _grid(size: int) -> Grid:
+    """
+    Precompute the grid edges for a maze size.
+
+    Edges are the walls between two cells: first all east walls, then all
+    north walls, each one described by the two flat cell indexes (`x * size
+    + y`) and the two flat post indexes (`i * (size + 1) + j`) it joins.
+
+    Returns
+    -------
+        The edges cells and posts, the number of outer walls attached to
+        each post, the edges inside the goal region, the goal region entrance
+        edges, the other edges allowed in the spanning tree and the edges
+        that may be opened to create loops.
+    """
+    xs, ys = numpy.indices((size - 1, size)).reshape(2, -1)
+    east = numpy.stack([xs * size + ys, (xs + 1) * size + ys], axis=1)
+    east_posts = numpy.stack(
+        [(xs + 1) * (size + 1) + ys, (xs + 1) * (size + 1) + ys + 1], axis=1
+    )
+    xs, ys = numpy.indices((size, size - 1)).reshape(2, -1)
+    north = numpy.stack([xs * size + ys, xs * size + ys + 1], axis=1)
+    north_posts = numpy.stack(
+        [xs * (size + 1) + ys + 1, (xs + 1) * (size + 1) + ys + 1], axis=1
+    )
+    cells = numpy.concatenate([east, north])
+    posts = numpy.concatenate([east_posts, north_posts])
+    counts = numpy.zeros((size + 1, size + 1), dtype='int64')
+    counts[[0, -1], :] += 1
+    counts[:, [0, -1]] += 1
+    counts[1:-1, [0, -1]] += 1
+    counts[[0, -1], 1:-1] += 1
+    goals = [x * size + y for x, y in goal_cells((size, size))]
+    start = START[0] * size + START[1]
+    in_goal = numpy.isin(cells, goals)
+    inside = in_goal.all(axis=1)
+    entrances = in_goal.any(axis=1) & ~inside
+    # The starting cell is only open to the north
+    allowed = ~in_goal.any(axis=1)
+    allowed &= ~(cells == [start, start + size]).all(axis=1)
+    candidates = allowed & ~(cells == start).any(axis=1)
+    return Grid(
+        cells.tolist(),
+        posts,
+        counts.reshape(-1),
+        inside,
+        numpy.flatnonzero(entrances),
+        numpy.flatnonzero(allowed),
+        candidates,
+    )
+
+
+def _find(parents, cell):
+    while parents[cell] != cell:
+        parents[cell] = parents[parents[cell]]
+        cell = parents[cell]
+    return cell
+
+
+def _spanning_tree(cells, opened, order, parents):
+    """
+    Open the walls of a random spanning tree, following the edges order.
+    """
+    for edge in order:
+        a = _find(parents, cells[edge][0])
+        b = _find(parents, cells[edge][1])
+        if a == b:
+            continue
+        parents[a] = b
+        opened[edge] = True
+
+
+def _carve_loops(posts, opened, candidates, counts, loops):
+    """
+    Open the candidate walls, in order, as long as no post is left bare.
+    """
+    for edge in candidates:
+        if not loops:
+            break
+        first, second = posts[edge]
+        if counts[first] < 2 or counts[second] < 2:
+            continue
+        counts[first] -= 1
+        counts[second] -= 1
+        opened[edge] = True
+        loops -= 1
+
+
+def _walls(opened: numpy.ndarray, size: int) -> numpy.ndarray:
+    """
+    Build the walls array from the opened edges.
+    """
+    east = numpy.ones((size, size), dtype='bool')
+    north = numpy.ones((size, size), dtype='bool')
+    split = (size - 1) * size
+    east[:-1] = ~opened[:split].reshape(size - 1, size)
+    north[:, :-1] = ~opened[split:].reshape(size, size - 1)
+    west = numpy.roll(east, 1, axis=0)
+    south = numpy.roll(north, 1, axis=1)
+    walls = east * EAST_BIT + south * SOUTH_BIT
+    walls += west * WEST_BIT + north * NORTH_BIT
+    return walls.astype('uint8')
+
+
+def generate_maze(
+    size: int = 16, loops: float = 0.05, random=None
+) -> numpy.ndarray:
+    """
+    Generate a random maze following the competition rules.
+
+    Parameters
+    ----------
+    size
+        Number of cells on each side of the maze. At least 4.
+    loops
+        Number of extra walls to remove to create loops, relative to the
+        number of cells.
+    random
+        A `numpy.random.RandomState` instance to use.
+
+    Returns
+    -------
+        The maze walls array, indexed as `walls[x][y]`.
+    """
+    if size < 4:
+        raise ValueError('Mazes must have at least 4 cells on each side!')
+    if random is None:
+        random = numpy.random.RandomState()
+    grid = _grid(size)
+    opened = grid.inside.copy()
+    # A single entrance to the goal region
+    opened[random.choice(grid.entrances)] = True
+    parents = list(range(size * size))
+    for edge in numpy.flatnonzero(opened):
+        a, b = grid.cells[edge]
+        parents[_find(parents, a)] = _find(parents, b)
+    order = random.permutation(grid.allowed)
+    _spanning_tree(grid.cells, opened, order, parents)
+    counts = grid.counts.copy()
+    numpy.add.at(counts, grid.posts[~opened].reshape(-1), 1)
+    candidates = random.permutation(
+        numpy.flatnonzero(~opened & grid.candidates)
+    )
+    loops = int(round(loops * size * size))
+    _carve_loops(grid.posts.tolist(), opened, candidates, counts, loops)
+    return _walls(opened, size)
+
+
+def _generate_chunk(arguments) -> numpy.ndarray:
+    count, size, loops, seed = arguments
+    random = numpy.random.RandomState(seed)
+    mazes = numpy.empty((count, size, size), dtype='uint8')
+    for i in range(count):
+        mazes[i] = generate_maze(size, loops=loops, random=random)
+    return mazes
+
+
+def generate_mazes(
+    count: int,
+    size: int = 16,
+    loops: float = 0.05,
+    seed: Optional[int] = None,
+    jobs: Optional[int] = None,
+) -> numpy.ndarray:
+    """
+    Generate many random mazes following the competition rules.
+
+    Mazes are generated in chunks across a pool of processes. Results are
+    reproducible for a given seed, regardless of the number of processes.
+
+    Parameters
+    ----------
+    count
+        Number of mazes to generate.
+    size
+        Number of cells on each side of the mazes.
+    loops
+        See `generate_maze()`.
+    seed
+        Random seed. If `None`, fresh entropy is used.
+    jobs
+        Number of processes to use. Defaults to the number of CPUs. If 1,
+        mazes are generated in the current process.
+
+    Returns
+    -------
+        The mazes walls arrays, stacked with shape `(count, size, size)`.
+    """
+    chunks = range(0, count, CHUNK_SIZE)
+    seeds = numpy.random.RandomState(seed).randint(2**31, size=len(chunks))
+    arguments = [
+        (min(CHUNK_SIZE, count - start), size, loops, int(chunk_seed))
+        for start, chunk_seed in zip(chunks, seeds)
+    ]
+    if not arguments:
+        return numpy.empty((0, size, size), dtype='uint8')
+    if jobs == 1:
+        return numpy.concatenate(list(map(_generate_chunk, arguments)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return numpy.concatenate(
+            list(executor.map(_generate_chunk, arguments))
+        )
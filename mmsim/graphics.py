@@ -1,10 +1,12 @@
-import struct
+import math
+from collections import namedtuple
 from itertools import product
 
 import numpy
 from pyqtgraph import GraphicsObject
 from pyqtgraph import QtCore
 from pyqtgraph import QtGui
+from pyqtgraph import makeQImage
 from pyqtgraph import mkBrush
 from pyqtgraph import mkPen
 
@@ -19,59 +21,219 @@ from .mazes import read_walls
 CELL_WIDTH = 180
 WALL_WIDTH = 12
 
+# Minimum cell size on screen, in pixels, to draw the distance labels
+LABEL_MIN_PIXELS = 24
+# Minimum cell size on screen, in pixels, to draw the posts and each wall on
+# its own (instead of merging contiguous walls into longer rectangles)
+DETAIL_MIN_PIXELS = 8
+# Resolution of the discovery backing pixmaps, in pixels per scene unit
+DISCOVERY_SCALE = 0.5
+
+BLUE = (0, 120, 255)
 GRAY = (100, 100, 100)
 GREEN = (0, 255, 0)
+ORANGE = (255, 120, 0)
 RED = (255, 0, 0)
 WHITE = (255, 255, 255)
+YELLOW = (255, 200, 0)
+
+MazeTemplate = namedtuple('MazeTemplate', ['shape', 'walls', 'runs', 'posts'])
+
+
+def _runs(mask: numpy.ndarray):
+    """
+    Find the runs of contiguous `True` values along the last axis.
+
+    Returns
+    -------
+        The row, start and stop (exclusive) of each run.
+    """
+    padded = numpy.zeros((mask.shape[0], mask.shape[1] + 2), dtype='int8')
+    padded[:, 1:-1] = mask
+    changes = numpy.diff(padded, axis=1)
+    rows, starts = numpy.nonzero(changes == 1)
+    _, stops = numpy.nonzero(changes == -1)
+    return rows, starts, stops
+
+
+def wall_rects(walls: numpy.ndarray, merge: bool = False) -> numpy.ndarray:
+    """
+    Compute the rectangles to paint the walls of a maze.
 
+    Walls shared by two cells are painted once, if set in any of them.
+    Coordinates are in the painter space used by `paint_walls()`, which is
+    flipped vertically.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+    merge
+        Whether to merge contiguous walls into longer rectangles.
+
+    Returns
+    -------
+        An array with shape `(rectangles, 4)` with the left, top, width and
+        height of each rectangle.
+    """
+    width, height = walls.shape
+    vertical = numpy.zeros((width + 1, height), dtype='bool')
+    vertical[1:] |= (walls & EAST_BIT) > 0
+    vertical[:-1] |= (walls & WEST_BIT) > 0
+    horizontal = numpy.zeros((height + 1, width), dtype='bool')
+    horizontal[1:] |= (walls.T & NORTH_BIT) > 0
+    horizontal[:-1] |= (walls.T & SOUTH_BIT) > 0
+    rects = []
+    for mask, is_vertical in ((vertical, True), (horizontal, False)):
+        if merge:
+            lines, starts, stops = _runs(mask)
+        else:
+            lines, starts = numpy.nonzero(mask)
+            stops = starts + 1
+        lengths = (stops - starts) * CELL_WIDTH
+        lines = lines * CELL_WIDTH
+        thickness = numpy.full(len(lines), WALL_WIDTH)
+        if is_vertical:
+            left = lines - WALL_WIDTH / 2
+            top = -stops * CELL_WIDTH + WALL_WIDTH / 2
+            columns = (left, top, thickness, lengths)
+        else:
+            left = starts * CELL_WIDTH + WALL_WIDTH / 2
+            top = -lines + WALL_WIDTH / 2
+            columns = (left, top, lengths, thickness)
+        rects.append(numpy.stack(columns, axis=1).astype('float64'))
+    return numpy.concatenate(rects).reshape(-1, 4)
+
+
+def visible_cells(area, shape):
+    """
+    Get the range of cells to paint in an area.
+
+    Parameters
+    ----------
+    area
+        The area to paint, in the painter space used by `paint_walls()`.
+    shape
+        The maze shape.
+
+    Returns
+    -------
+        The first and last (exclusive) x and y cell positions, as
+        `(x_start, x_stop, y_start, y_stop)`, including a one cell margin.
+    """
+    width, height = shape
+    return (
+        max(math.floor(area.left() / CELL_WIDTH) - 1, 0),
+        min(math.ceil(area.right() / CELL_WIDTH) + 1, width),
+        max(math.floor(-area.bottom() / CELL_WIDTH) - 1, 0),
+        min(math.ceil(-area.top() / CELL_WIDTH) + 1, height),
+    )
 
-def paint_walls(painter, walls, color):
+
+class RectSet:
+    """
+    Rectangles to paint, kept both as an array, to select the rectangles
+    within an area, and as Qt rectangles, ready to be painted.
+
+    Parameters
+    ----------
+    rects
+        The rectangles array, as returned by `wall_rects()`.
+    """
+
+    def __init__(self, rects: numpy.ndarray):
+        self.array = rects
+        self.rects = [QtCore.QRectF(*rect) for rect in rects.tolist()]
+
+    def within(self, area=None):
+        """
+        Get the Qt rectangles intersecting an area (or all, if `None`).
+        """
+        if area is None:
+            return self.rects
+        left, top, right, bottom = area.getCoords()
+        x, y, width, height = self.array.T
+        inside = (x < right) & (x + width > left)
+        inside &= (y < bottom) & (y + height > top)
+        if inside.all():
+            return self.rects
+        return [self.rects[i] for i in numpy.flatnonzero(inside).tolist()]
+
+
+def paint_rects(painter, rects, color, area=None):
+    """
+    Paint a `RectSet` within an area.
+    """
     painter.setBrush(mkBrush(color))
     painter.setPen(mkPen(None))
-    for (x, y) in product(range(MAZE_SIZE), repeat=2):
-        wall = walls[y][x]
-        if wall & EAST_BIT:
-            painter.drawRect(
-                QtCore.QRectF(
-                    (y + 1) * CELL_WIDTH - WALL_WIDTH / 2,
-                    -(x + 1) * CELL_WIDTH + WALL_WIDTH / 2,
-                    WALL_WIDTH,
-                    CELL_WIDTH,
-                )
-            )
-        if wall & SOUTH_BIT:
-            painter.drawRect(
-                QtCore.QRectF(
-                    y * CELL_WIDTH + WALL_WIDTH / 2,
-                    -x * CELL_WIDTH + WALL_WIDTH / 2,
-                    CELL_WIDTH,
-                    WALL_WIDTH,
-                )
-            )
-        if wall & WEST_BIT:
-            painter.drawRect(
-                QtCore.QRectF(
-                    y * CELL_WIDTH - WALL_WIDTH / 2,
-                    -(x + 1) * CELL_WIDTH + WALL_WIDTH / 2,
-                    WALL_WIDTH,
-                    CELL_WIDTH,
+    painter.drawRects(rects.within(area))
+
+
+def paint_walls(painter, walls, color, area=None, merge=False):
+    rects = RectSet(wall_rects(walls, merge=merge))
+    paint_rects(painter, rects, color, area=area)
+
+
+def cell_tile(x, y):
+    """
+    Get the area covered by a cell, including its walls.
+
+    Coordinates are in the painter space used by `paint_walls()`.
+    """
+    return QtCore.QRectF(
+        x * CELL_WIDTH - WALL_WIDTH / 2,
+        -(y + 1) * CELL_WIDTH + WALL_WIDTH / 2,
+        CELL_WIDTH + WALL_WIDTH,
+        CELL_WIDTH + WALL_WIDTH,
+    )
+
+
+def cell_wall_rects(walls, cells):
+    """
+    Compute the rectangles to paint the walls of some cells.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+    cells
+        The cells, as `(x, y)` tuples.
+
+    Returns
+    -------
+        The Qt rectangles of each wall, as in `wall_rects()`, although walls
+        shared by two of the cells are repeated.
+    """
+    rects = []
+    for x, y in cells:
+        wall = walls[x][y]
+        for bit, line in ((EAST_BIT, x + 1), (WEST_BIT, x)):
+            if wall & bit:
+                rects.append(
+                    QtCore.QRectF(
+                        line * CELL_WIDTH - WALL_WIDTH / 2,
+                        -(y + 1) * CELL_WIDTH + WALL_WIDTH / 2,
+                        WALL_WIDTH,
+                        CELL_WIDTH,
+                    )
                 )
-            )
-        if wall & NORTH_BIT:
-            painter.drawRect(
-                QtCore.QRectF(
-                    y * CELL_WIDTH + WALL_WIDTH / 2,
-                    -(x + 1) * CELL_WIDTH + WALL_WIDTH / 2,
-                    CELL_WIDTH,
-                    WALL_WIDTH,
+        for bit, line in ((NORTH_BIT, y + 1), (SOUTH_BIT, y)):
+            if wall & bit:
+                rects.append(
+                    QtCore.QRectF(
+                        x * CELL_WIDTH + WALL_WIDTH / 2,
+                        -line * CELL_WIDTH + WALL_WIDTH / 2,
+                        CELL_WIDTH,
+                        WALL_WIDTH,
+                    )
                 )
-            )
+    return rects
 
 
-def paint_discovered(painter, distances, walls):
-    if walls is not None:
-        paint_walls(painter, walls, color=WHITE)
-    for (x, y) in product(range(MAZE_SIZE), repeat=2):
+def paint_labels(painter, distances, walls, cells=None):
+    if cells is None:
+        cells = product(*map(range, distances.shape))
+    for (x, y) in cells:
         painter.setPen(mkPen(color=GRAY))
         if walls is not None:
             wall = walls[x][y]
@@ -89,20 +251,105 @@ def paint_discovered(painter, distances, walls):
         )
 
 
-def paint_template(painter, walls):
+def paint_discovered(painter, distances, walls):
     if walls is not None:
-        paint_walls(painter=painter, walls=walls, color=GRAY)
-    for (x, y) in product(range(MAZE_SIZE + 1), repeat=2):
-        painter.setBrush(mkBrush(WHITE))
-        painter.setPen(mkPen(None))
-        painter.drawRect(
-            QtCore.QRectF(
-                x * CELL_WIDTH - WALL_WIDTH / 2,
-                -y * CELL_WIDTH + WALL_WIDTH / 2,
-                WALL_WIDTH,
-                WALL_WIDTH,
-            )
+        paint_walls(painter, walls, color=WHITE)
+    paint_labels(painter, distances, walls)
+
+
+def post_rects(shape) -> numpy.ndarray:
+    """
+    Compute the rectangles to paint the posts of a maze with a given shape.
+
+    See `wall_rects()` for details on the returned array.
+    """
+    xs, ys = numpy.indices((shape[0] + 1, shape[1] + 1)).reshape(2, -1)
+    thickness = numpy.full(len(xs), WALL_WIDTH)
+    columns = (
+        xs * CELL_WIDTH - WALL_WIDTH / 2,
+        -ys * CELL_WIDTH + WALL_WIDTH / 2,
+        thickness,
+        thickness,
+    )
+    return numpy.stack(columns, axis=1).astype('float64')
+
+
+def maze_template(walls):
+    """
+    Precompute the maze template (i.e.: walls) rectangles to paint.
+
+    Templates hold no paint devices, so they can be prepared in the
+    background.
+    """
+    if walls is None:
+        shape = (MAZE_SIZE, MAZE_SIZE)
+        empty = RectSet(numpy.empty((0, 4)))
+        return MazeTemplate(shape, empty, empty, RectSet(post_rects(shape)))
+    return MazeTemplate(
+        walls.shape,
+        RectSet(wall_rects(walls)),
+        RectSet(wall_rects(walls, merge=True)),
+        RectSet(post_rects(walls.shape)),
+    )
+
+
+def paint_template(painter, template, area=None, detail=True):
+    rects = template.walls if detail else template.runs
+    paint_rects(painter, rects, GRAY, area=area)
+    if detail:
+        paint_rects(painter, template.posts, WHITE, area=area)
+
+
+def paint_path(painter, path, color):
+    if path is None or not len(path):
+        return
+    pen = mkPen(color=color, width=WALL_WIDTH * 3)
+    pen.setCosmetic(False)
+    painter.setBrush(mkBrush(None))
+    painter.setPen(pen)
+    points = [
+        QtCore.QPointF(
+            (x + 0.5) * CELL_WIDTH, -(y + 0.5) * CELL_WIDTH + WALL_WIDTH / 2
+        )
+        for x, y in path
+    ]
+    painter.drawPolyline(*points)
+
+
+def paint_heatmap(painter, visits, turns):
+    if visits is None:
+        return
+    painter.save()
+    painter.setPen(mkPen(None))
+    painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, False)
+    most_visits = max(visits.max(), 1)
+    most_turns = max(turns.max(), 1)
+    colors = numpy.zeros(visits.shape + (4,), dtype='uint8')
+    colors[..., :3] = ORANGE[::-1]
+    alpha = 40 + 180 * visits / most_visits
+    colors[..., 3] = numpy.where(visits > 0, alpha, 0)
+    width, height = visits.shape
+    painter.drawImage(
+        QtCore.QRectF(
+            0,
+            -height * CELL_WIDTH + WALL_WIDTH / 2,
+            width * CELL_WIDTH,
+            height * CELL_WIDTH,
+        ),
+        makeQImage(colors[:, ::-1], transpose=True),
+    )
+    painter.setBrush(mkBrush(BLUE + (160,)))
+    for x, y in zip(*numpy.nonzero(turns)):
+        radius = CELL_WIDTH / 3 * (turns[x][y] / most_turns) ** 0.5
+        painter.drawEllipse(
+            QtCore.QPointF(
+                (x + 0.5) * CELL_WIDTH,
+                -(y + 0.5) * CELL_WIDTH + WALL_WIDTH / 2,
+            ),
+            radius,
+            radius,
         )
+    painter.restore()
 
 
 def paint_position(painter, x, y, direction):
@@ -136,82 +383,301 @@ def paint_position(painter, x, y, direction):
     )
 
 
+class DiscoveryCanvas:
+    """
+    Discovered walls and distance labels, painted into persistent backing
+    pixmaps.
+
+    The previous distances and walls are kept, so that only the cells that
+    changed are painted again.
+
+    Parameters
+    ----------
+    shape
+        The shape of the distances and walls arrays.
+    """
+
+    def __init__(self, shape):
+        self.shape = shape
+        width, height = shape
+        margin = 2 * WALL_WIDTH
+        self.rect = QtCore.QRectF(
+            -margin,
+            -margin,
+            width * CELL_WIDTH + 2 * margin,
+            height * CELL_WIDTH + 2 * margin,
+        )
+        size = (self.rect.size() * DISCOVERY_SCALE).toSize()
+        self.walls_pixmap = QtGui.QPixmap(size)
+        self.labels_pixmap = QtGui.QPixmap(size)
+        self.distances = None
+        self.walls = None
+
+    def painter(self, pixmap):
+        """
+        Start painting into a pixmap, in the space used by `paint_walls()`.
+        """
+        painter = QtGui.QPainter(pixmap)
+        painter.scale(DISCOVERY_SCALE, DISCOVERY_SCALE)
+        painter.translate(-self.rect.topLeft())
+        painter.scale(1, -1)
+        return painter
+
+    def update(self, distances, walls):
+        """
+        Paint the cells that changed since the last update.
+
+        Returns
+        -------
+            The changed cells, as `(x, y)` tuples, or `None` if most of the
+            cells changed and everything was painted again.
+        """
+        full = self.distances is None
+        if not full:
+            changed = distances != self.distances
+            changed |= walls != self.walls
+            cells = [tuple(cell) for cell in numpy.argwhere(changed).tolist()]
+            full = len(cells) * 2 > changed.size
+        self.distances = numpy.array(distances)
+        self.walls = numpy.array(walls)
+        if full:
+            self.repaint_all()
+            return None
+        if cells:
+            self.repaint(cells)
+        return cells
+
+    def repaint_all(self):
+        for pixmap in (self.walls_pixmap, self.labels_pixmap):
+            pixmap.fill(QtCore.Qt.transparent)
+        painter = self.painter(self.walls_pixmap)
+        paint_walls(painter, self.walls, color=WHITE)
+        painter.end()
+        painter = self.painter(self.labels_pixmap)
+        painter.setFont(QtGui.QFont('times', 50))
+        paint_labels(painter, self.distances, self.walls)
+        painter.end()
+
+    def repaint(self, cells):
+        """
+        Clear and paint again the given cells.
+        """
+        clip = QtGui.QPainterPath()
+        # Tiles overlap, so overlapping areas must not cancel each other
+        clip.setFillRule(QtCore.Qt.WindingFill)
+        for x, y in cells:
+            clip.addRect(cell_tile(x, y))
+        # Walls of the neighbor cells may overlap the cleared area
+        width, height = self.shape
+        around = {
+            (x + dx, y + dy)
+            for x, y in cells
+            for dx, dy in product((-1, 0, 1), repeat=2)
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        }
+        painter = self._clear(self.walls_pixmap, clip)
+        painter.setBrush(mkBrush(WHITE))
+        painter.setPen(mkPen(None))
+        painter.drawRects(cell_wall_rects(self.walls, sorted(around)))
+        painter.end()
+        painter = self._clear(self.labels_pixmap, clip)
+        painter.setFont(QtGui.QFont('times', 50))
+        paint_labels(painter, self.distances, self.walls, cells=cells)
+        painter.end()
+
+    def _clear(self, pixmap, clip):
+        painter = self.painter(pixmap)
+        painter.setClipPath(clip)
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode_Clear)
+        painter.fillPath(clip, mkBrush(WHITE))
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode_SourceOver)
+        return painter
+
+    def draw(self, painter, exposed, labels=True):
+        """
+        Draw the pixmaps within the exposed area, in item coordinates.
+        """
+        target = exposed.intersected(self.rect)
+        if target.isEmpty():
+            return
+        source = QtCore.QRectF(
+            (target.topLeft() - self.rect.topLeft()) * DISCOVERY_SCALE,
+            target.size() * DISCOVERY_SCALE,
+        )
+        painter.drawPixmap(target, self.walls_pixmap, source)
+        if labels:
+            painter.drawPixmap(target, self.labels_pixmap, source)
+
+
 class MazeItem(GraphicsObject):
+    """
+    Maze view, with the template, the mouse position and path, the discovered
+    walls and distances and the visits heatmap.
+
+    Only the cells intersecting the exposed area are painted and, as the zoom
+    decreases, distance labels are dropped first and then posts are dropped
+    and contiguous walls are merged into longer rectangles.
+
+    The discovered walls and distances are kept in a `DiscoveryCanvas`, in
+    which only the changed cells are painted again, unless zooming in beyond
+    its resolution.
+    """
+
     def __init__(self):
         super().__init__()
+        self.setFlag(self.ItemUsesExtendedStyleOption)
+        self.template = None
+        self.geometry = maze_template(None)
         self.reset(None)
 
-    def reset(self, template):
+    def reset(self, template, geometry=None):
+        """
+        Reset the maze, optionally with an already computed template
+        geometry (see `maze_template()`).
+        """
         self.distances = None
         self.walls = None
+        self.discovered = None
+        self.canvas = None
         self.template = template
         self.x = 0
         self.y = 0
         self.direction = 0
+        self.path = None
+        self.visits = None
+        self.turns = None
 
-        self.picture = QtGui.QPicture()
         self.position_picture = QtGui.QPicture()
+        self.path_picture = QtGui.QPicture()
+        self.heatmap_picture = QtGui.QPicture()
 
-        self.generateTemplate()
+        if geometry is None:
+            geometry = maze_template(template)
+        if geometry.shape != self.geometry.shape:
+            self.prepareGeometryChange()
+        self.geometry = geometry
         self.update()
 
-    def generateTemplate(self):
-        self.template_picture = QtGui.QPicture()
-        painter = QtGui.QPainter(self.template_picture)
+    def generatePosition(self):
+        self.position_picture = QtGui.QPicture()
+        painter = QtGui.QPainter(self.position_picture)
         painter.scale(1, -1)
-        paint_template(painter=painter, walls=self.template)
+        paint_position(painter, x=self.x, y=self.y, direction=self.direction)
         painter.end()
 
-    def generatePicture(self):
-        self.picture = QtGui.QPicture()
-        painter = QtGui.QPainter(self.picture)
-        painter.setFont(QtGui.QFont('times', 50))
+    def generatePath(self):
+        self.path_picture = QtGui.QPicture()
+        painter = QtGui.QPainter(self.path_picture)
         painter.scale(1, -1)
-        paint_discovered(painter, distances=self.distances, walls=self.walls)
+        paint_path(painter, path=self.path, color=YELLOW)
         painter.end()
 
-    def generatePosition(self):
-        self.position_picture = QtGui.QPicture()
-        painter = QtGui.QPainter(self.position_picture)
+    def generateHeatmap(self):
+        self.heatmap_picture = QtGui.QPicture()
+        painter = QtGui.QPainter(self.heatmap_picture)
         painter.scale(1, -1)
-        paint_position(painter, x=self.x, y=self.y, direction=self.direction)
+        paint_heatmap(painter, visits=self.visits, turns=self.turns)
         painter.end()
 
-    def paint(self, p, *args):
-        p.drawPicture(0, 0, self.template_picture)
+    def paint_discovery(self, p, area):
+        """
+        Paint the discovered walls and distances as vectors.
+        """
+        if self.discovered is None:
+            self.discovered = RectSet(wall_rects(self.walls))
+        paint_rects(p, self.discovered, WHITE, area=area)
+        p.setFont(QtGui.QFont('times', 50))
+        x_start, x_stop, y_start, y_stop = visible_cells(
+            area, self.distances.shape
+        )
+        cells = product(range(x_start, x_stop), range(y_start, y_stop))
+        paint_labels(p, self.distances, self.walls, cells=cells)
+
+    def paint(self, p, option, *args):
+        lod = option.levelOfDetailFromTransform(p.worldTransform())
+        pixels = lod * CELL_WIDTH
+        exposed = option.exposedRect
+        # Painter space is flipped vertically
+        area = QtCore.QRectF(
+            exposed.left(),
+            -exposed.bottom(),
+            exposed.width(),
+            exposed.height(),
+        )
+        p.drawPicture(0, 0, self.heatmap_picture)
+        p.save()
+        p.scale(1, -1)
+        paint_template(
+            p, self.geometry, area=area, detail=pixels >= DETAIL_MIN_PIXELS
+        )
+        p.restore()
+        p.drawPicture(0, 0, self.path_picture)
         p.drawPicture(0, 0, self.position_picture)
-        p.drawPicture(0, 0, self.picture)
+        if self.canvas is None:
+            return
+        if lod <= DISCOVERY_SCALE:
+            self.canvas.draw(p, exposed, labels=pixels >= LABEL_MIN_PIXELS)
+            return
+        p.save()
+        p.scale(1, -1)
+        self.paint_discovery(p, area)
+        p.restore()
 
     def boundingRect(self):
-        return QtCore.QRectF(self.template_picture.boundingRect())
+        width, height = self.geometry.shape
+        margin = 2 * WALL_WIDTH
+        return QtCore.QRectF(
+            -margin,
+            -margin,
+            width * CELL_WIDTH + 2 * margin,
+            height * CELL_WIDTH + 2 * margin,
+        )
 
-    def update_position(self, position):
-        self.x, self.y, self.direction = struct.unpack('3B', position)
-        self.direction = chr(self.direction)
+    def update_cell(self, x, y):
+        """
+        Schedule a repaint of the area covered by a cell.
+        """
+        tile = cell_tile(x, y)
+        rect = QtCore.QRectF(
+            tile.left(), -tile.bottom(), tile.width(), tile.height()
+        )
+        self.update(rect.adjusted(*(WALL_WIDTH * i for i in (-1, -1, 1, 1))))
+
+    def update_position(self, x, y, direction):
+        self.update_cell(self.x, self.y)
+        self.x = x
+        self.y = y
+        self.direction = direction
         self.generatePosition()
-        self.update()
+        self.update_cell(self.x, self.y)
         return read_walls(self.template, self.x, self.y, self.direction)
 
-    def read_position_walls(self, position):
-        x, y, direction = struct.unpack('3B', position)
-        return read_walls(self.template, x, y, chr(direction))
-
-    def update_discovery(self, discovery):
-        order = chr(discovery[0])
-        distances = discovery[1:257]
-        distances = numpy.frombuffer(distances, dtype='uint8')
-        distances = distances.reshape(MAZE_SIZE, MAZE_SIZE).T
-        if order == 'F':
-            distances = distances.T
-
-        order = chr(discovery[257])
-        walls = discovery[258:]
-        walls = numpy.frombuffer(walls, dtype='uint8')
-        walls = walls.reshape(MAZE_SIZE, MAZE_SIZE).T
-        if order == 'F':
-            walls = walls.T
+    def update_path(self, path):
+        self.path = path
+        self.generatePath()
+        self.update()
 
-        self.walls = walls
+    def update_discovery(self, distances, walls):
         self.distances = distances
-        self.generatePicture()
+        self.walls = walls
+        self.discovered = None
+        if distances is None:
+            self.canvas = None
+            self.update()
+            return
+        if walls is None:
+            self.walls = walls = numpy.zeros_like(distances)
+        if self.canvas is None or self.canvas.shape != distances.shape:
+            self.canvas = DiscoveryCanvas(distances.shape)
+        cells = self.canvas.update(distances, walls)
+        if cells is None:
+            self.update()
+            return
+        for x, y in cells:
+            self.update_cell(x, y)
+
+    def update_heatmap(self, visits, turns):
+        self.visits = visits
+        self.turns = turns
+        self.generateHeatmap()
         self.update()
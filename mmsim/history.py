@@ -0,0 +1,172 @@
+"""
+Array-backed exploration states history.
+
+States are decoded once, when received, into a single growable structured
+array with a row per step, so the whole run can be analyzed with vectorized
+operations (see `mmsim.analytics`).
+"""
+from typing import Tuple
+
+import numpy
+
+from .mazes import MAZE_SIZE
+from .states import POSITION_SIZE
+from .states import apply_delta
+from .states import decode_delta
+from .states import decode_discovery
+
+HISTORY_DTYPE = numpy.dtype(
+    [
+        ('x', 'u1'),
+        ('y', 'u1'),
+        ('direction', 'u1'),
+        ('distances', 'u1', (MAZE_SIZE, MAZE_SIZE)),
+        ('walls', 'u1', (MAZE_SIZE, MAZE_SIZE)),
+        ('think_time', 'f4'),
+    ]
+)
+
+
+class History:
+    """
+    Growable array of exploration states.
+
+    Each row has the `x`, `y` and `direction` (as a byte, i.e.: `ord('N')`)
+    pose fields, the `distances` and `walls` cell arrays, indexed as
+    `[x][y]`, and the client `think_time` before sending the state, in
+    seconds (NaN if unknown, see `mmsim.timing`). Capacity doubles whenever
+    the array is full, so appending is amortized constant time.
+
+    Parameters
+    ----------
+    capacity
+        Initial number of states to allocate.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.clear()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(
+        self, index: int
+    ) -> Tuple[int, int, str, numpy.ndarray, numpy.ndarray]:
+        """
+        Get a state.
+
+        Returns
+        -------
+            The x-position, y-position, orientation, distances and walls.
+            Arrays are read-only views.
+        """
+        row = self.states[index]
+        distances = row['distances']
+        walls = row['walls']
+        distances.flags.writeable = False
+        walls.flags.writeable = False
+        return (
+            int(row['x']),
+            int(row['y']),
+            chr(row['direction']),
+            distances,
+            walls,
+        )
+
+    @property
+    def states(self) -> numpy.ndarray:
+        """
+        Structured array view with all the stored states.
+        """
+        return self.array[: self.size]
+
+    def clear(self):
+        """
+        Delete all the states.
+
+        A new array is allocated, so arrays previously returned are never
+        overwritten.
+        """
+        self.array = numpy.zeros(self.capacity, dtype=HISTORY_DTYPE)
+        self.size = 0
+
+    def _next(self) -> numpy.ndarray:
+        if self.size == len(self.array):
+            array = numpy.zeros(2 * len(self.array), dtype=HISTORY_DTYPE)
+            array[: self.size] = self.array
+            self.array = array
+        self.size += 1
+        row = self.array[self.size - 1]
+        row['think_time'] = numpy.nan
+        return row
+
+    def append(
+        self,
+        x: int,
+        y: int,
+        direction: str,
+        distances: numpy.ndarray,
+        walls: numpy.ndarray,
+    ):
+        """
+        Append a state.
+
+        Parameters
+        ----------
+        x
+            Mouse x-position.
+        y
+            Mouse y-position.
+        direction
+            Mouse orientation, either the direction name (i.e.: `'north'`)
+            or its initial.
+        distances
+            Cell distances indexed as `[x][y]`.
+        walls
+            Cell walls bitmask indexed as `[x][y]`.
+        """
+        row = self._next()
+        row['x'] = x
+        row['y'] = y
+        row['direction'] = ord(direction[0].upper())
+        row['distances'] = distances
+        row['walls'] = walls
+
+    def append_encoded(self, state: bytes):
+        """
+        Decode and append a state.
+
+        Parameters
+        ----------
+        state
+            The state, as received in the exploration state request, with
+            no `S` prefix.
+        """
+        distances, walls = decode_discovery(state[POSITION_SIZE:])
+        row = self._next()
+        row['x'], row['y'], row['direction'] = state[:POSITION_SIZE]
+        row['distances'] = distances
+        row['walls'] = walls
+
+    def append_delta(self, delta: bytes):
+        """
+        Decode and append a delta state, applied to the last state.
+
+        Parameters
+        ----------
+        delta
+            The delta state, as received in the delta state request, with no
+            `D` prefix. If there are no previous states, cells not included
+            in the delta are considered to be zero.
+        """
+        position, changes = decode_delta(delta)
+        distances = walls = None
+        if self.size:
+            distances = self.array[self.size - 1]['distances']
+            walls = self.array[self.size - 1]['walls']
+        distances, walls = apply_delta(distances, walls, changes)
+        row = self._next()
+        row['x'], row['y'], row['direction'] = position
+        row['distances'] = distances
+        row['walls'] = walls
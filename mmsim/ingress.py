@@ -0,0 +1,251 @@
+"""
+Bounded ingress queue between the server listener and the interface.
+
+Messages received by the listener thread are put in a fixed-capacity ring
+buffer and consumed in batches by the interface thread. When the queue is
+full (the high-water mark is reached):
+
+- Messages that expect a reply, or that the history depends on (i.e.: delta
+  states), always block the listener until there is room. While blocked, the
+  listener stops reading from its sockets, so ZeroMQ applies backpressure to
+  the clients.
+- Visualization-only messages (streamed full states and show/hide path
+  requests, which expect no reply) are handled according to the overflow
+  policy: `'block'` as any other message, `'drop'` to discard them or
+  `'coalesce'` to replace the newest queued message of the same kind.
+
+Once any delta state has been streamed, streamed full states are no longer
+visualization-only: deltas are encoded against the last full state sent, so
+losing it would corrupt all the following states in the history. If a full
+state was dropped before that, streamed deltas are dropped too until the next
+full state is received.
+
+The queue memory is allocated once, so it stays flat under burst load.
+"""
+import threading
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+POLICIES = ('block', 'drop', 'coalesce')
+
+# Time between checks for a closed queue while blocked, in seconds
+WAIT_TIMEOUT = 0.1
+
+
+def coalescing_key(
+    route, message: bytes, deltas: bool = False
+) -> Optional[bytes]:
+    """
+    Get the kind of a visualization-only message.
+
+    Parameters
+    ----------
+    route
+        The message route, which is `None` for streamed messages.
+    message
+        The message.
+    deltas
+        Whether delta states have been streamed, in which case streamed full
+        states are the base for the following deltas.
+
+    Returns
+    -------
+        The message kind, or `None` if the message is not visualization-only
+        and therefore must never be dropped.
+    """
+    if route is not None:
+        return None
+    if message[:1] == b'S':
+        return None if deltas else b'S'
+    if message in (b'show-path', b'hide-path'):
+        return b'path'
+    return None
+
+
+class IngressQueue:
+    """
+    Thread-safe bounded ring buffer of `(route, message, think_time)` items.
+
+    The think time is the client think time before sending the message (see
+    `mmsim.timing`), as measured when it was received.
+
+    Parameters
+    ----------
+    capacity
+        Maximum number of queued messages (the high-water mark).
+    policy
+        Overflow policy for visualization-only messages (see `POLICIES`).
+    """
+
+    def __init__(self, capacity: int = 1000, policy: str = 'coalesce'):
+        if capacity < 1:
+            raise ValueError('Queue capacity must be at least 1!')
+        if policy not in POLICIES:
+            raise ValueError('Unknown overflow policy "{}"!'.format(policy))
+        self.capacity = capacity
+        self.policy = policy
+        self.slots = [None] * capacity
+        self.head = 0
+        self.size = 0
+        self.closed = False
+        self.deltas = False
+        self.stale = False
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _tail(self) -> int:
+        return (self.head + self.size - 1) % self.capacity
+
+    def _overflow(self, item: Tuple) -> bool:
+        """
+        Drop or coalesce a visualization-only item, if the policy allows it.
+
+        Returns
+        -------
+            Whether the item was handled.
+        """
+        key = item[2]
+        if key is None or self.policy == 'block':
+            return False
+        tail = self.slots[self._tail()]
+        if self.policy == 'coalesce' and tail[2] == key:
+            self.slots[self._tail()] = item
+            self.coalesced += 1
+        else:
+            self.stale = key == b'S'
+            self.dropped += 1
+        return True
+
+    def _stale_delta(self, route, message: bytes) -> bool:
+        """
+        Track the streamed full states that delta states are encoded against.
+
+        Returns
+        -------
+            Whether the message is a streamed delta state whose full state
+            was dropped.
+        """
+        if route is not None:
+            return False
+        if message[:1] == b'S':
+            self.stale = False
+        elif message[:1] == b'D':
+            self.deltas = True
+            return self.stale
+        return False
+
+    def _wait(self):
+        """
+        Wait until there is room in the queue or the queue is closed.
+        """
+        start = time.perf_counter()
+        self.stalls += 1
+        while self.size == self.capacity and not self.closed:
+            self.not_full.wait(WAIT_TIMEOUT)
+        self.stall_time += time.perf_counter() - start
+
+    def put(
+        self, route, message: bytes, think_time: Optional[float] = None
+    ) -> bool:
+        """
+        Queue a message, blocking if required by the overflow policy.
+
+        Parameters
+        ----------
+        route
+            The message route, which is `None` for streamed messages.
+        message
+            The message.
+        think_time
+            The client think time before sending the message, in seconds, or
+            `None` if unknown.
+
+        Returns
+        -------
+            Whether the queue was empty before, so the consumer must be
+            woken up.
+        """
+        with self.lock:
+            self.received += 1
+            if self._stale_delta(route, message):
+                self.dropped += 1
+                return False
+            key = coalescing_key(route, message, self.deltas)
+            item = (route, message, key, think_time)
+            if self.size == self.capacity:
+                if self._overflow(item):
+                    return False
+                self._wait()
+            if self.closed:
+                return False
+            self.slots[(self.head + self.size) % self.capacity] = item
+            self.size += 1
+            self.max_depth = max(self.max_depth, self.size)
+            return self.size == 1
+
+    def get(self, limit: Optional[int] = None) -> List[Tuple]:
+        """
+        Take the oldest messages from the queue.
+
+        Parameters
+        ----------
+        limit
+            Maximum number of messages to take. Defaults to all.
+
+        Returns
+        -------
+            A list of `(route, message, think_time)` tuples.
+        """
+        with self.lock:
+            count = self.size if limit is None else min(limit, self.size)
+            items = []
+            for _ in range(count):
+                route, message, _, think_time = self.slots[self.head]
+                self.slots[self.head] = None
+                self.head = (self.head + 1) % self.capacity
+                items.append((route, message, think_time))
+            self.size -= count
+            self.not_full.notify_all()
+            return items
+
+    def close(self):
+        """
+        Release the producer, if blocked, and reject further messages.
+        """
+        with self.lock:
+            self.closed = True
+            self.not_full.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the queue counters.
+
+        Returns
+        -------
+            A dictionary with the current queue `depth`, the `max_depth`,
+            the number of `received`, `dropped` and `coalesced` messages,
+            the number of `stalls` (times the producer was blocked) and the
+            total `stall_time`, in seconds.
+        """
+        with self.lock:
+            return {
+                'depth': self.size,
+                'max_depth': self.max_depth,
+                'received': self.received,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+                'stalls': self.stalls,
+                'stall_time': self.stall_time,
+            }
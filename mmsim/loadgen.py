@@ -0,0 +1,238 @@
+"""
+End-to-end load generation against a running simulation server.
+
+Many synthetic clients, each one with its own REQ socket running in its own
+thread, send a sequence of requests to the server as fast as it replies.
+Messages are encoded before the clients start, so only the round trip time
+(i.e.: server listener, interface processing and reply) is measured.
+
+Sequences are either a random mix of message types or the replay of a
+recorded run: a `.npy` file with a states array, as in `History.states`.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import numpy
+import zmq
+
+from .client import StateBuffer
+from .mazes import MAZE_SIZE
+
+MESSAGE_TYPES = ('ping', 'W', 'S', 'reset')
+DEFAULT_MIX = 'ping=1,W=10,S=10,reset=0.01'
+PERCENTILES = (50, 95, 99)
+DIRECTIONS = 'NESW'
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a message mix.
+
+    Parameters
+    ----------
+    text
+        Comma-separated `type=weight` pairs, as in `ping=1,W=10,S=10`.
+        Message types are any of `MESSAGE_TYPES`.
+
+    Returns
+    -------
+        The weight of each message type.
+
+    Raises
+    ------
+    ValueError
+        If the mix is not valid.
+    """
+    mix = {}
+    for term in text.split(','):
+        kind, _, weight = term.partition('=')
+        if kind.strip() not in MESSAGE_TYPES:
+            raise ValueError('Unknown message type "{}"!'.format(kind))
+        mix[kind.strip()] = float(weight)
+    if any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+        raise ValueError('Weights must be positive!')
+    return mix
+
+
+def _encode(kind: str, state: StateBuffer, random) -> bytes:
+    x, y = random.randint(MAZE_SIZE, size=2)
+    direction = DIRECTIONS[random.randint(4)]
+    if kind == 'W':
+        return b'W' + bytes([x, y, ord(direction)])
+    if kind == 'S':
+        cells = random.randint(256, size=(2, MAZE_SIZE, MAZE_SIZE))
+        return bytes(state.encode(x, y, direction, *cells.astype('uint8')))
+    return kind.encode()
+
+
+def synthetic_messages(
+    count: int, mix: Dict[str, float], random=None
+) -> Tuple[List[bytes], numpy.ndarray]:
+    """
+    Generate a random sequence of messages.
+
+    Parameters
+    ----------
+    count
+        Number of messages.
+    mix
+        The weight of each message type.
+    random
+        A `numpy.random.RandomState` instance to use.
+
+    Returns
+    -------
+        The messages and their type indexes in `MESSAGE_TYPES`.
+    """
+    if random is None:
+        random = numpy.random.RandomState()
+    weights = numpy.array([mix.get(kind, 0) for kind in MESSAGE_TYPES])
+    kinds = random.choice(
+        len(MESSAGE_TYPES), size=count, p=weights / weights.sum()
+    )
+    state = StateBuffer()
+    messages = [_encode(MESSAGE_TYPES[i], state, random) for i in kinds]
+    return messages, kinds
+
+
+def replay_messages(
+    states: numpy.ndarray,
+) -> Tuple[List[bytes], numpy.ndarray]:
+    """
+    Generate the sequence of messages of a recorded run.
+
+    The run starts with a reset and, for each state, the walls are read at
+    the mouse position and then the state is sent, as an exploring mouse
+    would do.
+
+    Parameters
+    ----------
+    states
+        The states array of the run, as in `History.states`.
+
+    Returns
+    -------
+        The messages and their type indexes in `MESSAGE_TYPES`.
+    """
+    state = StateBuffer()
+    messages = [b'reset']
+    for row in states:
+        position = bytes([row['x'], row['y'], row['direction']])
+        messages.append(b'W' + position)
+        encoded = state.encode(
+            row['x'],
+            row['y'],
+            chr(row['direction']),
+            row['distances'],
+            row['walls'],
+        )
+        messages.append(bytes(encoded))
+    kinds = [MESSAGE_TYPES.index('reset')]
+    kinds += [MESSAGE_TYPES.index('W'), MESSAGE_TYPES.index('S')] * len(states)
+    return messages, numpy.array(kinds)
+
+
+def _run_client(
+    context, endpoint: str, messages: List[bytes], timeout: float, barrier
+) -> numpy.ndarray:
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.RCVTIMEO, int(timeout * 1000))
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(endpoint)
+    latencies = numpy.empty(len(messages))
+    barrier.wait()
+    try:
+        for i, message in enumerate(messages):
+            start = time.perf_counter()
+            socket.send(message)
+            socket.recv()
+            latencies[i] = time.perf_counter() - start
+    except zmq.Again:
+        raise TimeoutError('No reply from "{}"!'.format(endpoint))
+    finally:
+        socket.close()
+    return latencies
+
+
+def run_load(
+    endpoint: str,
+    sequences: List[Tuple[List[bytes], numpy.ndarray]],
+    timeout: float = 5.0,
+) -> Tuple[numpy.ndarray, numpy.ndarray, float]:
+    """
+    Run concurrent clients against a server.
+
+    Parameters
+    ----------
+    endpoint
+        Server endpoint to connect to.
+    sequences
+        The messages and message types of each client, as returned by
+        `synthetic_messages()` or `replay_messages()`.
+    timeout
+        Maximum time to wait for each reply, in seconds.
+
+    Returns
+    -------
+        The message type indexes and latencies, in seconds, of all the
+        messages, and the total elapsed time.
+
+    Raises
+    ------
+    TimeoutError
+        If the server does not reply in time.
+    """
+    context = zmq.Context.instance()
+    barrier = Barrier(len(sequences) + 1)
+    with ThreadPoolExecutor(max_workers=len(sequences)) as executor:
+        futures = [
+            executor.submit(
+                _run_client, context, endpoint, messages, timeout, barrier
+            )
+            for messages, _ in sequences
+        ]
+        barrier.wait()
+        start = time.perf_counter()
+        latencies = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    kinds = numpy.concatenate([kinds for _, kinds in sequences])
+    return kinds, numpy.concatenate(latencies), elapsed
+
+
+def latency_report(
+    kinds: numpy.ndarray, latencies: numpy.ndarray, elapsed: float
+) -> List[Dict[str, float]]:
+    """
+    Summarize the latencies of each message type.
+
+    Parameters
+    ----------
+    kinds
+        The message type index of each message.
+    latencies
+        The latency of each message, in seconds.
+    elapsed
+        The total elapsed time, in seconds.
+
+    Returns
+    -------
+        A row for each message type sent, plus an `'all'` row, with the
+        message `type`, the `count`, the `throughput` (messages per second)
+        and the `p50`, `p95`, `p99` and `max` latencies, in seconds.
+    """
+    names = [MESSAGE_TYPES[i] for i in range(len(MESSAGE_TYPES)) if i in kinds]
+    masks = [kinds == MESSAGE_TYPES.index(name) for name in names]
+    rows = []
+    for name, mask in zip(names + ['all'], masks + [slice(None)]):
+        selected = latencies[mask]
+        row = {'type': name, 'count': len(selected)}
+        row['throughput'] = len(selected) / elapsed
+        for q in PERCENTILES:
+            row['p{}'.format(q)] = float(numpy.percentile(selected, q))
+        row['max'] = float(selected.max())
+        rows.append(row)
+    return rows
@@ -99,3 +99,36 @@ def load_maze(data: IO) -> numpy.ndarray:
     if maze.startswith('OSHWDEM'):
         return _read_maze_oshwdem(maze)
     return _read_maze_default(maze)
+
+
+def _format_maze_default(maze: numpy.ndarray, post_char: str) -> str:
+    lines = []
+    for y in reversed(range(maze.shape[1])):
+        north = ['---' if cell & NORTH_BIT else '   ' for cell in maze[:, y]]
+        lines.append(post_char + post_char.join(north) + post_char)
+        west = ['|' if cell & WEST_BIT else ' ' for cell in maze[:, y]]
+        west.append('|' if maze[-1, y] & EAST_BIT else ' ')
+        lines.append('   '.join(west))
+    south = ['---' if cell & SOUTH_BIT else '   ' for cell in maze[:, 0]]
+    lines.append(post_char + post_char.join(south) + post_char)
+    return '\n'.join(lines) + '\n'
+
+
+def save_maze(maze: numpy.ndarray, data: IO, post_char: str = '+'):
+    """
+    Save a maze in the default text format, as read by `load_maze()`.
+
+    Parameters
+    ----------
+    maze
+        The maze walls array, indexed as `maze[x][y]`.
+    data
+        A path or a writable text file object.
+    post_char
+        Character used to draw the posts.
+    """
+    text = _format_maze_default(maze, post_char)
+    if isinstance(data, Path):
+        data.write_text(text)
+    else:
+        data.write(text)
@@ -0,0 +1,318 @@
+"""
+Low-overhead profiling of the simulator interface.
+
+The profiler combines:
+
+- A statistical stack sampler, which periodically records the call stack of
+  the named threads (i.e.: the GUI and the listener threads). Stacks are
+  folded (`thread;module:function;... count`), which is the input format of
+  flamegraph tools such as `flamegraph.pl` or speedscope.
+- An event-loop lag monitor, which measures how late a periodic timer fires
+  compared with its schedule.
+- A memory tracker, which takes `tracemalloc` snapshots along with the size
+  of the states history, to tell history growth apart from other leaks.
+"""
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import List
+from typing import Optional
+
+import numpy
+
+# Lag histogram resolution and range, in seconds
+LAG_RESOLUTION = 0.001
+LAG_RANGE = 2.0
+
+
+def fold_stack(thread: str, frame) -> str:
+    """
+    Fold a call stack into a single line, root first.
+
+    Parameters
+    ----------
+    thread
+        Thread name, used as the root of the stack.
+    frame
+        The innermost frame of the stack.
+
+    Returns
+    -------
+        The `;`-separated stack, as in `thread;module:function`.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append('{}:{}'.format(Path(code.co_filename).stem, code.co_name))
+        frame = frame.f_back
+    names.append(thread)
+    return ';'.join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """
+    Statistical sampler of the call stacks of the named threads.
+
+    Parameters
+    ----------
+    interval
+        Time between samples, in seconds.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name='StackSampler', daemon=True)
+        self.interval = interval
+        self.names = {}
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def name_thread(self, name: str, ident: Optional[int] = None):
+        """
+        Sample a thread under the given name.
+
+        Parameters
+        ----------
+        name
+            The thread name.
+        ident
+            The thread identifier. Defaults to the calling thread.
+        """
+        if ident is None:
+            ident = threading.get_ident()
+        self.names[ident] = name
+
+    def sample(self):
+        """
+        Record the current call stack of each named thread.
+        """
+        frames = sys._current_frames()
+        for ident, name in list(self.names.items()):
+            if ident in frames:
+                self.stacks[fold_stack(name, frames[ident])] += 1
+        self.samples += 1
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def folded(self) -> str:
+        """
+        Get the sampled stacks in folded format, one stack per line.
+        """
+        return ''.join(
+            '{} {}\n'.format(stack, count)
+            for stack, count in sorted(self.stacks.items())
+        )
+
+
+class LagMonitor:
+    """
+    Event-loop lag monitor.
+
+    The `tick()` method must be called from a periodic timer running in the
+    event loop. Lags are accumulated in a fixed-size histogram, so memory
+    stays constant regardless of the profiling time.
+
+    Parameters
+    ----------
+    interval
+        The timer interval, in seconds.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        bins = int(round(LAG_RANGE / LAG_RESOLUTION)) + 1
+        self.histogram = numpy.zeros(bins, dtype='int64')
+        self.maximum = 0.0
+        self.last = None
+
+    def tick(self, now: Optional[float] = None):
+        """
+        Record a timer event.
+
+        Parameters
+        ----------
+        now
+            Time of the event, in seconds. Defaults to `time.perf_counter()`.
+        """
+        if now is None:
+            now = time.perf_counter()
+        if self.last is not None:
+            lag = max(now - self.last - self.interval, 0.0)
+            self.maximum = max(self.maximum, lag)
+            index = min(int(lag / LAG_RESOLUTION), len(self.histogram) - 1)
+            self.histogram[index] += 1
+        self.last = now
+
+    @property
+    def count(self) -> int:
+        return int(self.histogram.sum())
+
+    def percentile(self, q: float) -> float:
+        """
+        Get a lag percentile, in seconds.
+
+        Parameters
+        ----------
+        q
+            The percentile, from 0 to 100.
+        """
+        if not self.count:
+            return 0.0
+        cumulative = numpy.cumsum(self.histogram)
+        index = numpy.searchsorted(cumulative, q / 100 * self.count)
+        return float(min(index + 1, len(self.histogram))) * LAG_RESOLUTION
+
+
+class MemoryTracker:
+    """
+    Tracker of the traced memory and the states history size.
+
+    Only the first and the last `tracemalloc` snapshots are kept, to compare
+    them when reporting.
+    """
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+        self.start = time.perf_counter()
+        self.timeline = []
+
+    def snapshot(self, states: int = 0, history_bytes: int = 0):
+        """
+        Take a memory snapshot.
+
+        Parameters
+        ----------
+        states
+            Number of states in the history.
+        history_bytes
+            Memory allocated for the history, in bytes.
+        """
+        if not tracemalloc.is_tracing():
+            return
+        self.last = tracemalloc.take_snapshot()
+        if self.first is None:
+            self.first = self.last
+        traced, _ = tracemalloc.get_traced_memory()
+        elapsed = time.perf_counter() - self.start
+        self.timeline.append((elapsed, states, history_bytes, traced))
+
+    def top(self, limit: int = 10) -> List[tracemalloc.StatisticDiff]:
+        """
+        Get the source lines with the largest memory growth.
+        """
+        if self.first is None:
+            return []
+        return self.last.compare_to(self.first, 'lineno')[:limit]
+
+
+class Profiler:
+    """
+    Stack sampler, event-loop lag monitor and memory tracker.
+
+    Parameters
+    ----------
+    interval
+        Time between stack samples, in seconds.
+    lag_interval
+        Interval of the timer used to measure the event-loop lag, in seconds.
+    memory_interval
+        Time between memory snapshots, in seconds.
+
+    Other components may add their own `counters` to the report.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        lag_interval: float = 0.05,
+        memory_interval: float = 10.0,
+    ):
+        self.sampler = StackSampler(interval)
+        self.lag = LagMonitor(lag_interval)
+        self.memory = MemoryTracker()
+        self.memory_interval = memory_interval
+        self.counters = {}
+
+    def start(self):
+        tracemalloc.start()
+        self.memory.snapshot()
+        self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+        self.memory.snapshot(*self.memory.timeline[-1][1:3])
+        tracemalloc.stop()
+
+    def _report_samples(self) -> List[str]:
+        lines = ['Stack samples: {}'.format(self.sampler.samples)]
+        threads = Counter()
+        for stack, count in self.sampler.stacks.items():
+            threads[stack.split(';', 1)[0]] += count
+        for name, count in threads.most_common():
+            lines.append('  {}: {}'.format(name, count))
+        return lines
+
+    def _report_lag(self) -> List[str]:
+        lines = ['Event-loop lag ({} events):'.format(self.lag.count)]
+        for q in (50, 90, 99):
+            lag = self.lag.percentile(q)
+            lines.append('  p{}: {:.0f} ms'.format(q, lag * 1000))
+        lines.append('  max: {:.0f} ms'.format(self.lag.maximum * 1000))
+        return lines
+
+    def _report_memory(self) -> List[str]:
+        lines = ['Memory (elapsed s, states, history KiB, traced KiB):']
+        for elapsed, states, history_bytes, traced in self.memory.timeline:
+            lines.append(
+                '  {:.1f} {} {} {}'.format(
+                    elapsed, states, history_bytes // 1024, traced // 1024
+                )
+            )
+        lines.append('')
+        lines.append('Largest memory growth:')
+        for stat in self.memory.top():
+            lines.append('  {}'.format(stat))
+        return lines
+
+    def _report_counters(self) -> List[str]:
+        lines = ['Counters:']
+        for name, value in sorted(self.counters.items()):
+            lines.append('  {}: {}'.format(name, value))
+        return lines
+
+    def report(self) -> str:
+        """
+        Get a human-readable profiling report.
+        """
+        sections = [
+            self._report_samples(),
+            self._report_lag(),
+            self._report_memory(),
+        ]
+        if self.counters:
+            sections.append(self._report_counters())
+        return '\n\n'.join('\n'.join(lines) for lines in sections) + '\n'
+
+    def save(self, prefix: Path):
+        """
+        Save the report (`.txt`) and the folded stacks (`.folded`).
+
+        Parameters
+        ----------
+        prefix
+            Path of the output files, with no suffix.
+        """
+        prefix = Path(prefix)
+        Path(str(prefix) + '.txt').write_text(self.report())
+        Path(str(prefix) + '.folded').write_text(self.sampler.folded())
@@ -0,0 +1,431 @@
+"""
+Run-time estimation of paths with a simple physical motion model.
+
+Paths are sequences of `(x, y)` cells, as returned by `shortest_path()` or
+as stored in the exploration history. They are split into straight runs,
+90 degree turns, in-place U-turns and, optionally, diagonal runs (zigzags of
+alternating turns). Straight runs follow a trapezoidal speed profile.
+"""
+import heapq
+from math import pi
+from math import sqrt
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from .solvers import UNREACHABLE
+from .solvers import adjacency
+from .solvers import goal_cells
+
+# Headings follow the wall bits order: east, south, west and north
+HEADING_DELTAS = {(1, 0): 0, (0, -1): 1, (-1, 0): 2, (0, 1): 3}
+RIGHT = 1
+LEFT = -1
+U_TURN = 2
+
+GOAL = (-1, -1, True)
+
+
+class MotionModel:
+    """
+    Robot motion model.
+
+    Parameters
+    ----------
+    cell
+        Cell size, in meters.
+    max_speed
+        Maximum speed on straight runs, in meters per second.
+    acceleration
+        Acceleration and deceleration, in meters per second squared.
+    turn_speed
+        Speed for smooth turns, in meters per second. Turns follow an arc of
+        half a cell radius.
+    diagonal_speed
+        Maximum speed on diagonal runs, in meters per second. Defaults to
+        `max_speed`.
+    u_turn_time
+        Time to stop and turn around in place, in seconds.
+    """
+
+    def __init__(
+        self,
+        cell: float = 0.18,
+        max_speed: float = 2.0,
+        acceleration: float = 4.0,
+        turn_speed: float = 0.7,
+        diagonal_speed: Optional[float] = None,
+        u_turn_time: float = 0.4,
+    ):
+        self.cell = cell
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.turn_speed = turn_speed
+        self.diagonal_speed = diagonal_speed or max_speed
+        self.u_turn_time = u_turn_time
+
+    def straight_time(
+        self,
+        distance: float,
+        initial: float,
+        final: float,
+        top: Optional[float] = None,
+    ) -> float:
+        """
+        Time to travel a straight distance with a trapezoidal profile.
+
+        Parameters
+        ----------
+        distance
+            Distance to travel, in meters.
+        initial
+            Initial speed, in meters per second.
+        final
+            Final speed, in meters per second.
+        top
+            Maximum speed. Defaults to `max_speed`.
+
+        Returns
+        -------
+            The time it takes, in seconds.
+        """
+        if distance <= 0:
+            return 0.0
+        if top is None:
+            top = self.max_speed
+        a = self.acceleration
+        peak = sqrt((2 * a * distance + initial**2 + final**2) / 2)
+        if peak < max(initial, final):
+            # Not enough room to change speed: assume a linear change
+            return 2 * distance / (initial + final)
+        if peak <= top:
+            return (2 * peak - initial - final) / a
+        ramps = (2 * top**2 - initial**2 - final**2) / (2 * a)
+        return (2 * top - initial - final) / a + (distance - ramps) / top
+
+    def turn_time(self, angle: float = 90) -> float:
+        """
+        Time to make a smooth turn, in seconds.
+
+        Parameters
+        ----------
+        angle
+            Turn angle, in degrees.
+        """
+        arc = self.cell / 2 * angle * pi / 180
+        return arc / self.turn_speed
+
+
+def path_runs(path: numpy.ndarray) -> Tuple[List[int], List[int]]:
+    """
+    Split a path into straight runs.
+
+    Parameters
+    ----------
+    path
+        Sequence of `(x, y)` cells, each one next to the previous one.
+        Consecutive repeated cells (i.e.: from an exploration history) are
+        ignored.
+
+    Returns
+    -------
+        The length (in cells) of each straight run and the turns between
+        runs (`RIGHT`, `LEFT` or `U_TURN`).
+
+    Raises
+    ------
+    ValueError
+        If a cell is not next to the previous one.
+    """
+    steps = numpy.diff(numpy.asarray(path), axis=0).reshape(-1, 2)
+    steps = steps[steps.any(axis=1)]
+    if (numpy.abs(steps).sum(axis=1) != 1).any():
+        raise ValueError('Path cells must be next to each other!')
+    if not len(steps):
+        return [], []
+    headings = numpy.array([HEADING_DELTAS[tuple(step)] for step in steps])
+    changes = numpy.flatnonzero(numpy.diff(headings)) + 1
+    bounds = numpy.concatenate([[0], changes, [len(headings)]])
+    lengths = numpy.diff(bounds).tolist()
+    turns = (headings[changes] - headings[changes - 1]) % 4
+    turns = [LEFT if turn == 3 else int(turn) for turn in turns]
+    return lengths, turns
+
+
+def _diagonal_spans(lengths, turns):
+    """
+    Find zigzags of alternating turns with one-cell runs in between.
+
+    Returns
+    -------
+        A list of `(first, last)` turn indexes for each zigzag.
+    """
+    spans = []
+    first = 0
+    for i in range(1, len(turns) + 1):
+        if (
+            i < len(turns)
+            and lengths[i] == 1
+            and turns[i] != U_TURN
+            and turns[i] == -turns[i - 1]
+        ):
+            continue
+        if i - first >= 2:
+            spans.append((first, i - 1))
+        first = i
+    return spans
+
+
+def _turns_time(distances, initial, final, turns, model):
+    """
+    Compute the time spent turning, updating the straight runs distances and
+    speeds to account for the turns.
+    """
+    time = 0.0
+    for i, turn in enumerate(turns):
+        if turn == U_TURN:
+            final[i] = initial[i + 1] = 0.0
+            time += model.u_turn_time
+            continue
+        distances[i] -= model.cell / 2
+        distances[i + 1] -= model.cell / 2
+        time += model.turn_time(90)
+    return time
+
+
+def _diagonals_time(distances, spans, model):
+    """
+    Compute the time saved by running zigzags diagonally, updating the
+    straight runs distances to remove the zigzags.
+    """
+    time = 0.0
+    for first, last in spans:
+        for i in range(first + 1, last + 1):
+            distances[i] = 0.0
+        time -= model.turn_time(90) * (last - first + 1)
+        time += model.turn_time(45) * 2
+        diagonal = (last - first) * model.cell * sqrt(2) / 2
+        time += model.straight_time(
+            diagonal, model.turn_speed, model.turn_speed, model.diagonal_speed
+        )
+    return time
+
+
+def estimate_time(
+    path: numpy.ndarray,
+    model: Optional[MotionModel] = None,
+    diagonals: bool = True,
+) -> float:
+    """
+    Estimate the time it takes to run a path, from rest to rest.
+
+    Parameters
+    ----------
+    path
+        Sequence of `(x, y)` cells, each one next to the previous one.
+    model
+        Robot motion model. Defaults to `MotionModel()`.
+    diagonals
+        Whether to run zigzags diagonally.
+
+    Returns
+    -------
+        The estimated time, in seconds.
+    """
+    if model is None:
+        model = MotionModel()
+    lengths, turns = path_runs(path)
+    distances = [length * model.cell for length in lengths]
+    initial = [0.0] + [model.turn_speed] * len(turns)
+    final = [model.turn_speed] * len(turns) + [0.0]
+    time = _turns_time(distances, initial, final, turns, model)
+    if diagonals:
+        spans = _diagonal_spans(lengths, turns)
+        time += _diagonals_time(distances, spans, model)
+    for distance, v0, v1 in zip(distances, initial, final):
+        time += model.straight_time(distance, v0, v1)
+    return time
+
+
+def estimate_times(
+    paths: Iterable[numpy.ndarray],
+    model: Optional[MotionModel] = None,
+    diagonals: bool = True,
+) -> numpy.ndarray:
+    """
+    Estimate the time it takes to run each one of many candidate paths.
+
+    See `estimate_time()` for details on the parameters.
+
+    Returns
+    -------
+        An array with the estimated times, in seconds.
+    """
+    if model is None:
+        model = MotionModel()
+    return numpy.array(
+        [estimate_time(path, model, diagonals=diagonals) for path in paths]
+    )
+
+
+def run_lengths(neighbors: numpy.ndarray) -> numpy.ndarray:
+    """
+    Compute how many cells can be traveled straight from each cell.
+
+    Parameters
+    ----------
+    neighbors
+        An `adjacency()` table.
+
+    Returns
+    -------
+        An array with shape `(cells, 4)` with the number of open cells
+        straight ahead for each cell and heading.
+    """
+    runs = numpy.zeros(neighbors.shape, dtype='int32')
+    headings = numpy.arange(4)
+    opened = neighbors != UNREACHABLE
+    targets = numpy.where(opened, neighbors, 0)
+    for _ in range(len(neighbors)):
+        updated = numpy.where(opened, runs[targets, headings] + 1, 0)
+        if (updated == runs).all():
+            break
+        runs = updated
+    return runs
+
+
+def _transitions(state, model, neighbors, runs, goals):
+    """
+    Generate the transitions from a search state: straight runs of any
+    length followed by a turn, or ending at a goal cell.
+
+    Yields
+    ------
+        The target state, the transition cost and the last cell of the run.
+    """
+    cell, heading, moving = state
+    initial = model.turn_speed if moving else 0.0
+    distance = -model.cell / 2 if moving else 0.0
+    for _ in range(runs[cell, heading]):
+        cell = int(neighbors[cell, heading])
+        distance += model.cell
+        if cell in goals:
+            yield GOAL, model.straight_time(distance, initial, 0.0), cell
+            return
+        cost = model.straight_time(
+            distance - model.cell / 2, initial, model.turn_speed
+        )
+        cost += model.turn_time(90)
+        for side in (LEFT, RIGHT):
+            target = (cell, (heading + side) % 4, True)
+            if runs[target[0], target[1]]:
+                yield target, cost, cell
+
+
+def _search(sources, model, neighbors, runs, goals):
+    """
+    Dijkstra search over `(cell, heading, moving)` states.
+
+    Returns
+    -------
+        The best time found for each state and the previous state and last
+        run cell for each state.
+    """
+    best = dict(sources)
+    previous = {}
+    queue = [(time, state) for state, time in sources.items()]
+    heapq.heapify(queue)
+    while queue:
+        time, state = heapq.heappop(queue)
+        if state == GOAL:
+            break
+        if time > best[state]:
+            continue
+        for target, cost, end in _transitions(
+            state, model, neighbors, runs, goals
+        ):
+            cost += time
+            if cost < best.get(target, float('inf')):
+                best[target] = cost
+                previous[target] = (state, end)
+                heapq.heappush(queue, (cost, target))
+    return best, previous
+
+
+def fastest_route(
+    walls: numpy.ndarray,
+    model: Optional[MotionModel] = None,
+    start: Tuple[int, int] = (0, 0),
+    heading: int = 3,
+    goals: Optional[Iterable[Tuple[int, int]]] = None,
+) -> Tuple[float, numpy.ndarray]:
+    """
+    Find the fastest route to the goal under a motion model.
+
+    The search runs over `(cell, heading)` states, with straight runs of any
+    length followed by a 90 degree turn as transitions. Turning in place is
+    only allowed at the starting cell, and diagonal runs are not considered
+    in the search.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+    model
+        Robot motion model. Defaults to `MotionModel()`.
+    start
+        Starting cell, as an `(x, y)` tuple.
+    heading
+        Starting heading (east, south, west and north, from 0 to 3).
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+
+    Returns
+    -------
+        The estimated time, in seconds, and the route as a sequence of
+        `(x, y)` cells. The time is infinite and the route empty if the goal
+        cannot be reached, while both are zero and empty if the start cell
+        is a goal already.
+    """
+    if model is None:
+        model = MotionModel()
+    if goals is None:
+        goals = goal_cells(walls.shape)
+    height = walls.shape[1]
+    goals = {x * height + y for x, y in goals}
+    neighbors = adjacency(walls)
+    runs = run_lengths(neighbors)
+    cell = start[0] * height + start[1]
+    if cell in goals:
+        return 0.0, numpy.empty((0, 2), dtype='int32')
+    sources = {
+        (cell, (heading + quarters) % 4, False): model.u_turn_time
+        * min(quarters, 4 - quarters)
+        / 2
+        for quarters in range(4)
+    }
+    best, previous = _search(sources, model, neighbors, runs, goals)
+    if GOAL not in best:
+        return float('inf'), numpy.empty((0, 2), dtype='int32')
+    return best[GOAL], _route(neighbors, previous, height)
+
+
+def _route(neighbors, previous, height):
+    """
+    Rebuild the route cells from the search result.
+    """
+    segments = []
+    state = GOAL
+    while state in previous:
+        state, end = previous[state]
+        segments.append((state, end))
+    cells = [segments[-1][0][0]]
+    for (cell, heading, _), end in reversed(segments):
+        while cell != end:
+            cell = int(neighbors[cell, heading])
+            cells.append(cell)
+    cells = numpy.array(cells, dtype='int32')
+    return numpy.stack([cells // height, cells % height], axis=1)
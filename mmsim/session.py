@@ -0,0 +1,147 @@
+"""
+In-process simulation sessions, with no sockets involved.
+"""
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from .history import History
+from .mazes import read_walls
+
+
+class Session:
+    """
+    Simulation session on a maze.
+
+    A session answers wall readings and keeps the history of exploration
+    states, exactly as the simulation server does, but it can be used
+    directly from Python (i.e.: from a solver or a training loop).
+
+    States are stored in a `History` array, decoded only once, when they are
+    pushed.
+
+    Parameters
+    ----------
+    maze
+        The maze walls array, as returned by `load_maze()`.
+    """
+
+    def __init__(self, maze: Optional[numpy.ndarray] = None):
+        self.maze = maze
+        self.history = History()
+
+    def __len__(self) -> int:
+        return len(self.history)
+
+    def __getitem__(
+        self, index: int
+    ) -> Tuple[int, int, str, numpy.ndarray, numpy.ndarray]:
+        """
+        Get a state from the history.
+
+        Returns
+        -------
+            The x-position, y-position, orientation, distances and walls.
+            Arrays are read-only and indexed as `[x][y]`.
+        """
+        return self.history[index]
+
+    def reset(self):
+        """
+        Delete the states history.
+        """
+        self.history.clear()
+
+    def read_walls(
+        self, x: int, y: int, direction: str
+    ) -> Tuple[bool, bool, bool]:
+        """
+        Read the walls at the given position.
+
+        Parameters
+        ----------
+        x
+            Mouse x-position.
+        y
+            Mouse y-position.
+        direction
+            Mouse orientation, either the direction name (i.e.: `'north'`)
+            or its initial.
+
+        Returns
+        -------
+            Whether there is a wall to the left, to the front and to the
+            right of the mouse.
+        """
+        return read_walls(self.maze, x, y, direction[0].upper())
+
+    def push_state(
+        self,
+        x: int,
+        y: int,
+        direction: str,
+        distances: numpy.ndarray,
+        walls: numpy.ndarray,
+    ):
+        """
+        Store an exploration state in the history.
+
+        Parameters
+        ----------
+        x
+            Mouse x-position.
+        y
+            Mouse y-position.
+        direction
+            Mouse orientation.
+        distances
+            Cell distances indexed as `[x][y]`. They are copied.
+        walls
+            Cell walls bitmask indexed as `[x][y]`. They are copied.
+        """
+        self.history.append(x, y, direction, distances, walls)
+
+    def send_state(
+        self,
+        x: int,
+        y: int,
+        direction: str,
+        distances: numpy.ndarray,
+        walls: numpy.ndarray,
+    ) -> bytes:
+        """
+        Store an exploration state, as `mmsim.client.Client` would send it.
+
+        See `push_state()` for details on the parameters.
+
+        Returns
+        -------
+            The server reply, always `ok`.
+        """
+        self.push_state(x, y, direction, distances, walls)
+        return b'ok'
+
+    def push_encoded_state(self, state: bytes):
+        """
+        Store an encoded exploration state in the history.
+
+        Parameters
+        ----------
+        state
+            The state, as received in the exploration state request, with
+            no `S` prefix.
+        """
+        self.history.append_encoded(state)
+
+    def push_encoded_delta(self, delta: bytes):
+        """
+        Store an encoded delta state in the history.
+
+        Parameters
+        ----------
+        delta
+            The delta state, as received in the delta state request, with no
+            `D` prefix.
+        """
+        self.history.append_delta(delta)
@@ -0,0 +1,219 @@
+"""
+Shared-memory exploration states, for clients running on the same host.
+
+Instead of sending the distances and walls with every state, local clients
+write them in a memory-mapped file registered with the server. The file is a
+ring of slots, each one with the layout::
+
+    <sequence><distances><walls>
+
+Where the sequence is a 4-byte little-endian unsigned integer and the cells
+are 256 bytes each, indexed as `[x][y]` (`F` order). States then only carry
+the pose and the sequence number of the slot (with an `M` order byte)::
+
+    S<x-position><y-position><orientation>M<sequence>
+
+The server reads the slot arrays in place, with no copies or parsing, and
+copies them into the history. Slots are reused after a full ring, so the
+slot sequence is checked to detect states overwritten before the server
+could read them.
+"""
+import mmap
+import struct
+from pathlib import Path
+from typing import Tuple
+
+import numpy
+
+from .mazes import MAZE_SIZE
+from .states import CELLS
+from .states import POSITION_SIZE
+
+SEQUENCE = struct.Struct('<I')
+SLOT_SIZE = SEQUENCE.size + 2 * CELLS
+MAPPED_ORDER = b'M'
+MAPPED_STATE_SIZE = POSITION_SIZE + 1 + SEQUENCE.size
+SEQUENCE_MASK = 0xFFFFFFFF
+
+
+def _slot_views(buffer, slots: int):
+    """
+    Create the sequences, distances and walls views of the slots ring.
+    """
+    sequences = numpy.ndarray(
+        (slots,), dtype='<u4', buffer=buffer, strides=(SLOT_SIZE,)
+    )
+    shape = (slots, MAZE_SIZE, MAZE_SIZE)
+    strides = (SLOT_SIZE, MAZE_SIZE, 1)
+    distances = numpy.ndarray(
+        shape,
+        dtype='uint8',
+        buffer=buffer,
+        offset=SEQUENCE.size,
+        strides=strides,
+    )
+    walls = numpy.ndarray(
+        shape,
+        dtype='uint8',
+        buffer=buffer,
+        offset=SEQUENCE.size + CELLS,
+        strides=strides,
+    )
+    return sequences, distances, walls
+
+
+def is_mapped_state(state: bytes) -> bool:
+    """
+    Check whether a state, with no `S` prefix, refers to a shared slot.
+    """
+    if len(state) != MAPPED_STATE_SIZE:
+        return False
+    return state[POSITION_SIZE] == ord(MAPPED_ORDER)
+
+
+class SharedStates:
+    """
+    Server side of a shared states file, mapped read-only.
+
+    Parameters
+    ----------
+    fname
+        The shared states file, with a whole number of slots.
+
+    Raises
+    ------
+    ValueError
+        If the file size is not valid.
+    """
+
+    def __init__(self, fname: Path):
+        with open(str(fname), 'rb') as fd:
+            size = Path(str(fname)).stat().st_size
+            if not size or size % SLOT_SIZE:
+                raise ValueError('Invalid shared states file size!')
+            self.mmap = mmap.mmap(fd.fileno(), size, access=mmap.ACCESS_READ)
+        self.slots = size // SLOT_SIZE
+        self.sequences, self.distances, self.walls = _slot_views(
+            self.mmap, self.slots
+        )
+
+    def read(self, sequence: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Get the distances and walls of a state, as views of the file.
+
+        Parameters
+        ----------
+        sequence
+            The state sequence number.
+
+        Returns
+        -------
+            The read-only distances and walls views, indexed as `[x][y]`.
+            They must be copied before the slot is reused.
+
+        Raises
+        ------
+        ValueError
+            If the slot was already reused for a newer state.
+        """
+        slot = sequence % self.slots
+        if self.sequences[slot] != sequence:
+            raise ValueError('State {} was overwritten!'.format(sequence))
+        return self.distances[slot], self.walls[slot]
+
+    def close(self):
+        self.sequences = self.distances = self.walls = None
+        self.mmap.close()
+
+
+class SharedStatesWriter:
+    """
+    Client side of a shared states file.
+
+    Parameters
+    ----------
+    fname
+        The shared states file, which is created (or truncated).
+    slots
+        Number of slots in the ring. One slot is enough if every state is
+        acknowledged by the server before sending the next one. Otherwise,
+        there must be more slots than states in flight (i.e.: sent but not
+        yet processed by the server).
+    """
+
+    def __init__(self, fname: Path, slots: int = 1024):
+        self.fname = Path(fname)
+        with open(str(self.fname), 'w+b') as fd:
+            fd.truncate(slots * SLOT_SIZE)
+            self.mmap = mmap.mmap(fd.fileno(), slots * SLOT_SIZE)
+        self.slots = slots
+        self.sequences, distances, walls = _slot_views(self.mmap, slots)
+        # No state has been written yet
+        self.sequences[:] = SEQUENCE_MASK
+        self.slot_distances = distances
+        self.slot_walls = walls
+        self.sequence = 0
+        self.message = bytearray(b'S' + bytes(MAPPED_STATE_SIZE))
+        self.message[POSITION_SIZE + 1] = ord(MAPPED_ORDER)
+
+    @property
+    def distances(self) -> numpy.ndarray:
+        """
+        Distances of the next state, to be written in place.
+        """
+        return self.slot_distances[self.sequence % self.slots]
+
+    @property
+    def walls(self) -> numpy.ndarray:
+        """
+        Walls of the next state, to be written in place.
+        """
+        return self.slot_walls[self.sequence % self.slots]
+
+    def encode(
+        self, x: int, y: int, direction: str, distances=None, walls=None
+    ) -> bytearray:
+        """
+        Commit the next state and encode the request referring to it.
+
+        Parameters
+        ----------
+        x
+            Mouse x-position.
+        y
+            Mouse y-position.
+        direction
+            Mouse orientation, either the direction name (i.e.: `'north'`)
+            or its initial.
+        distances
+            Cell distances indexed as `[x][y]`. If `None`, the values
+            already written in `self.distances` are used.
+        walls
+            Cell walls indexed as `[x][y]`, with the same rules as for
+            `distances`.
+
+        Returns
+        -------
+            The state request, which is reused for the next state.
+        """
+        if distances is not None:
+            self.distances[:] = distances
+        if walls is not None:
+            self.walls[:] = walls
+        self.sequences[self.sequence % self.slots] = self.sequence
+        self.message[1] = x
+        self.message[2] = y
+        self.message[3] = ord(direction[0].upper())
+        SEQUENCE.pack_into(self.message, POSITION_SIZE + 2, self.sequence)
+        self.sequence = (self.sequence + 1) & SEQUENCE_MASK
+        return self.message
+
+    def register_request(self) -> bytes:
+        """
+        Get the request to register the file with the server.
+        """
+        return b'M' + str(self.fname.resolve()).encode()
+
+    def close(self):
+        self.sequences = self.slot_distances = self.slot_walls = None
+        self.mmap.close()
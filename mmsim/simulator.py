@@ -0,0 +1,189 @@
+"""
+Base class for the world model kept by Python clients (i.e.: solvers).
+
+The walls found by the mouse are stored in a single `uint8` bitmask array
+using the `mazes` wall bits, exactly as sent to the server, so states go
+straight onto the wire. Directions are indexes into `DIRECTIONS` and all the
+direction and rotation arithmetic is done with precomputed lookup tables.
+"""
+from abc import ABCMeta
+from abc import abstractmethod
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import MAZE_SIZE
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import VISITED_BIT
+from .mazes import WEST_BIT
+from .solvers import Cell
+from .solvers import goal_cells
+
+DIRECTIONS = ('north', 'east', 'south', 'west')
+# Wall bit and cell delta of each direction, in `DIRECTIONS` order (unlike
+# the east-first `solvers` constants)
+NESW_BITS = (NORTH_BIT, EAST_BIT, SOUTH_BIT, WEST_BIT)
+NESW_DELTAS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+STEPS = ('front', 'left', 'right', 'back')
+STEP_ROTATIONS = {'front': 0, 'right': 1, 'back': 2, 'left': 3}
+
+# Direction after taking a step, indexed as `[step][direction]`
+DIRECTION_AFTER_STEP = {
+    step: tuple((direction + rotation) % 4 for direction in range(4))
+    for step, rotation in STEP_ROTATIONS.items()
+}
+OPPOSITE_DIRECTIONS = DIRECTION_AFTER_STEP['back']
+
+# Wall bit in the way of each step, indexed as `[direction][step]`
+STEP_BITS = tuple(
+    {step: NESW_BITS[DIRECTION_AFTER_STEP[step][direction]] for step in STEPS}
+    for direction in range(4)
+)
+
+# Walls bitmask of each `(left, front, right)` reading, indexed as
+# `[direction][left << 2 | front << 1 | right]`
+READING_BITS = tuple(
+    tuple(
+        sum(
+            STEP_BITS[direction][step]
+            for shift, step in zip((2, 1, 0), ('left', 'front', 'right'))
+            if reading >> shift & 1
+        )
+        for reading in range(8)
+    )
+    for direction in range(4)
+)
+
+
+class Simulator(metaclass=ABCMeta):
+    """
+    Create and update the world environment as seen by the mouse.
+
+    Subclasses implement `calculate_distances()`, which must update the
+    `distances` array from the `walls` array, and `best_step()`.
+
+    Parameters
+    ----------
+    size
+        Number of cells on each side of the maze.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+    """
+
+    def __init__(
+        self, size: int = MAZE_SIZE, goals: Optional[Iterable[Cell]] = None
+    ):
+        self.size = size
+        if goals is None:
+            goals = goal_cells((size, size))
+        self.goals = tuple(tuple(goal) for goal in goals)
+        self.walls = numpy.zeros((size, size), dtype='uint8')
+        self.distances = numpy.zeros((size, size), dtype='uint16')
+        self.position = (0, 0)
+        self.direction = DIRECTIONS.index('north')
+        self.reset_walls()
+        self.calculate_distances()
+
+    def reset_walls(self):
+        """
+        Forget all the discovered walls, except for the maze boundaries.
+        """
+        self.walls[:] = 0
+        self.walls[0, :] |= WEST_BIT
+        self.walls[-1, :] |= EAST_BIT
+        self.walls[:, 0] |= SOUTH_BIT
+        self.walls[:, -1] |= NORTH_BIT
+
+    def get_distance(self, cell: Cell) -> int:
+        return int(self.distances[cell])
+
+    def set_distance(self, cell: Cell, value: int):
+        self.distances[cell] = value
+
+    def has_wall(self, cell: Cell, direction: int) -> bool:
+        return bool(self.walls[cell] & NESW_BITS[direction])
+
+    def neighbor(self, cell: Cell, direction: int) -> Cell:
+        dx, dy = NESW_DELTAS[direction]
+        return (cell[0] + dx, cell[1] + dy)
+
+    def update_walls(self, left: bool, front: bool, right: bool) -> int:
+        """
+        Add the walls read at the current position.
+
+        Walls are added to the neighbor cells too and the current cell is
+        marked as visited.
+
+        Returns
+        -------
+            The bitmask of the walls read.
+        """
+        bits = READING_BITS[self.direction][left << 2 | front << 1 | right]
+        self.walls[self.position] |= bits | VISITED_BIT
+        for direction, bit in enumerate(NESW_BITS):
+            if not bits & bit:
+                continue
+            neighbor = self.neighbor(self.position, direction)
+            if 0 <= neighbor[0] < self.size and 0 <= neighbor[1] < self.size:
+                opposite = OPPOSITE_DIRECTIONS[direction]
+                self.walls[neighbor] |= NESW_BITS[opposite]
+        return bits
+
+    def position_after_step(self, step: str) -> Cell:
+        direction = DIRECTION_AFTER_STEP[step][self.direction]
+        return self.neighbor(self.position, direction)
+
+    def move(self, step: str):
+        self.position = self.position_after_step(step)
+        self.direction = DIRECTION_AFTER_STEP[step][self.direction]
+
+    def allowed_steps(self) -> List[str]:
+        walls = self.walls[self.position]
+        bits = STEP_BITS[self.direction]
+        return [step for step in STEPS if not walls & bits[step]]
+
+    def distance_after_step(self, step: str) -> int:
+        return self.get_distance(self.position_after_step(step))
+
+    def state(self) -> Tuple[int, int, str, numpy.ndarray, numpy.ndarray]:
+        """
+        Get the exploration state, as accepted by `Client.send_state()`.
+        """
+        x, y = self.position
+        return x, y, DIRECTIONS[self.direction], self.distances, self.walls
+
+    def run(self, client, steps: int = 1000):
+        """
+        Explore the maze until reaching the goal.
+
+        Parameters
+        ----------
+        client
+            The server client, such as a `mmsim.client.Client`, or a
+            `mmsim.Session`.
+        steps
+            Maximum number of steps.
+        """
+        client.reset()
+        for _ in range(steps):
+            x, y = self.position
+            direction = DIRECTIONS[self.direction]
+            self.update_walls(*client.read_walls(x, y, direction))
+            self.calculate_distances()
+            client.send_state(*self.state())
+            if self.position in self.goals:
+                break
+            self.move(self.best_step())
+
+    @abstractmethod
+    def calculate_distances(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def best_step(self) -> str:
+        raise NotImplementedError
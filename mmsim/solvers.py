@@ -0,0 +1,219 @@
+"""
+Ground-truth maze solvers working on the wall arrays from `load_maze()`.
+
+All solvers are built on top of an adjacency table precomputed from the wall
+bits and flood the maze one frontier at a time with NumPy operations.
+"""
+from collections import namedtuple
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import WEST_BIT
+
+UNREACHABLE = -1
+
+# Neighbor order follows the wall bits order: east, south, west, north
+DIRECTION_BITS = (EAST_BIT, SOUTH_BIT, WEST_BIT, NORTH_BIT)
+OPPOSITE_BITS = (WEST_BIT, NORTH_BIT, EAST_BIT, SOUTH_BIT)
+DIRECTION_DELTAS = ((1, 0), (0, -1), (-1, 0), (0, 1))
+
+Cell = Tuple[int, int]
+
+
+def goal_cells(shape: Tuple[int, int]) -> Tuple[Cell, ...]:
+    """
+    Get the default goal cells for a maze with the given shape.
+
+    The goal is the center of the maze: a 2x2 area for even sizes and a
+    single cell for odd sizes.
+
+    Parameters
+    ----------
+    shape
+        The maze shape, as in `walls.shape`.
+
+    Returns
+    -------
+        The goal cells, as `(x, y)` tuples.
+    """
+    axes = []
+    for size in shape:
+        if size % 2:
+            axes.append((size // 2,))
+        else:
+            axes.append((size // 2 - 1, size // 2))
+    return tuple((x, y) for x in axes[0] for y in axes[1])
+
+
+def adjacency(walls: numpy.ndarray) -> numpy.ndarray:
+    """
+    Precompute the adjacency table of a maze.
+
+    A passage between two cells is considered open only when neither of the
+    cells has the wall between them set.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+
+    Returns
+    -------
+        An array with shape `(cells, 4)` containing, for each flat cell index,
+        the flat index of its east, south, west and north neighbors, or
+        `UNREACHABLE` where there is a wall in between.
+    """
+    width, height = walls.shape
+    xs, ys = numpy.indices(walls.shape)
+    neighbors = numpy.full((width, height, 4), UNREACHABLE, dtype='int32')
+    for i, (dx, dy) in enumerate(DIRECTION_DELTAS):
+        nx = xs + dx
+        ny = ys + dy
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        nx = nx.clip(0, width - 1)
+        ny = ny.clip(0, height - 1)
+        open_ = inside
+        open_ &= (walls & DIRECTION_BITS[i]) == 0
+        open_ &= (walls[nx, ny] & OPPOSITE_BITS[i]) == 0
+        neighbors[..., i] = numpy.where(open_, nx * height + ny, UNREACHABLE)
+    return neighbors.reshape(-1, 4)
+
+
+def _flat_cells(cells: Iterable[Cell], shape: Tuple[int, int]):
+    cells = numpy.array(list(cells), dtype='int32').reshape(-1, 2)
+    return cells[:, 0] * shape[1] + cells[:, 1]
+
+
+def distances(
+    walls: numpy.ndarray,
+    goals: Optional[Iterable[Cell]] = None,
+    neighbors: Optional[numpy.ndarray] = None,
+) -> numpy.ndarray:
+    """
+    Compute the exact flood-fill distance map to the goal cells.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+    neighbors
+        An already computed `adjacency()` table for `walls`, if available.
+
+    Returns
+    -------
+        An array with the same shape as `walls` with the number of steps
+        from each cell to the closest goal, or `UNREACHABLE` for cells with
+        no path to the goal.
+    """
+    if goals is None:
+        goals = goal_cells(walls.shape)
+    if neighbors is None:
+        neighbors = adjacency(walls)
+    result = numpy.full(walls.size, UNREACHABLE, dtype='int32')
+    frontier = numpy.unique(_flat_cells(goals, walls.shape))
+    distance = 0
+    while frontier.size:
+        result[frontier] = distance
+        distance += 1
+        candidates = neighbors[frontier].ravel()
+        candidates = candidates[candidates != UNREACHABLE]
+        candidates = candidates[result[candidates] == UNREACHABLE]
+        frontier = numpy.unique(candidates)
+    return result.reshape(walls.shape)
+
+
+def shortest_path(
+    walls: numpy.ndarray,
+    start: Cell = (0, 0),
+    goals: Optional[Iterable[Cell]] = None,
+    distance_map: Optional[numpy.ndarray] = None,
+    neighbors: Optional[numpy.ndarray] = None,
+) -> numpy.ndarray:
+    """
+    Compute a shortest path from the start cell to the goal cells.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+    start
+        The starting cell, as an `(x, y)` tuple.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+    distance_map
+        An already computed `distances()` map for `walls` and `goals`.
+    neighbors
+        An already computed `adjacency()` table for `walls`, if available.
+
+    Returns
+    -------
+        An array with shape `(steps + 1, 2)` with the `(x, y)` cells visited,
+        including both the start and the reached goal cell.
+    """
+    if neighbors is None:
+        neighbors = adjacency(walls)
+    if distance_map is None:
+        distance_map = distances(walls, goals=goals, neighbors=neighbors)
+    flat_distances = distance_map.ravel()
+    height = walls.shape[1]
+    cell = int(_flat_cells([start], walls.shape)[0])
+    if flat_distances[cell] == UNREACHABLE:
+        raise ValueError('No path from {} to the goal!'.format(start))
+    path = [cell]
+    while flat_distances[cell]:
+        options = neighbors[cell]
+        options = options[options != UNREACHABLE]
+        cell = int(options[flat_distances[options].argmin()])
+        path.append(cell)
+    path = numpy.array(path, dtype='int32')
+    return numpy.stack([path // height, path % height], axis=1)
+
+
+Solution = namedtuple('Solution', ['goals', 'distances', 'path'])
+
+
+def solve(
+    walls: numpy.ndarray,
+    start: Cell = (0, 0),
+    goals: Optional[Iterable[Cell]] = None,
+) -> Solution:
+    """
+    Compute the optimal distance map and shortest path of a maze.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+    start
+        The starting cell, as an `(x, y)` tuple.
+    goals
+        The goal cells, as `(x, y)` tuples. Defaults to `goal_cells()`.
+
+    Returns
+    -------
+        The goal cells, the distance map and the shortest path from the
+        start cell. The path is empty if the goal cannot be reached.
+    """
+    if goals is None:
+        goals = goal_cells(walls.shape)
+    goals = tuple(tuple(goal) for goal in goals)
+    neighbors = adjacency(walls)
+    distance_map = distances(walls, goals=goals, neighbors=neighbors)
+    try:
+        path = shortest_path(
+            walls,
+            start=start,
+            distance_map=distance_map,
+            neighbors=neighbors,
+        )
+    except ValueError:
+        path = numpy.empty((0, 2), dtype='int32')
+    return Solution(goals=goals, distances=distance_map, path=path)
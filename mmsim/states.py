@@ -0,0 +1,174 @@
+"""
+Exploration state encoding and decoding.
+
+States are stored as received in the exploration state request, with the `S`
+prefix stripped::
+
+    <x-position><y-position><orientation><order><numbers><order><walls>
+"""
+import struct
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from .mazes import MAZE_SIZE
+
+CELLS = MAZE_SIZE * MAZE_SIZE
+POSITION_SIZE = 3
+
+# Discovery sections (i.e.: the state after the position)
+DISTANCES_ORDER = 0
+DISTANCES = slice(DISTANCES_ORDER + 1, DISTANCES_ORDER + 1 + CELLS)
+WALLS_ORDER = DISTANCES.stop
+WALLS = slice(WALLS_ORDER + 1, WALLS_ORDER + 1 + CELLS)
+
+DELTA_HEADER_SIZE = POSITION_SIZE + 2
+DELTA_DTYPE = numpy.dtype(
+    [('cell', '<u2'), ('distance', 'u1'), ('walls', 'u1')]
+)
+
+
+def decode_cells(order: int, cells: bytes) -> numpy.ndarray:
+    """
+    Decode a cells matrix from the state.
+
+    Parameters
+    ----------
+    order
+        The matrix order byte, either `ord('C')` or `ord('F')`.
+    cells
+        The matrix bytes.
+
+    Returns
+    -------
+        A read-only array indexed as `[x][y]`.
+    """
+    cells = numpy.frombuffer(cells, dtype='uint8')
+    cells = cells.reshape(MAZE_SIZE, MAZE_SIZE)
+    if chr(order) == 'C':
+        cells = cells.T
+    return cells
+
+
+def decode_discovery(
+    discovery: bytes,
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Decode the discovery part of a state (i.e.: distances and walls).
+
+    Parameters
+    ----------
+    discovery
+        The state bytes after the position.
+
+    Returns
+    -------
+        The distances and the walls, indexed as `[x][y]`.
+    """
+    distances = decode_cells(discovery[DISTANCES_ORDER], discovery[DISTANCES])
+    walls = decode_cells(discovery[WALLS_ORDER], discovery[WALLS])
+    return distances, walls
+
+
+def decode_state(state: bytes) -> Tuple[bytes, numpy.ndarray, numpy.ndarray]:
+    """
+    Decode a state.
+
+    Parameters
+    ----------
+    state
+        The state, with no `S` prefix.
+
+    Returns
+    -------
+        The position bytes, the distances and the walls. Arrays are indexed
+        as `[x][y]`.
+    """
+    distances, walls = decode_discovery(state[POSITION_SIZE:])
+    return state[:POSITION_SIZE], distances, walls
+
+
+def encode_state(
+    position: bytes, distances: numpy.ndarray, walls: numpy.ndarray
+) -> bytes:
+    """
+    Encode a state with `F` ordering.
+
+    Parameters
+    ----------
+    position
+        The position bytes.
+    distances
+        Cell distances indexed as `[x][y]`.
+    walls
+        Cell walls indexed as `[x][y]`.
+
+    Returns
+    -------
+        The encoded state, with no `S` prefix.
+    """
+    return b''.join(
+        [
+            position,
+            b'F',
+            numpy.ascontiguousarray(distances, dtype='uint8').tobytes(),
+            b'F',
+            numpy.ascontiguousarray(walls, dtype='uint8').tobytes(),
+        ]
+    )
+
+
+def decode_delta(delta: bytes) -> Tuple[bytes, numpy.ndarray]:
+    """
+    Decode a delta state.
+
+    Parameters
+    ----------
+    delta
+        The delta state, with no `D` prefix.
+
+    Returns
+    -------
+        The position bytes and the changed cells, as an array with
+        `DELTA_DTYPE` type.
+    """
+    count = struct.unpack_from('<H', delta, POSITION_SIZE)[0]
+    changes = numpy.frombuffer(
+        delta, dtype=DELTA_DTYPE, count=count, offset=DELTA_HEADER_SIZE
+    )
+    return delta[:POSITION_SIZE], changes
+
+
+def apply_delta(
+    distances: Optional[numpy.ndarray],
+    walls: Optional[numpy.ndarray],
+    changes: numpy.ndarray,
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Apply the changed cells of a delta state to the previous state.
+
+    Parameters
+    ----------
+    distances
+        The previous distances, indexed as `[x][y]`. If `None`, all of them
+        are considered to be zero.
+    walls
+        The previous walls, indexed as `[x][y]`. If `None`, all of them are
+        considered to be zero.
+    changes
+        The changed cells, as returned by `decode_delta()`.
+
+    Returns
+    -------
+        The new distances and walls. Previous arrays are left untouched.
+    """
+    if distances is None:
+        distances = numpy.zeros((MAZE_SIZE, MAZE_SIZE), dtype='uint8')
+    if walls is None:
+        walls = numpy.zeros((MAZE_SIZE, MAZE_SIZE), dtype='uint8')
+    distances = numpy.array(distances)
+    walls = numpy.array(walls)
+    distances.reshape(-1)[changes['cell']] = changes['distance']
+    walls.reshape(-1)[changes['cell']] = changes['walls']
+    return distances, walls
@@ -0,0 +1,236 @@
+"""
+Maze symmetries and symmetry-canonical hashing.
+
+Any maze has 8 equivalent versions under rotations and reflections (the
+dihedral group of the square). Transforms are applied to the wall arrays
+from `load_maze()` by reordering the cells and remapping the wall bits with
+a lookup table, so that the walls keep pointing in the right direction.
+
+The canonical form of a maze is the minimum (as bytes) of its 8 versions,
+and its hash can be used to find duplicated mazes regardless of their
+orientation.
+"""
+import hashlib
+import json
+from itertools import product
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+import numpy
+
+from .mazes import EAST_BIT
+from .mazes import NORTH_BIT
+from .mazes import SOUTH_BIT
+from .mazes import WEST_BIT
+from .mazes import load_maze
+
+WALL_BITS = EAST_BIT | SOUTH_BIT | WEST_BIT | NORTH_BIT
+
+# Wall bits swapped by each elementary transform
+TRANSPOSE_BITS = ((EAST_BIT, NORTH_BIT), (SOUTH_BIT, WEST_BIT))
+FLIP_X_BITS = ((EAST_BIT, WEST_BIT),)
+FLIP_Y_BITS = ((NORTH_BIT, SOUTH_BIT),)
+
+# Each transform is a (transpose, flip-x, flip-y) tuple, identity first
+TRANSFORMS = tuple(product((False, True), repeat=3))
+
+
+def _swap_bits(value: int, pairs) -> int:
+    for first, second in pairs:
+        swapped = value & ~(first | second)
+        if value & first:
+            swapped |= second
+        if value & second:
+            swapped |= first
+        value = swapped
+    return value
+
+
+def _lookup_table(transpose: bool, flip_x: bool, flip_y: bool):
+    pairs = TRANSPOSE_BITS * transpose
+    pairs += FLIP_X_BITS * flip_x + FLIP_Y_BITS * flip_y
+    return numpy.array(
+        [_swap_bits(value, pairs) for value in range(256)], dtype='uint8'
+    )
+
+
+LOOKUP_TABLES = tuple(_lookup_table(*transform) for transform in TRANSFORMS)
+
+
+def transform(walls: numpy.ndarray, index: int) -> numpy.ndarray:
+    """
+    Apply one of the 8 symmetry transforms to a maze.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`. A batch of mazes
+        stacked along the first axis is accepted too.
+    index
+        The transform index in `TRANSFORMS`.
+
+    Returns
+    -------
+        The transformed walls array.
+    """
+    transpose, flip_x, flip_y = TRANSFORMS[index]
+    walls = numpy.asarray(walls, dtype='uint8')
+    if transpose:
+        walls = walls.swapaxes(-2, -1)
+    if flip_x:
+        walls = walls[..., ::-1, :]
+    if flip_y:
+        walls = walls[..., ::-1]
+    return LOOKUP_TABLES[index][walls]
+
+
+def _lexicographic_argmin(versions: numpy.ndarray) -> numpy.ndarray:
+    """
+    Find the lexicographically smallest version of each row.
+
+    Parameters
+    ----------
+    versions
+        Array with shape `(versions, batch, size)`.
+
+    Returns
+    -------
+        The index of the smallest version for each batch row.
+    """
+    rows = numpy.arange(versions.shape[1])
+    best = versions[0].copy()
+    result = numpy.zeros(len(rows), dtype='int64')
+    for i, candidate in enumerate(versions[1:], start=1):
+        different = candidate != best
+        first = different.argmax(axis=1)
+        smaller = different.any(axis=1)
+        smaller &= candidate[rows, first] < best[rows, first]
+        best[smaller] = candidate[smaller]
+        result[smaller] = i
+    return result
+
+
+def canonical_forms(mazes: numpy.ndarray) -> numpy.ndarray:
+    """
+    Get the canonical form of each maze in a batch.
+
+    The canonical form is the minimum, as bytes, among all the symmetric
+    versions of a maze. For non-square mazes, only the versions with the
+    smallest width are considered. Only the wall bits are taken into account
+    (i.e.: visited bits are ignored).
+
+    Parameters
+    ----------
+    mazes
+        Mazes walls arrays, stacked with shape `(batch, width, height)`.
+
+    Returns
+    -------
+        The canonical forms, stacked as the input mazes.
+    """
+    mazes = numpy.asarray(mazes, dtype='uint8') & WALL_BITS
+    width, height = mazes.shape[1:]
+    indexes = [
+        i
+        for i, (transpose, _, _) in enumerate(TRANSFORMS)
+        if width == height or transpose == (width > height)
+    ]
+    versions = numpy.stack([transform(mazes, i) for i in indexes])
+    flat = versions.reshape(len(indexes), len(mazes), -1)
+    best = _lexicographic_argmin(flat)
+    return versions[best, numpy.arange(len(mazes))]
+
+
+def canonical_form(walls: numpy.ndarray) -> numpy.ndarray:
+    """
+    Get the canonical form of a maze.
+
+    See `canonical_forms()` for details.
+
+    Parameters
+    ----------
+    walls
+        The maze walls array, indexed as `walls[x][y]`.
+
+    Returns
+    -------
+        The canonical form of the maze.
+    """
+    return canonical_forms(numpy.asarray(walls)[None])[0]
+
+
+def canonical_hashes(mazes: numpy.ndarray) -> List[str]:
+    """
+    Get the symmetry-canonical hash of each maze in a batch.
+
+    Parameters
+    ----------
+    mazes
+        Mazes walls arrays, stacked with shape `(batch, width, height)`.
+
+    Returns
+    -------
+        The hexadecimal SHA-256 digest of each maze canonical form, which is
+        the same for all the rotated and reflected versions of a maze.
+    """
+    hashes = []
+    for canonical in canonical_forms(mazes):
+        digest = hashlib.sha256('{}x{}:'.format(*canonical.shape).encode())
+        digest.update(numpy.ascontiguousarray(canonical).tobytes())
+        hashes.append(digest.hexdigest())
+    return hashes
+
+
+def canonical_hash(walls: numpy.ndarray) -> str:
+    """
+    Get the symmetry-canonical hash of a maze.
+
+    See `canonical_hashes()` for details.
+    """
+    return canonical_hashes(numpy.asarray(walls)[None])[0]
+
+
+def build_index(path: Path) -> Dict[str, List[str]]:
+    """
+    Build a duplicates index for a maze files collection.
+
+    Parameters
+    ----------
+    path
+        Path of the collection, with maze files in text format.
+
+    Returns
+    -------
+        A dictionary mapping canonical hashes to the sorted list of maze
+        files, relative to `path`, with that hash.
+    """
+    index = {}
+    for fname in sorted(path.glob('**/*.txt')):
+        key = canonical_hash(load_maze(fname))
+        index.setdefault(key, []).append(str(fname.relative_to(path)))
+    return index
+
+
+def save_index(index: Dict[str, List[str]], path: Path):
+    """
+    Save a duplicates index as JSON.
+    """
+    path.write_text(json.dumps(index, indent=2, sort_keys=True))
+
+
+def load_index(path: Path) -> Dict[str, List[str]]:
+    """
+    Load a duplicates index saved with `save_index()`.
+    """
+    return json.loads(path.read_text())
+
+
+def duplicates(index: Dict[str, List[str]]) -> Iterable[List[str]]:
+    """
+    Iterate over the groups of equivalent maze files in an index.
+    """
+    for key in sorted(index):
+        if len(index[key]) > 1:
+            yield index[key]
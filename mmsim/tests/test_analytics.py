@@ -0,0 +1,137 @@
+import numpy
+
+import pytest
+from mmsim.analytics import VisitHeatmap
+from mmsim.analytics import backtracking_ratio
+from mmsim.analytics import discovered_cells
+from mmsim.analytics import revisits
+from mmsim.analytics import summary
+from mmsim.analytics import think_time_percentiles
+from mmsim.analytics import time_to_goal
+from mmsim.analytics import visit_counts
+from mmsim.history import HISTORY_DTYPE
+from mmsim.history import History
+
+# Forward three cells, turn in place, back two cells, forward to the goal
+POSES = [
+    (0, 0, 'N'),
+    (0, 1, 'N'),
+    (0, 2, 'N'),
+    (0, 2, 'S'),
+    (0, 1, 'S'),
+    (0, 0, 'S'),
+    (1, 0, 'E'),
+    (2, 0, 'E'),
+]
+
+
+@pytest.fixture
+def states():
+    history = History()
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    distances = numpy.zeros((16, 16), dtype='uint8')
+    for x, y, direction in POSES:
+        walls[x][y] |= 1
+        history.append(x, y, direction, distances, walls)
+    return history.states
+
+
+def test_discovered_cells(states):
+    """
+    Test `discovered_cells()` function.
+    """
+    assert discovered_cells(states).tolist() == [1, 2, 3, 3, 3, 3, 4, 5]
+
+
+def test_visit_counts(states):
+    """
+    Test `visit_counts()` function.
+    """
+    counts = visit_counts(states)
+    assert counts.shape == (16, 16)
+    assert counts[0, 0] == 2
+    assert counts[0, 2] == 2
+    assert counts.sum() == len(POSES)
+
+
+def test_revisits(states):
+    """
+    Test `revisits()` and `backtracking_ratio()` functions.
+    """
+    expected = [False, False, False, False, True, True, False, False]
+    assert revisits(states).tolist() == expected
+    assert backtracking_ratio(states) == pytest.approx(2 / 6)
+    assert backtracking_ratio(states[:1]) == 0
+
+
+def test_time_to_goal(states):
+    """
+    Test `time_to_goal()` function.
+    """
+    assert time_to_goal(states, goals=[(2, 0)]) == 7
+    assert time_to_goal(states, goals=[(0, 1), (2, 0)]) == 1
+    assert time_to_goal(states) == -1
+
+
+def test_summary(states):
+    """
+    Test `summary()` function.
+    """
+    assert summary(states, goals=[(2, 0)]) == {
+        'steps': 8,
+        'discovered': 5,
+        'visited': 5,
+        'revisits': 2,
+        'backtracking': pytest.approx(2 / 6),
+        'time_to_goal': 7,
+    }
+    assert summary(states[:0])['steps'] == 0
+
+
+@pytest.mark.parametrize('interval', [1, 3, 64])
+def test_visit_heatmap(states, interval):
+    """
+    Test `VisitHeatmap` class.
+    """
+    heatmap = VisitHeatmap(interval=interval)
+    heatmap.update(states[:5])
+    heatmap.update(states[:5])
+    heatmap.update(states)
+    for index in range(len(states)):
+        visits, turns = heatmap.at(index)
+        assert (visits == visit_counts(states[: index + 1])).all()
+    visits, turns = heatmap.at(len(states) - 1)
+    assert turns[0][2] == 1
+    assert turns[1][0] == 1
+    assert turns.sum() == 2
+    heatmap.reset()
+    assert heatmap.size == 0
+
+
+def test_visit_heatmap_large_counts():
+    """
+    Test `VisitHeatmap` class with counts that do not fit in 16 bits.
+    """
+    states = numpy.zeros(70000, dtype=HISTORY_DTYPE)
+    states['direction'] = ord('N')
+    states['direction'][1::2] = ord('E')
+    heatmap = VisitHeatmap()
+    heatmap.update(states)
+    visits, turns = heatmap.at(len(states) - 1)
+    assert visits[0][0] == 70000
+    assert turns[0][0] == 69999
+    assert heatmap.at(99)[0][0][0] == 100
+
+
+def test_think_time_percentiles(states):
+    """
+    Test `think_time_percentiles()` function, ignoring unknown times.
+    """
+    result = think_time_percentiles(states)
+    assert result['count'] == 0
+    assert numpy.isnan(result['p50'])
+    states['think_time'][1:] = numpy.arange(1, 8) / 100
+    result = think_time_percentiles(states)
+    assert result['count'] == 7
+    assert result['p50'] == pytest.approx(0.04)
+    assert result['max'] == pytest.approx(0.07)
@@ -0,0 +1,33 @@
+import pytest
+from mmsim.cache import LRUCache
+
+
+def test_lru_cache():
+    """
+    Test `LRUCache` class eviction order and counters.
+    """
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.get('b', 0) == 0
+    assert len(cache) == 2
+    cache.put('a', 4)
+    cache.put('d', 5)
+    assert cache.get('a') == 4
+    assert 'c' not in cache
+    assert cache.hits == 2
+    assert cache.misses == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_invalid():
+    """
+    Test `LRUCache` class with an invalid size.
+    """
+    with pytest.raises(ValueError):
+        LRUCache(0)
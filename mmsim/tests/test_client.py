@@ -0,0 +1,202 @@
+import struct
+from threading import Thread
+
+import numpy
+import zmq
+
+import pytest
+from mmsim.client import STATE_SIZE
+from mmsim.client import Client
+from mmsim.client import PipelinedClient
+from mmsim.client import StateBuffer
+
+
+def legacy_state(x, y, direction, distances, walls):
+    """
+    Build a state request the way the original examples do.
+    """
+    state = b'S' + struct.pack('2B', x, y) + direction.encode()
+    state += b'F'
+    for row in distances:
+        for distance in row:
+            state += struct.pack('B', distance)
+    state += b'F'
+    for row in walls:
+        for wall in row:
+            state += struct.pack('B', wall)
+    return state
+
+
+@pytest.fixture
+def server():
+    """
+    Fake server replying to every request with the request itself, except
+    for wall readings, which reply with the position only, and distances
+    requests, which reply as if no maze was loaded.
+    """
+    context = zmq.Context.instance()
+    rep = context.socket(zmq.REP)
+    rep.bind('inproc://test-client')
+
+    def echo():
+        while True:
+            message = rep.recv()
+            if message.startswith(b'W'):
+                rep.send(message[1:])
+                continue
+            if message == b'distances':
+                rep.send(b'')
+                continue
+            rep.send(message)
+            if message == b'reset':
+                break
+
+    thread = Thread(target=echo)
+    thread.start()
+    yield 'inproc://test-client'
+    thread.join()
+    rep.close()
+
+
+@pytest.fixture
+def router():
+    """
+    Fake ROUTER server replying to every request with the request itself,
+    after receiving all of them, and in reverse order.
+    """
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.ROUTER)
+    socket.bind('inproc://test-pipelined-client')
+
+    def echo():
+        requests = []
+        while True:
+            frames = socket.recv_multipart()
+            requests.append(frames)
+            if frames[-1] == b'reset':
+                break
+        for frames in reversed(requests):
+            socket.send_multipart(frames)
+
+    thread = Thread(target=echo)
+    thread.start()
+    yield 'inproc://test-pipelined-client'
+    thread.join()
+    socket.close()
+
+
+def test_state_buffer_encode():
+    """
+    Encoded states match the original examples encoding.
+    """
+    distances = numpy.arange(256).reshape(16, 16) % 200
+    walls = (numpy.arange(256).reshape(16, 16) * 7) % 32
+    state = StateBuffer()
+    result = state.encode(3, 4, 'east', distances, walls)
+    assert len(result) == STATE_SIZE
+    expected = legacy_state(3, 4, 'E', distances.tolist(), walls.tolist())
+    assert bytes(result) == expected
+
+
+def test_state_buffer_encode_reuse():
+    """
+    Encoding reuses the same buffer and accepts bytes-like inputs.
+    """
+    state = StateBuffer()
+    first = state.encode(0, 0, 'N', bytes(256), bytearray(256))
+    state.walls[1][2] = 9
+    second = state.encode(1, 0, 'S')
+    assert first is second
+    assert second[1:4] == b'\x01\x00S'
+    assert second[262 + 1 * 16 + 2] == 9
+
+
+def test_state_buffer_encode_clip():
+    """
+    Out of range distances are clipped.
+    """
+    distances = numpy.full((16, 16), numpy.inf)
+    state = StateBuffer()
+    state.encode(0, 0, 'N', distances=distances)
+    assert (state.distances == 255).all()
+
+
+def test_client(server):
+    """
+    Test `Client` requests against an echo server.
+    """
+    client = Client(endpoint=server)
+    assert client.ping() == b'ping'
+    assert client.read_walls(1, 0, 'west') == (1, 0, 87)
+    reply = client.send_state(0, 1, 'N', bytes(256), bytes(256))
+    assert reply == b'S\x00\x01NF' + bytes(256) + b'F' + bytes(256)
+    assert client.distances() is None
+    assert client.reset() == b'reset'
+    client.close()
+
+
+def test_pipelined_client(router):
+    """
+    Test `PipelinedClient` matching replies received out of order.
+    """
+    client = PipelinedClient(endpoint=router)
+    state = client.send_state(0, 1, 'N', bytes(256), bytes(256))
+    ping = client.submit(b'ping')
+    reset = client.submit(b'reset')
+    assert client.wait(reset) == b'reset'
+    assert client.wait(ping) == b'ping'
+    assert state not in client.replies
+    client.flush()
+    assert not client.pending
+    assert not client.replies
+    client.close()
+
+
+def test_client_stream():
+    """
+    Test `Client` pushing states to a stream endpoint.
+    """
+    context = zmq.Context.instance()
+    pull = context.socket(zmq.PULL)
+    pull.bind('inproc://test-client-stream')
+    client = Client(
+        endpoint='inproc://unused', stream='inproc://test-client-stream'
+    )
+    assert client.send_state(0, 1, 'N', bytes(256), bytes(256)) is None
+    assert client.send_state(0, 2, 'N') is None
+    assert pull.recv()[1:4] == b'\x00\x01N'
+    assert pull.recv()[1:4] == b'\x00\x02N'
+    client.close()
+    pull.close()
+
+
+def test_client_delta():
+    """
+    Test `Client` sending delta states with periodic full resyncs.
+    """
+    context = zmq.Context.instance()
+    pull = context.socket(zmq.PULL)
+    pull.bind('inproc://test-client-delta')
+    client = Client(
+        endpoint='inproc://unused',
+        stream='inproc://test-client-delta',
+        resync=3,
+    )
+    distances = numpy.zeros((16, 16), dtype='uint8')
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    client.send_state(0, 0, 'N', distances, walls)
+    distances[0][1] = 5
+    walls[0][1] = 1
+    client.send_state(0, 1, 'N', distances, walls)
+    client.send_state(0, 1, 'E', distances, walls)
+    client.send_state(0, 1, 'E', distances, walls)
+    full = pull.recv()
+    assert full[:1] == b'S'
+    assert len(full) == STATE_SIZE
+    delta = pull.recv()
+    assert delta == b'D\x00\x01N\x01\x00\x01\x00\x05\x01'
+    delta = pull.recv()
+    assert delta == b'D\x00\x01E\x00\x00'
+    assert pull.recv()[:1] == b'S'
+    client.close()
+    pull.close()
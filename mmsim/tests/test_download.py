@@ -1,13 +1,100 @@
+import hashlib
+import io
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
 from pathlib import Path
+from socketserver import ThreadingMixIn
 from tarfile import TarInfo
 from tempfile import TemporaryDirectory
 
 import pytest
+from mmsim.download import MazeStore
+from mmsim.download import Source
 from mmsim.download import clean_tar_members
+from mmsim.download import download_mazes
 from mmsim.download import download_micromouseonline_mazes
+from mmsim.download import fetch_archive
+from mmsim.download import parse_source
 from mmsim.download import select_tar_members
 
 
+def make_archive(files):
+    """
+    Create a `.tar.gz` archive with a top-level directory.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name, data in files.items():
+            member = TarInfo('mazefiles-master/' + name)
+            member.size = len(data)
+            tar.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serve the server `files`, with support for single range requests and,
+    if the server `etags` is set, ETags and `If-Range` requests.
+    """
+
+    def do_GET(self):  # noqa: N802
+        self.server.requests.append(
+            (
+                self.path,
+                self.headers.get('Range'),
+                self.headers.get('If-Range'),
+            )
+        )
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        etag = '"{}"'.format(hashlib.sha256(data).hexdigest()[:16])
+        if_range = self.headers.get('If-Range')
+        start = 0
+        if self.headers.get('Range') and if_range in (None, etag):
+            start = int(self.headers['Range'].strip('bytes=-'))
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header(
+                'Content-Range',
+                'bytes {}-{}/{}'.format(start, len(data) - 1, len(data)),
+            )
+        else:
+            self.send_response(200)
+        if self.server.etags:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    server.files = {}
+    server.etags = True
+    server.requests = []
+    server.url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
 def test_clean_tar_members():
     """
     Test `clean_tar_members()` function.
@@ -55,3 +142,139 @@ def test_download_micromouseonline_mazes():
         download_micromouseonline_mazes(tmpdir)
         assert (tmpdir / 'classic').is_dir()
         assert (tmpdir / 'classic' / 'apec2010.txt').is_file()
+
+
+@pytest.mark.parametrize(
+    'text,expected',
+    [
+        ('/some/path', Source('/some/path', None)),
+        ('http://x/a.tar.gz', Source('http://x/a.tar.gz', None)),
+        ('a.tar.gz#sha256=' + 'A' * 64, Source('a.tar.gz', 'a' * 64)),
+    ],
+)
+def test_parse_source(text, expected):
+    """
+    Test `parse_source()` function.
+    """
+    assert parse_source(text) == expected
+
+
+@pytest.mark.parametrize(
+    'text', ['', '#sha256=' + 'a' * 64, 'a#md5=00', 'a#sha256=0a', 'a#sha256']
+)
+def test_parse_source_invalid(text):
+    """
+    Test `parse_source()` function with invalid sources.
+    """
+    with pytest.raises(ValueError):
+        parse_source(text)
+
+
+def test_maze_store(tmpdir):
+    """
+    Test `MazeStore` class.
+    """
+    tmpdir = Path(str(tmpdir))
+    store = MazeStore(tmpdir / 'store')
+    digest = store.add(b'maze')
+    assert digest == hashlib.sha256(b'maze').hexdigest()
+    assert store.add(b'maze') == digest
+    assert store.object_path(digest).read_bytes() == b'maze'
+    store.checkout(digest, tmpdir / 'a' / 'b.txt')
+    store.checkout(digest, tmpdir / 'a' / 'b.txt')
+    assert (tmpdir / 'a' / 'b.txt').read_bytes() == b'maze'
+    assert len(list((tmpdir / 'store').glob('**/*'))) == 3
+    # Editing the collection does not change the stored contents
+    with open(str(tmpdir / 'a' / 'b.txt'), 'r+b') as fd:
+        fd.write(b'edit')
+    assert store.object_path(digest).read_bytes() == b'maze'
+
+
+def test_fetch_archive_resume(server, tmpdir):
+    """
+    Test `fetch_archive()` function resuming a partial download.
+    """
+    tmpdir = Path(str(tmpdir))
+    data = bytes(range(256)) * 1000
+    server.files['/a.tar.gz'] = data
+    sha256 = hashlib.sha256(data).hexdigest()
+    source = Source(server.url + '/a.tar.gz', sha256)
+    fname = fetch_archive(source, tmpdir)
+    assert fname.read_bytes() == data
+    # Interrupted download
+    with open(str(fname), 'r+b') as fd:
+        fd.truncate(1000)
+    assert fetch_archive(source, tmpdir).read_bytes() == data
+    # Completed download
+    assert fetch_archive(source, tmpdir).read_bytes() == data
+    assert [r for _, r, _ in server.requests] == [
+        None,
+        'bytes=1000-',
+        'bytes={}-'.format(len(data)),
+    ]
+    etag = '"{}"'.format(sha256[:16])
+    assert [i for _, _, i in server.requests] == [None, etag, etag]
+
+
+@pytest.mark.parametrize('etags', [True, False])
+def test_fetch_archive_resume_changed(server, tmpdir, etags):
+    """
+    Test `fetch_archive()` function resuming a download that changed, with
+    no checksum to verify it.
+    """
+    tmpdir = Path(str(tmpdir))
+    server.etags = etags
+    server.files['/a.tar.gz'] = bytes(range(256)) * 1000
+    source = Source(server.url + '/a.tar.gz', None)
+    fname = fetch_archive(source, tmpdir)
+    # Interrupted download, changed before resuming
+    with open(str(fname), 'r+b') as fd:
+        fd.truncate(1000)
+    data = bytes(range(255, -1, -1)) * 1000
+    server.files['/a.tar.gz'] = data
+    assert fetch_archive(source, tmpdir).read_bytes() == data
+    expected = 'bytes=1000-' if etags else None
+    assert [r for _, r, _ in server.requests] == [None, expected]
+
+
+def test_fetch_archive_checksum(server, tmpdir):
+    """
+    Test `fetch_archive()` function with a corrupted download.
+    """
+    tmpdir = Path(str(tmpdir))
+    server.files['/a.tar.gz'] = b'corrupted'
+    source = Source(server.url + '/a.tar.gz', 'a' * 64)
+    with pytest.raises(ValueError):
+        fetch_archive(source, tmpdir)
+    assert not list(tmpdir.iterdir())
+
+
+def test_download_mazes(server, tmpdir):
+    """
+    Test `download_mazes()` function with remote and local sources.
+    """
+    tmpdir = Path(str(tmpdir))
+    first = make_archive({'classic/a.txt': b'a', 'README.md': b'readme'})
+    second = make_archive({'classic/a.txt': b'b', 'other/c.txt': b'a'})
+    server.files['/first.tar.gz'] = first
+    server.files['/second.tar.gz'] = second
+    local = tmpdir / 'local'
+    (local / 'x').mkdir(parents=True)
+    (local / 'x' / 'd.txt').write_bytes(b'd')
+    sources = [
+        server.url + '/first.tar.gz',
+        Source(
+            server.url + '/second.tar.gz', hashlib.sha256(second).hexdigest()
+        ),
+        str(local),
+    ]
+    collection = tmpdir / 'collection'
+    manifest = download_mazes(collection, sources, jobs=2)
+    assert sorted(manifest) == ['classic/a.txt', 'other/c.txt', 'x/d.txt']
+    assert (collection / 'classic' / 'a.txt').read_bytes() == b'a'
+    assert (collection / 'other' / 'c.txt').read_bytes() == b'a'
+    assert (collection / 'x' / 'd.txt').read_bytes() == b'd'
+    assert not (collection / 'README.md').exists()
+    objects = (collection / '.store' / 'objects').glob('*/*')
+    assert len(list(objects)) == 3
+    assert not list((collection / '.store' / 'downloads').iterdir())
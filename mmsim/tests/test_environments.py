@@ -0,0 +1,86 @@
+import numpy
+
+from mmsim.environments import BACK
+from mmsim.environments import EAST
+from mmsim.environments import FRONT
+from mmsim.environments import LEFT
+from mmsim.environments import NORTH
+from mmsim.environments import RIGHT
+from mmsim.environments import VectorEnvironment
+from mmsim.mazes import read_walls
+from mmsim.solvers import shortest_path
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+
+def test_read_walls():
+    """
+    Batched wall readings match `read_walls()` readings.
+    """
+    environment = VectorEnvironment([MAZE_00] * 4)
+    environment.x[:] = [0, 3, 3, 4]
+    environment.y[:] = [0, 2, 3, 4]
+    environment.heading[:] = [EAST, NORTH, 1, 2]
+    result = environment.read_walls()
+    for i in range(4):
+        x, y = environment.x[i], environment.y[i]
+        direction = 'ESWN'[environment.heading[i]]
+        assert tuple(result[i]) == read_walls(MAZE_00, x, y, direction)
+
+
+def test_step():
+    """
+    Test `VectorEnvironment.step()`.
+    """
+    # Same maze, but starting cell open to the north instead of the east
+    maze = MAZE_00.copy()
+    maze[0, 0] = 14
+    maze[0, 1] = 8
+    maze[1, 0] = 28
+    environment = VectorEnvironment([MAZE_00, maze])
+    # Turn right (towards the east)
+    walls, done, blocked = environment.step(numpy.array([RIGHT, RIGHT]))
+    assert blocked.tolist() == [False, True]
+    assert environment.x.tolist() == [1, 0]
+    assert environment.y.tolist() == [0, 0]
+    assert environment.heading.tolist() == [EAST, EAST]
+    assert environment.steps.tolist() == [1, 0]
+    assert not done.any()
+    # Turn back and forth
+    environment.step(numpy.array([BACK, LEFT]))
+    assert environment.x.tolist() == [0, 0]
+    assert environment.y.tolist() == [0, 1]
+    assert environment.discovered[0, 1, 0] == MAZE_00[1, 0] | 1
+    environment.reset(numpy.array([True, False]))
+    assert environment.x.tolist() == [0, 0]
+    assert environment.y.tolist() == [0, 1]
+    assert environment.steps.tolist() == [0, 1]
+    assert environment.discovered[0, 1, 0] == 0
+
+
+def test_step_done():
+    """
+    Robots reach the goal following the shortest path and stop there.
+    """
+    environment = VectorEnvironment([MAZE_00])
+    path = shortest_path(MAZE_00)
+    headings = {(1, 0): EAST, (0, -1): 1, (-1, 0): 2, (0, 1): NORTH}
+    done = numpy.array([False])
+    for (x0, y0), (x1, y1) in zip(path[:-1], path[1:]):
+        assert not done.any()
+        heading = headings[(x1 - x0, y1 - y0)]
+        action = (heading - environment.heading) % 4
+        _, done, blocked = environment.step(action)
+        assert not blocked.any()
+    assert done.all()
+    assert environment.steps[0] == len(path) - 1
+    environment.step(numpy.array([FRONT]))
+    assert environment.steps[0] == len(path) - 1
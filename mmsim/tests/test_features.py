@@ -0,0 +1,130 @@
+import numpy
+
+import pytest
+from mmsim.features import COLUMNS
+from mmsim.features import build_features
+from mmsim.features import is_predicate
+from mmsim.features import load_features
+from mmsim.features import maze_features
+from mmsim.features import parse_name
+from mmsim.features import query
+from mmsim.features import save_features
+from mmsim.mazes import save_maze
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+FEATURES = {
+    'name': numpy.array(['a/apec2010.txt', 'b/uk2012.txt', 'c/maze.txt']),
+    'competition': numpy.array(['apec', 'uk', '']),
+    'year': numpy.array([2010, 2012, 0]),
+    'path_len': numpy.array([90, 70, 85]),
+    'turns': numpy.array([20, 40, 35]),
+}
+
+
+@pytest.mark.parametrize(
+    'fname,expected',
+    [
+        ('classic/apec2010.txt', ('apec', 2010)),
+        ('classic/alljapan-2012-fr.txt', ('alljapan', 2012)),
+        ('classic/japan2017ef.txt', ('japan', 2017)),
+        ('classic/maze12345.txt', ('', 0)),
+        ('classic/minos.txt', ('', 0)),
+    ],
+)
+def test_parse_name(fname, expected):
+    """
+    Test `parse_name()` function.
+    """
+    assert parse_name(fname) == expected
+
+
+def test_maze_features():
+    """
+    Test `maze_features()` function.
+    """
+    assert maze_features(MAZE_00) == {
+        'width': 5,
+        'height': 5,
+        'path_len': 12,
+        'dead_ends': 4,
+        'loops': 1,
+        'longest_straight': 5,
+        'turns': 7,
+    }
+
+
+def test_maze_features_unreachable():
+    """
+    Test `maze_features()` function when the goal cannot be reached.
+    """
+    walls = numpy.array(MAZE_00)
+    walls[2, 2] = 30
+    features = maze_features(walls)
+    assert features['path_len'] == -1
+    assert features['turns'] == -1
+
+
+@pytest.mark.parametrize(
+    'text,expected',
+    [
+        ('', [True, True, True]),
+        ('path_len>80', [True, False, True]),
+        ('path_len>80 turns<30', [True, False, False]),
+        ('year>=2012', [False, True, False]),
+        ('competition=uk', [False, True, False]),
+        ('competition!=uk path_len==85', [False, False, True]),
+    ],
+)
+def test_query(text, expected):
+    """
+    Test `query()` function.
+    """
+    assert query(FEATURES, text).tolist() == expected
+
+
+@pytest.mark.parametrize('text', ['path_len', 'foo>3', 'turns<many'])
+def test_query_invalid(text):
+    """
+    Test `query()` function with invalid predicates.
+    """
+    with pytest.raises(ValueError):
+        query(FEATURES, text)
+
+
+def test_is_predicate():
+    """
+    Test `is_predicate()` function.
+    """
+    assert is_predicate('turns<=30')
+    assert not is_predicate('apec')
+
+
+def test_build_features(tmp_path):
+    """
+    Test building, saving and loading a features index.
+    """
+    (tmp_path / 'classic').mkdir()
+    save_maze(MAZE_00, tmp_path / 'classic' / 'apec2010.txt')
+    save_maze(MAZE_00, tmp_path / 'classic' / 'maze.txt')
+    features = build_features(tmp_path, jobs=1)
+    assert sorted(features) == sorted(COLUMNS)
+    assert features['name'].tolist() == [
+        'classic/apec2010.txt',
+        'classic/maze.txt',
+    ]
+    assert features['year'].tolist() == [2010, 0]
+    assert features['path_len'][0] == 12
+    save_features(features, tmp_path / 'features.npz')
+    loaded = load_features(tmp_path / 'features.npz')
+    assert sorted(loaded) == sorted(features)
+    for column in features:
+        assert (loaded[column] == features[column]).all()
@@ -0,0 +1,80 @@
+import numpy
+
+import pytest
+from mmsim.floodfill import INFINITY
+from mmsim.floodfill import FloodFill
+from mmsim.generator import generate_maze
+from mmsim.mazes import EAST_BIT
+from mmsim.mazes import NORTH_BIT
+from mmsim.mazes import SOUTH_BIT
+from mmsim.mazes import VISITED_BIT
+from mmsim.mazes import WEST_BIT
+from mmsim.solvers import UNREACHABLE
+from mmsim.solvers import distances
+
+WALL_BITS = EAST_BIT | SOUTH_BIT | WEST_BIT | NORTH_BIT
+
+
+def expected_distances(walls):
+    result = distances(walls).astype('int64')
+    result[result == UNREACHABLE] = INFINITY
+    return result
+
+
+def test_floodfill_reset():
+    """
+    Test `FloodFill` initial state, with only the boundary walls.
+    """
+    floodfill = FloodFill(16)
+    assert floodfill.walls[0, 5] == WEST_BIT
+    assert floodfill.walls[0, 0] == WEST_BIT | SOUTH_BIT
+    assert floodfill.walls[15, 15] == EAST_BIT | NORTH_BIT
+    assert floodfill.distances[0, 0] == 14
+    assert floodfill.distances[7, 7] == 0
+    expected = expected_distances(floodfill.walls)
+    assert (floodfill.distances == expected).all()
+
+
+def test_floodfill_add_walls():
+    """
+    Test `FloodFill.add_walls()` method.
+    """
+    floodfill = FloodFill(4, goals=[(3, 3)])
+    floodfill.add_walls(1, 1, EAST_BIT | NORTH_BIT)
+    assert floodfill.walls[1, 1] == EAST_BIT | NORTH_BIT | VISITED_BIT
+    assert floodfill.walls[2, 1] == WEST_BIT
+    assert floodfill.walls[1, 2] == SOUTH_BIT
+    floodfill.add_walls(0, 0, EAST_BIT, visited=False)
+    assert floodfill.walls[0, 0] == EAST_BIT | SOUTH_BIT | WEST_BIT
+    assert sorted(floodfill.dirty) == [0, 4, 5, 5, 6, 9]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_floodfill_update(seed):
+    """
+    Test `FloodFill.update()` against a full flood after each discovery.
+    """
+    random = numpy.random.RandomState(seed)
+    maze = generate_maze(16, random=random)
+    floodfill = FloodFill(16)
+    for x, y in random.permutation(numpy.indices((16, 16)).reshape(2, -1).T):
+        floodfill.add_walls(x, y, maze[x, y] & WALL_BITS)
+        floodfill.update()
+        expected = expected_distances(floodfill.walls)
+        assert (floodfill.distances == expected).all()
+    assert (floodfill.distances == expected_distances(maze)).all()
+
+
+def test_floodfill_update_unreachable():
+    """
+    Test `FloodFill.update()` when cells are isolated from the goal.
+    """
+    floodfill = FloodFill(4, goals=[(3, 3)])
+    floodfill.add_walls(0, 0, EAST_BIT)
+    floodfill.add_walls(0, 1, NORTH_BIT)
+    assert floodfill.update() == []
+    floodfill.add_walls(0, 1, EAST_BIT)
+    assert sorted(floodfill.update()) == [0, 1]
+    assert floodfill.distances[0, 0] == INFINITY
+    assert floodfill.distances[0, 1] == INFINITY
+    assert floodfill.distances[1, 0] == 5
@@ -0,0 +1,102 @@
+from io import StringIO
+
+import numpy
+
+import pytest
+from mmsim.generator import generate_maze
+from mmsim.generator import generate_mazes
+from mmsim.mazes import EAST_BIT
+from mmsim.mazes import NORTH_BIT
+from mmsim.mazes import SOUTH_BIT
+from mmsim.mazes import WEST_BIT
+from mmsim.mazes import load_maze
+from mmsim.mazes import save_maze
+from mmsim.solvers import UNREACHABLE
+from mmsim.solvers import adjacency
+from mmsim.solvers import distances
+from mmsim.solvers import goal_cells
+
+
+def bare_posts(walls):
+    """
+    Count the inner posts with no walls attached.
+    """
+    lower = walls[:-1, :-1] & (EAST_BIT | NORTH_BIT)
+    upper = walls[1:, 1:] & (WEST_BIT | SOUTH_BIT)
+    return ((lower | upper) == 0).sum()
+
+
+def goal_openings(walls):
+    """
+    Count the open passages from the goal cells, inside and outside the goal
+    region.
+    """
+    height = walls.shape[1]
+    goals = {x * height + y for x, y in goal_cells(walls.shape)}
+    neighbors = adjacency(walls)[sorted(goals)]
+    neighbors = neighbors[neighbors != UNREACHABLE]
+    inside = sum(neighbor in goals for neighbor in neighbors)
+    return inside, len(neighbors) - inside
+
+
+@pytest.mark.parametrize(
+    'size,openings', [(4, (8, 1)), (5, (0, 1)), (16, (8, 1)), (17, (0, 1))]
+)
+def test_generate_maze(size, openings):
+    """
+    Test `generate_maze()` function.
+    """
+    random = numpy.random.RandomState(0)
+    for _ in range(20):
+        walls = generate_maze(size, random=random)
+        assert walls.shape == (size, size)
+        assert (distances(walls) != UNREACHABLE).all()
+        assert walls[0, 0] == EAST_BIT | SOUTH_BIT | WEST_BIT
+        assert goal_openings(walls) == openings
+        assert bare_posts(walls) == (size % 2 == 0)
+
+
+def test_generate_maze_loops():
+    """
+    Loops remove extra walls without leaving bare posts.
+    """
+    random = numpy.random.RandomState(0)
+    tree = generate_maze(16, loops=0, random=random)
+    # A spanning tree plus the cycle inside the goal region
+    opened = (adjacency(tree) != UNREACHABLE).sum()
+    assert opened == 2 * (16 * 16 - 1 + 1)
+    random = numpy.random.RandomState(0)
+    loops = generate_maze(16, loops=0.1, random=random)
+    assert (adjacency(loops) != UNREACHABLE).sum() > opened
+    assert bare_posts(loops) == 1
+
+
+def test_generate_mazes():
+    """
+    Test `generate_mazes()` function.
+    """
+    mazes = generate_mazes(5, size=8, seed=1, jobs=1)
+    assert mazes.shape == (5, 8, 8)
+    assert mazes.dtype == numpy.uint8
+    assert (generate_mazes(5, size=8, seed=1, jobs=2) == mazes).all()
+    assert not (generate_mazes(5, size=8, seed=2, jobs=1) == mazes).all()
+    assert generate_mazes(0, size=8).shape == (0, 8, 8)
+
+
+def test_generate_maze_small():
+    """
+    Mazes must be large enough to follow the competition rules.
+    """
+    with pytest.raises(ValueError):
+        generate_maze(3)
+
+
+def test_generated_maze_text_round_trip():
+    """
+    Generated mazes can be saved and loaded in the default text format.
+    """
+    walls = generate_maze(16, random=numpy.random.RandomState(0))
+    output = StringIO()
+    save_maze(walls, output)
+    output.seek(0)
+    assert (load_maze(output) == walls).all()
@@ -0,0 +1,84 @@
+import numpy
+
+from mmsim.graphics import CELL_WIDTH
+from mmsim.graphics import WALL_WIDTH
+from mmsim.graphics import post_rects
+from mmsim.graphics import visible_cells
+from mmsim.graphics import wall_rects
+from pyqtgraph import QtCore
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+
+def test_wall_rects():
+    """
+    Test `wall_rects()` function.
+    """
+    walls = numpy.zeros((2, 2), dtype='uint8')
+    walls[0, 0] = 2  # East
+    walls[1, 0] = 8  # West, the same wall
+    walls[1, 1] = 16  # North
+    rects = wall_rects(walls)
+    assert rects.tolist() == [
+        [
+            CELL_WIDTH - WALL_WIDTH / 2,
+            -CELL_WIDTH + WALL_WIDTH / 2,
+            WALL_WIDTH,
+            CELL_WIDTH,
+        ],
+        [
+            CELL_WIDTH + WALL_WIDTH / 2,
+            -2 * CELL_WIDTH + WALL_WIDTH / 2,
+            CELL_WIDTH,
+            WALL_WIDTH,
+        ],
+    ]
+
+
+def test_wall_rects_merge():
+    """
+    Merged wall rectangles cover the same walls with fewer rectangles.
+    """
+    rects = wall_rects(MAZE_00)
+    merged = wall_rects(MAZE_00, merge=True)
+    assert len(merged) < len(rects)
+    assert (merged[:, 2] * merged[:, 3]).sum() == (
+        rects[:, 2] * rects[:, 3]
+    ).sum()
+    # Outer walls are a single rectangle on each side
+    assert (
+        (merged[:, 2] == 5 * CELL_WIDTH) | (merged[:, 3] == 5 * CELL_WIDTH)
+    ).sum() == 4
+
+
+def test_post_rects():
+    """
+    Test `post_rects()` function.
+    """
+    rects = post_rects((2, 3))
+    assert len(rects) == 12
+    assert rects[-1].tolist() == [
+        2 * CELL_WIDTH - WALL_WIDTH / 2,
+        -3 * CELL_WIDTH + WALL_WIDTH / 2,
+        WALL_WIDTH,
+        WALL_WIDTH,
+    ]
+
+
+def test_visible_cells():
+    """
+    Test `visible_cells()` function, with a one cell margin.
+    """
+    area = QtCore.QRectF(
+        2.5 * CELL_WIDTH, -5.5 * CELL_WIDTH, CELL_WIDTH, 2 * CELL_WIDTH
+    )
+    assert visible_cells(area, (64, 64)) == (1, 5, 2, 7)
+    assert visible_cells(area, (4, 4)) == (1, 4, 2, 4)
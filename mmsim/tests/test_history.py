@@ -0,0 +1,69 @@
+import numpy
+
+from mmsim.history import History
+from mmsim.states import encode_state
+
+
+def test_history_append():
+    """
+    Test `History.append()` method, growing the array when full.
+    """
+    history = History(capacity=2)
+    distances = numpy.arange(256, dtype='uint8').reshape(16, 16)
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    for y in range(5):
+        history.append(0, y, 'north', distances, walls + y)
+    assert len(history) == 5
+    assert len(history.array) == 8
+    assert history.states['y'].tolist() == [0, 1, 2, 3, 4]
+    x, y, direction, first, last = history[-1]
+    assert (x, y, direction) == (0, 4, 'N')
+    assert (first == distances).all()
+    assert (last == 4).all()
+    assert not last.flags.writeable
+    assert numpy.isnan(history.states['think_time']).all()
+
+
+def test_history_append_encoded():
+    """
+    Test `History.append_encoded()` and `History.append_delta()` methods.
+    """
+    history = History()
+    distances = numpy.ones((16, 16), dtype='uint8')
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    walls[1][0] = 7
+    history.append_encoded(encode_state(b'\x01\x00E', distances, walls))
+    history.append_delta(b'\x00\x01N\x01\x00\x01\x00\x05\x01')
+    x, y, direction, distances, walls = history[0]
+    assert (x, y, direction) == (1, 0, 'E')
+    assert walls[1][0] == 7
+    x, y, direction, distances, walls = history[1]
+    assert (x, y, direction) == (0, 1, 'N')
+    assert distances[0][1] == 5
+    assert distances.sum() == 255 + 5
+    assert walls.sum() == 8
+
+
+def test_history_delta_no_state():
+    """
+    Deltas with no previous state are applied to zeroed cells.
+    """
+    history = History()
+    history.append_delta(b'\x00\x01N\x01\x00\x01\x00\x05\x01')
+    _, _, _, distances, walls = history[0]
+    assert distances.sum() == 5
+    assert walls.sum() == 1
+
+
+def test_history_clear():
+    """
+    Clearing the history never overwrites previously returned arrays.
+    """
+    history = History()
+    walls = numpy.ones((16, 16), dtype='uint8')
+    history.append(0, 0, 'N', walls, walls)
+    _, _, _, _, previous = history[0]
+    history.clear()
+    assert len(history) == 0
+    history.append(0, 0, 'N', walls * 2, walls * 2)
+    assert (previous == 1).all()
@@ -0,0 +1,200 @@
+import threading
+import time
+
+import numpy
+
+import pytest
+from mmsim.client import DeltaBuffer
+from mmsim.history import History
+from mmsim.ingress import IngressQueue
+from mmsim.ingress import coalescing_key
+from mmsim.states import encode_state
+
+
+def test_coalescing_key():
+    """
+    Test `coalescing_key()` function.
+    """
+    assert coalescing_key(None, b'S\x00\x00N') == b'S'
+    assert coalescing_key(None, b'show-path') == b'path'
+    assert coalescing_key(None, b'hide-path') == b'path'
+    assert coalescing_key(None, b'S\x00\x00N', deltas=True) is None
+    assert coalescing_key(None, b'D\x00\x00N') is None
+    assert coalescing_key(None, b'reset') is None
+    assert coalescing_key([], b'S\x00\x00N') is None
+    assert coalescing_key([b'id'], b'show-path') is None
+
+
+def test_ingress_queue_invalid():
+    """
+    Test `IngressQueue` class with invalid arguments.
+    """
+    with pytest.raises(ValueError):
+        IngressQueue(0)
+    with pytest.raises(ValueError):
+        IngressQueue(policy='wait')
+
+
+def test_ingress_queue_fifo():
+    """
+    Test `IngressQueue` class order, wrapping around the ring buffer.
+    """
+    queue = IngressQueue(3)
+    assert queue.put([], b'a', think_time=0.5)
+    assert not queue.put([], b'b')
+    assert queue.get(1) == [([], b'a', 0.5)]
+    queue.put(None, b'c')
+    queue.put([b'id'], b'd')
+    assert len(queue) == 3
+    assert queue.get() == [
+        ([], b'b', None),
+        (None, b'c', None),
+        ([b'id'], b'd', None),
+    ]
+    assert queue.get() == []
+    assert queue.put([], b'e')
+    assert queue.stats()['max_depth'] == 3
+    assert queue.stats()['received'] == 5
+
+
+def test_ingress_queue_drop():
+    """
+    Test `IngressQueue` class dropping visualization-only messages.
+    """
+    queue = IngressQueue(2, policy='drop')
+    queue.put(None, b'S1')
+    queue.put(None, b'S2')
+    queue.put(None, b'S3')
+    queue.put(None, b'show-path')
+    assert queue.get() == [(None, b'S1', None), (None, b'S2', None)]
+    assert queue.stats()['dropped'] == 2
+
+
+def test_ingress_queue_coalesce():
+    """
+    Test `IngressQueue` class coalescing visualization-only messages.
+    """
+    queue = IngressQueue(2, policy='coalesce')
+    queue.put(None, b'reset')
+    queue.put(None, b'S2')
+    queue.put(None, b'S3')
+    queue.put(None, b'S4')
+    queue.put(None, b'hide-path')
+    assert queue.get() == [(None, b'reset', None), (None, b'S4', None)]
+    stats = queue.stats()
+    assert stats['coalesced'] == 2
+    assert stats['dropped'] == 1
+    assert stats['stalls'] == 0
+
+
+def stream_states(steps):
+    """
+    Build a stream of messages alternating full and delta states, with a
+    new wall discovered on each step.
+
+    Returns
+    -------
+        The messages and the walls expected after each of them.
+    """
+    walls = numpy.zeros(256, dtype='uint8')
+    distances = numpy.zeros(256, dtype='uint8')
+    delta = DeltaBuffer()
+    messages = []
+    expected = []
+    for step in range(steps):
+        walls[step * 16] = step + 1
+        if step % 2:
+            state = delta.encode(b'\x00\x00N', [step * 16], distances, walls)
+        else:
+            state = b'S' + encode_state(b'\x00\x00N', distances, walls)
+        messages.append(bytes(state))
+        expected.append(walls.reshape(16, 16).copy())
+    return messages, expected
+
+
+def append_messages(history, items):
+    """
+    Store the streamed full and delta states taken from the queue.
+    """
+    for _, message, _ in items:
+        if message[:1] == b'D':
+            history.append_delta(message[1:])
+        else:
+            history.append_encoded(message[1:])
+
+
+@pytest.mark.parametrize('policy', ['drop', 'coalesce'])
+def test_ingress_queue_deltas(policy):
+    """
+    Test `IngressQueue` class keeping the full states deltas depend on.
+    """
+    queue = IngressQueue(2, policy=policy)
+    messages, expected = stream_states(6)
+    for message in messages[:2]:
+        queue.put(None, message)
+    thread = threading.Thread(
+        target=lambda: [queue.put(None, m) for m in messages[2:]],
+        daemon=True,
+    )
+    thread.start()
+    history = History()
+    for _ in range(100):
+        append_messages(history, queue.get())
+        if len(history) == len(messages):
+            break
+        time.sleep(0.01)
+    thread.join(1)
+    assert len(history) == len(expected)
+    for row, walls in zip(history.states, expected):
+        assert (row['walls'] == walls).all()
+    assert queue.stats()['dropped'] == 0
+    assert queue.stats()['coalesced'] == 0
+
+
+def test_ingress_queue_stale_deltas():
+    """
+    Test `IngressQueue` class dropping deltas based on a dropped full state.
+    """
+    queue = IngressQueue(1, policy='drop')
+    queue.put(None, b'S1')
+    queue.put(None, b'S2')
+    queue.put(None, b'D3')
+    assert queue.get() == [(None, b'S1', None)]
+    queue.put(None, b'S4')
+    assert queue.get() == [(None, b'S4', None)]
+    queue.put(None, b'D5')
+    assert queue.get() == [(None, b'D5', None)]
+    assert queue.stats()['dropped'] == 2
+
+
+@pytest.mark.parametrize('policy', ['block', 'drop', 'coalesce'])
+def test_ingress_queue_block(policy):
+    """
+    Test `IngressQueue` class blocking when messages cannot be dropped.
+    """
+    queue = IngressQueue(1, policy=policy)
+    queue.put([], b'ping')
+    thread = threading.Thread(target=queue.put, args=([], b'reset'))
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()
+    assert queue.get() == [([], b'ping', None)]
+    thread.join()
+    assert queue.get() == [([], b'reset', None)]
+    stats = queue.stats()
+    assert stats['stalls'] == 1
+    assert stats['stall_time'] >= 0.05
+
+
+def test_ingress_queue_close():
+    """
+    Test `IngressQueue` class releasing a blocked producer when closed.
+    """
+    queue = IngressQueue(1)
+    queue.put([], b'ping')
+    thread = threading.Thread(target=queue.put, args=([], b'reset'))
+    thread.start()
+    queue.close()
+    thread.join()
+    assert not queue.put([], b'ping')
+    assert queue.get() == [([], b'ping', None)]
@@ -0,0 +1,129 @@
+import threading
+
+import numpy
+import zmq
+
+import pytest
+from mmsim.client import STATE_SIZE
+from mmsim.history import History
+from mmsim.loadgen import MESSAGE_TYPES
+from mmsim.loadgen import latency_report
+from mmsim.loadgen import parse_mix
+from mmsim.loadgen import replay_messages
+from mmsim.loadgen import run_load
+from mmsim.loadgen import synthetic_messages
+
+
+@pytest.fixture
+def endpoint():
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.REP)
+    port = socket.bind_to_random_port('tcp://127.0.0.1')
+    running = threading.Event()
+    running.set()
+
+    def serve():
+        while running.is_set():
+            if socket.poll(10):
+                socket.send(socket.recv()[:1])
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    yield 'tcp://127.0.0.1:{}'.format(port)
+    running.clear()
+    thread.join()
+    socket.close()
+
+
+def test_parse_mix():
+    """
+    Test `parse_mix()` function.
+    """
+    assert parse_mix('ping=1, W=2.5') == {'ping': 1, 'W': 2.5}
+    with pytest.raises(ValueError):
+        parse_mix('ping=1,foo=1')
+    with pytest.raises(ValueError):
+        parse_mix('ping=0')
+    with pytest.raises(ValueError):
+        parse_mix('ping')
+
+
+def test_synthetic_messages():
+    """
+    Test `synthetic_messages()` function.
+    """
+    random = numpy.random.RandomState(42)
+    mix = {'ping': 1, 'W': 1, 'S': 1}
+    messages, kinds = synthetic_messages(300, mix, random=random)
+    assert len(messages) == len(kinds) == 300
+    assert set(kinds) == {0, 1, 2}
+    for message, kind in zip(messages, kinds):
+        if MESSAGE_TYPES[kind] == 'ping':
+            assert message == b'ping'
+        elif MESSAGE_TYPES[kind] == 'W':
+            assert len(message) == 4 and message[:1] == b'W'
+        else:
+            assert len(message) == STATE_SIZE and message[:1] == b'S'
+
+
+def test_replay_messages():
+    """
+    Test `replay_messages()` function.
+    """
+    history = History()
+    cells = numpy.arange(256, dtype='uint8').reshape(16, 16)
+    history.append(0, 1, 'N', cells, cells[::-1])
+    history.append(0, 2, 'E', cells, cells)
+    messages, kinds = replay_messages(history.states)
+    assert [MESSAGE_TYPES[kind] for kind in kinds] == [
+        'reset',
+        'W',
+        'S',
+        'W',
+        'S',
+    ]
+    assert messages[0] == b'reset'
+    assert messages[3] == b'W\x00\x02E'
+    assert messages[4][:4] == b'S\x00\x02E'
+    assert messages[2][-256:] == cells[::-1].tobytes()
+
+
+def test_run_load(endpoint):
+    """
+    Test `run_load()` function against an echo server.
+    """
+    random = numpy.random.RandomState(42)
+    sequences = [
+        synthetic_messages(50, {'ping': 1, 'W': 1}, random=random)
+        for _ in range(3)
+    ]
+    kinds, latencies, elapsed = run_load(endpoint, sequences)
+    assert len(kinds) == len(latencies) == 150
+    assert (latencies > 0).all()
+    assert elapsed >= latencies.max()
+
+
+def test_run_load_timeout():
+    """
+    Test `run_load()` function with no server.
+    """
+    sequences = [([b'ping'], numpy.array([0]))]
+    with pytest.raises(TimeoutError):
+        run_load('tcp://127.0.0.1:1', sequences, timeout=0.05)
+
+
+def test_latency_report():
+    """
+    Test `latency_report()` function.
+    """
+    kinds = numpy.array([0, 1, 1, 1, 1])
+    latencies = numpy.array([0.5, 0.1, 0.2, 0.3, 0.4])
+    rows = latency_report(kinds, latencies, elapsed=2.0)
+    assert [row['type'] for row in rows] == ['ping', 'W', 'all']
+    assert rows[0]['count'] == 1
+    assert rows[0]['p99'] == 0.5
+    assert rows[1]['throughput'] == 2.0
+    assert rows[1]['p50'] == pytest.approx(0.25)
+    assert rows[1]['max'] == 0.4
+    assert rows[2]['count'] == 5
+    assert rows[2]['max'] == 0.5
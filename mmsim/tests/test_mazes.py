@@ -5,6 +5,7 @@ import numpy
 import pytest
 from mmsim.mazes import load_maze
 from mmsim.mazes import read_walls
+from mmsim.mazes import save_maze
 
 MAZE_00_OSHWDEM = """OSHWDEM Maze Generator v1.2 R42263
 +---+---+---+---+---+
@@ -72,6 +73,16 @@ def test_load_maze_post_char():
     assert (result == MAZE_00).all()
 
 
+@pytest.mark.parametrize(
+    'post_char,expected',
+    [('+', MAZE_00_DEFAULT), ('o', MAZE_00_POST_CHAR)],
+)
+def test_save_maze(post_char, expected):
+    output = StringIO()
+    save_maze(MAZE_00, output, post_char=post_char)
+    assert output.getvalue() == expected
+
+
 @pytest.mark.parametrize(
     'x,y,direction,walls',
     [
@@ -0,0 +1,93 @@
+import sys
+import threading
+
+import pytest
+from mmsim.profiling import LAG_RESOLUTION
+from mmsim.profiling import LagMonitor
+from mmsim.profiling import Profiler
+from mmsim.profiling import StackSampler
+from mmsim.profiling import fold_stack
+
+
+def inner():
+    return sys._getframe()
+
+
+def outer():
+    return inner()
+
+
+def test_fold_stack():
+    """
+    Test `fold_stack()` function.
+    """
+    stack = fold_stack('GUI', outer())
+    assert stack.startswith('GUI;')
+    assert stack.endswith(';test_profiling:outer;test_profiling:inner')
+
+
+def test_stack_sampler():
+    """
+    Test `StackSampler` class, sampling only the named threads.
+    """
+    sampler = StackSampler()
+    sampler.sample()
+    assert sampler.samples == 1
+    assert not sampler.stacks
+    sampler.name_thread('main')
+    sampler.sample()
+    sampler.sample()
+    assert sampler.samples == 3
+    assert sum(sampler.stacks.values()) == 2
+    line = sampler.folded().splitlines()[0]
+    assert line.startswith('main;')
+    assert line.endswith(':test_stack_sampler;profiling:sample 2')
+
+
+def test_stack_sampler_thread():
+    """
+    Test `StackSampler` class running in its own thread.
+    """
+    sampler = StackSampler(interval=0.001)
+    sampler.name_thread('main', threading.get_ident())
+    sampler.start()
+    while not sampler.samples:
+        pass
+    sampler.stop()
+    assert not sampler.is_alive()
+    assert sampler.stacks
+
+
+def test_lag_monitor():
+    """
+    Test `LagMonitor` class.
+    """
+    lag = LagMonitor(interval=0.05)
+    assert lag.percentile(50) == 0
+    for now in [0.0, 0.05, 0.1, 0.2, 0.25, 10.0]:
+        lag.tick(now)
+    assert lag.count == 5
+    assert lag.maximum == pytest.approx(9.7)
+    assert lag.percentile(50) == pytest.approx(LAG_RESOLUTION)
+    assert lag.percentile(80) == pytest.approx(0.05 + LAG_RESOLUTION)
+    assert lag.percentile(100) == pytest.approx(2 + LAG_RESOLUTION)
+
+
+def test_profiler(tmp_path):
+    """
+    Test `Profiler` class report and output files.
+    """
+    profiler = Profiler(interval=0.001)
+    profiler.sampler.name_thread('main')
+    profiler.start()
+    data = [bytearray(1000) for i in range(100)]
+    profiler.memory.snapshot(len(data), 100000)
+    profiler.sampler.sample()
+    profiler.stop()
+    profiler.save(tmp_path / 'profile')
+    report = (tmp_path / 'profile.txt').read_text()
+    assert 'main: ' in report
+    assert 'Event-loop lag (0 events)' in report
+    assert ' 100 97 ' in report
+    folded = (tmp_path / 'profile.folded').read_text()
+    assert folded.startswith('main;')
@@ -0,0 +1,132 @@
+import numpy
+
+import pytest
+from mmsim.scoring import LEFT
+from mmsim.scoring import RIGHT
+from mmsim.scoring import U_TURN
+from mmsim.scoring import MotionModel
+from mmsim.scoring import estimate_time
+from mmsim.scoring import estimate_times
+from mmsim.scoring import fastest_route
+from mmsim.scoring import path_runs
+from mmsim.scoring import run_lengths
+from mmsim.solvers import adjacency
+from mmsim.solvers import shortest_path
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    'distance,initial,final,expected',
+    [
+        (0.36, 0.0, 0.0, 0.6),
+        (0.0, 0.0, 0.0, 0.0),
+        # Long enough to reach the maximum speed
+        (2.0, 0.0, 0.0, 1.5),
+    ],
+)
+def test_straight_time(distance, initial, final, expected):
+    """
+    Test `MotionModel.straight_time()` method.
+    """
+    model = MotionModel()
+    assert model.straight_time(distance, initial, final) == pytest.approx(
+        expected
+    )
+
+
+def test_path_runs():
+    """
+    Test `path_runs()` function.
+    """
+    lengths, turns = path_runs(shortest_path(MAZE_00))
+    assert lengths == [2, 1, 2, 3, 1, 1, 1, 1]
+    assert turns == [LEFT, RIGHT, LEFT, LEFT, LEFT, RIGHT, LEFT]
+    lengths, turns = path_runs([(0, 0), (0, 1), (0, 0)])
+    assert lengths == [1, 1]
+    assert turns == [U_TURN]
+    assert path_runs([(0, 0)]) == ([], [])
+    assert path_runs([]) == ([], [])
+
+
+def test_path_runs_history():
+    """
+    Test `path_runs()` function with repeated and non-adjacent cells.
+    """
+    path = [(0, 0), (0, 0), (0, 1), (0, 2), (0, 2), (1, 2)]
+    assert path_runs(path) == ([2, 1], [RIGHT])
+    with pytest.raises(ValueError):
+        path_runs([(0, 0), (0, 2)])
+    with pytest.raises(ValueError):
+        path_runs([(0, 0), (1, 1)])
+
+
+def test_estimate_time():
+    """
+    Test `estimate_time()` function.
+    """
+    assert estimate_time([(0, 0), (0, 1), (0, 2)]) == pytest.approx(0.6)
+    path = shortest_path(MAZE_00)
+    diagonal = estimate_time(path)
+    orthogonal = estimate_time(path, diagonals=False)
+    assert 0 < diagonal < orthogonal
+    # Slower robots take longer
+    slow = MotionModel(max_speed=1.0, acceleration=2.0)
+    assert estimate_time(path, slow) > diagonal
+    times = estimate_times([path, path[:5]])
+    assert times[0] == pytest.approx(diagonal)
+    assert times[1] < times[0]
+
+
+def test_run_lengths():
+    """
+    Test `run_lengths()` function.
+    """
+    runs = run_lengths(adjacency(MAZE_00))
+    # From cell (0, 0) the robot can go 4 cells east and nowhere else
+    assert runs[0].tolist() == [4, 0, 0, 0]
+    # From cell (2, 4) the robot can go 2 cells west
+    assert runs[14].tolist() == [0, 0, 2, 0]
+
+
+def test_fastest_route():
+    """
+    Test `fastest_route()` function.
+    """
+    time, route = fastest_route(MAZE_00, heading=0)
+    assert tuple(route[0]) == (0, 0)
+    assert tuple(route[-1]) == (2, 2)
+    steps = numpy.abs(numpy.diff(route, axis=0)).sum(axis=1)
+    assert (steps == 1).all()
+    assert time == pytest.approx(estimate_time(route, diagonals=False))
+    # Turning in place at the start takes time
+    turned, _ = fastest_route(MAZE_00, heading=3)
+    assert turned > time
+
+
+def test_fastest_route_unreachable():
+    """
+    Test `fastest_route()` when the goal cannot be reached.
+    """
+    walls = numpy.zeros((3, 3), dtype='uint8')
+    walls[0, 0] = 2 + 16
+    time, route = fastest_route(walls)
+    assert time == float('inf')
+    assert route.shape == (0, 2)
+
+
+def test_fastest_route_at_goal():
+    """
+    Test `fastest_route()` when starting at the goal.
+    """
+    time, route = fastest_route(MAZE_00, start=(2, 2))
+    assert time == 0
+    assert route.shape == (0, 2)
@@ -0,0 +1,69 @@
+import numpy
+
+import pytest
+from mmsim import Session
+from mmsim.states import encode_state
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    'x,y,direction,walls',
+    [
+        (0, 0, 'E', (True, False, True)),
+        (0, 0, 'east', (True, False, True)),
+        (0, 0, 'north', (True, True, False)),
+        (4, 4, 'W', (False, False, True)),
+    ],
+)
+def test_session_read_walls(x, y, direction, walls):
+    """
+    Test `Session.read_walls()` method.
+    """
+    session = Session(MAZE_00)
+    assert session.read_walls(x, y, direction) == walls
+
+
+def test_session_push_state():
+    """
+    States pushed are copied into the history.
+    """
+    session = Session(MAZE_00)
+    distances = numpy.zeros((16, 16), dtype='uint8')
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    session.push_state(0, 0, 'north', distances, walls)
+    distances[0][1] = 3
+    session.push_state(0, 1, 'N', distances, walls)
+    assert len(session) == 2
+    x, y, direction, first, _ = session[0]
+    assert (x, y, direction) == (0, 0, 'N')
+    assert first.sum() == 0
+    x, y, direction, second, _ = session[-1]
+    assert (x, y, direction) == (0, 1, 'N')
+    assert second[0][1] == 3
+    session.reset()
+    assert len(session) == 0
+
+
+def test_session_push_encoded():
+    """
+    Encoded states and deltas are decoded into the history.
+    """
+    session = Session(MAZE_00)
+    distances = numpy.ones((16, 16), dtype='uint8')
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    session.push_encoded_state(encode_state(b'\x00\x00N', distances, walls))
+    session.push_encoded_delta(b'\x00\x01N\x01\x00\x01\x00\x05\x01')
+    x, y, direction, distances, walls = session[1]
+    assert (x, y, direction) == (0, 1, 'N')
+    assert distances[0][1] == 5
+    assert distances.sum() == 255 + 5
+    assert walls.sum() == 1
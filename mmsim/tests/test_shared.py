@@ -0,0 +1,62 @@
+import numpy
+
+import pytest
+from mmsim.shared import SLOT_SIZE
+from mmsim.shared import SharedStates
+from mmsim.shared import SharedStatesWriter
+from mmsim.shared import is_mapped_state
+from mmsim.states import encode_state
+
+
+def test_is_mapped_state():
+    """
+    Test `is_mapped_state()` function.
+    """
+    assert is_mapped_state(b'\x00\x01NM\x00\x00\x00\x00')
+    assert not is_mapped_state(b'\x00\x01NF\x00\x00\x00\x00')
+    cells = numpy.zeros((16, 16))
+    assert not is_mapped_state(encode_state(b'\x00\x01N', cells, cells))
+
+
+def test_shared_states(tmp_path):
+    """
+    Test `SharedStatesWriter` and `SharedStates` classes.
+    """
+    writer = SharedStatesWriter(tmp_path / 'states', slots=2)
+    assert (tmp_path / 'states').stat().st_size == 2 * SLOT_SIZE
+    reader = SharedStates(tmp_path / 'states')
+    assert reader.slots == 2
+    distances = numpy.arange(256, dtype='uint8').reshape(16, 16)
+    message = writer.encode(1, 2, 'east', distances, distances.T)
+    assert message == b'S\x01\x02EM\x00\x00\x00\x00'
+    assert is_mapped_state(bytes(message[1:]))
+    writer.distances[3][4] = 42
+    writer.walls[:] = 7
+    message = writer.encode(3, 4, 'N')
+    assert message == b'S\x03\x04NM\x01\x00\x00\x00'
+    read_distances, read_walls = reader.read(0)
+    assert (read_distances == distances).all()
+    assert (read_walls == distances.T).all()
+    assert not read_distances.flags.writeable
+    read_distances, read_walls = reader.read(1)
+    assert read_distances[3][4] == 42
+    assert (read_walls == 7).all()
+    writer.encode(0, 0, 'N')
+    with pytest.raises(ValueError):
+        reader.read(0)
+    with pytest.raises(ValueError):
+        reader.read(5)
+    reader.close()
+    writer.close()
+
+
+def test_shared_states_invalid(tmp_path):
+    """
+    Test `SharedStates` class with an invalid file.
+    """
+    (tmp_path / 'states').write_bytes(bytes(SLOT_SIZE + 1))
+    with pytest.raises(ValueError):
+        SharedStates(tmp_path / 'states')
+    (tmp_path / 'empty').write_bytes(b'')
+    with pytest.raises(ValueError):
+        SharedStates(tmp_path / 'empty')
@@ -0,0 +1,80 @@
+import numpy
+
+import pytest
+from mmsim import Session
+from mmsim.floodfill import FloodFill
+from mmsim.generator import generate_maze
+from mmsim.mazes import EAST_BIT
+from mmsim.mazes import NORTH_BIT
+from mmsim.mazes import SOUTH_BIT
+from mmsim.mazes import VISITED_BIT
+from mmsim.mazes import WEST_BIT
+from mmsim.simulator import DIRECTIONS
+from mmsim.simulator import Simulator
+
+
+class FloodFillSimulator(Simulator):
+    def calculate_distances(self):
+        if not hasattr(self, 'floodfill'):
+            self.floodfill = FloodFill(self.size, self.goals)
+            self.distances = self.floodfill.distances
+        self.floodfill.add_walls(*self.position, self.walls[self.position])
+        self.floodfill.update()
+
+    def best_step(self):
+        return min(self.allowed_steps(), key=self.distance_after_step)
+
+
+@pytest.mark.parametrize(
+    'direction,reading,expected',
+    [
+        ('north', (1, 0, 0), WEST_BIT),
+        ('north', (0, 1, 1), NORTH_BIT | EAST_BIT),
+        ('east', (1, 1, 0), NORTH_BIT | EAST_BIT),
+        ('south', (1, 0, 1), EAST_BIT | WEST_BIT),
+        ('west', (0, 1, 1), WEST_BIT | NORTH_BIT),
+    ],
+)
+def test_simulator_update_walls(direction, reading, expected):
+    """
+    Test `Simulator.update_walls()` method.
+    """
+    simulator = FloodFillSimulator(4)
+    simulator.position = (1, 1)
+    simulator.direction = DIRECTIONS.index(direction)
+    assert simulator.update_walls(*reading) == expected
+    assert simulator.walls[1, 1] == expected | VISITED_BIT
+    if expected & NORTH_BIT:
+        assert simulator.walls[1, 2] == SOUTH_BIT
+    if expected & WEST_BIT:
+        assert simulator.walls[0, 1] == WEST_BIT | EAST_BIT
+
+
+def test_simulator_steps():
+    """
+    Test `Simulator` steps, with walls relative to the mouse orientation.
+    """
+    simulator = FloodFillSimulator(4)
+    simulator.direction = DIRECTIONS.index('east')
+    simulator.update_walls(0, 1, 0)
+    assert simulator.allowed_steps() == ['left']
+    assert simulator.position_after_step('left') == (0, 1)
+    simulator.move('left')
+    assert simulator.position == (0, 1)
+    assert DIRECTIONS[simulator.direction] == 'north'
+    assert simulator.state()[:3] == (0, 1, 'north')
+
+
+def test_simulator_run():
+    """
+    Test `Simulator.run()` method exploring a maze until the goal.
+    """
+    maze = generate_maze(16, random=numpy.random.RandomState(0))
+    session = Session(maze)
+    simulator = FloodFillSimulator()
+    simulator.run(session)
+    x, y, _, distances, walls = session[-1]
+    assert (x, y) in simulator.goals
+    assert distances[x, y] == 0
+    visited = (walls & VISITED_BIT) > 0
+    assert (walls[visited] == maze[visited] | VISITED_BIT).all()
@@ -0,0 +1,129 @@
+import numpy
+
+import pytest
+from mmsim.solvers import UNREACHABLE
+from mmsim.solvers import adjacency
+from mmsim.solvers import distances
+from mmsim.solvers import goal_cells
+from mmsim.solvers import shortest_path
+from mmsim.solvers import solve
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+MAZE_00_DISTANCES = numpy.array(
+    [
+        [12, 11, 12, 13, 14],
+        [11, 10, 1, 2, 15],
+        [10, 9, 0, 1, 16],
+        [11, 8, 9, 2, 3],
+        [12, 7, 6, 5, 4],
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    'shape,expected',
+    [
+        ((16, 16), ((7, 7), (7, 8), (8, 7), (8, 8))),
+        ((5, 5), ((2, 2),)),
+        ((4, 5), ((1, 2), (2, 2))),
+    ],
+)
+def test_goal_cells(shape, expected):
+    """
+    Test `goal_cells()` function.
+    """
+    assert goal_cells(shape) == expected
+
+
+def test_adjacency():
+    """
+    Test `adjacency()` function.
+    """
+    neighbors = adjacency(MAZE_00)
+    assert neighbors.shape == (25, 4)
+    # Cell (0, 0) is only open to the east, towards (1, 0)
+    assert neighbors[0].tolist() == [5, UNREACHABLE, UNREACHABLE, UNREACHABLE]
+    # Cell (2, 2) is open to the west and to the north
+    assert neighbors[12].tolist() == [UNREACHABLE, UNREACHABLE, 7, 13]
+
+
+def test_adjacency_one_sided_wall():
+    """
+    A wall set in only one of the two neighboring cells closes the passage.
+    """
+    walls = numpy.zeros((2, 1), dtype='uint8')
+    walls[1, 0] = 8
+    neighbors = adjacency(walls)
+    assert neighbors[0, 0] == UNREACHABLE
+    assert neighbors[1, 2] == UNREACHABLE
+
+
+def test_distances():
+    """
+    Test `distances()` function.
+    """
+    result = distances(MAZE_00)
+    assert (result == MAZE_00_DISTANCES).all()
+
+
+def test_distances_unreachable():
+    """
+    Cells isolated from the goal are marked as unreachable.
+    """
+    walls = numpy.zeros((3, 3), dtype='uint8')
+    walls[0, 0] = 2 + 16
+    result = distances(walls)
+    assert result[0, 0] == UNREACHABLE
+    assert result[1, 1] == 0
+    assert result[2, 2] == 2
+
+
+def test_shortest_path():
+    """
+    Test `shortest_path()` function.
+    """
+    path = shortest_path(MAZE_00)
+    assert path.shape == (13, 2)
+    assert tuple(path[0]) == (0, 0)
+    assert tuple(path[-1]) == (2, 2)
+    steps = numpy.abs(numpy.diff(path, axis=0)).sum(axis=1)
+    assert (steps == 1).all()
+
+
+def test_shortest_path_unreachable():
+    """
+    Test `shortest_path()` when the goal cannot be reached.
+    """
+    walls = numpy.zeros((3, 3), dtype='uint8')
+    walls[0, 0] = 2 + 16
+    with pytest.raises(ValueError):
+        shortest_path(walls)
+
+
+def test_solve():
+    """
+    Test `solve()` function.
+    """
+    solution = solve(MAZE_00)
+    assert solution.goals == ((2, 2),)
+    assert (solution.distances == MAZE_00_DISTANCES).all()
+    assert len(solution.path) == 13
+
+
+def test_solve_unreachable():
+    """
+    Test `solve()` function when the goal cannot be reached.
+    """
+    walls = numpy.zeros((3, 3), dtype='uint8')
+    walls[0, 0] = 2 + 16
+    solution = solve(walls)
+    assert solution.path.shape == (0, 2)
@@ -0,0 +1,77 @@
+import numpy
+
+from mmsim.states import apply_delta
+from mmsim.states import decode_delta
+from mmsim.states import decode_state
+from mmsim.states import encode_state
+
+
+def test_encode_decode_state():
+    """
+    Test `encode_state()` and `decode_state()` functions.
+    """
+    distances = numpy.arange(256).reshape(16, 16).astype('uint8')
+    walls = distances.T % 32
+    state = encode_state(b'\x01\x02N', distances, walls)
+    assert len(state) == 3 + 1 + 256 + 1 + 256
+    position, decoded_distances, decoded_walls = decode_state(state)
+    assert position == b'\x01\x02N'
+    assert (decoded_distances == distances).all()
+    assert (decoded_walls == walls).all()
+
+
+def test_decode_state_c_order():
+    """
+    Matrices sent in C-style order are transposed.
+    """
+    distances = numpy.arange(256).reshape(16, 16).astype('uint8')
+    state = b'\x00\x00N' + b'C' + distances.tobytes() + b'F' + bytes(256)
+    _, decoded_distances, _ = decode_state(state)
+    assert (decoded_distances == distances.T).all()
+
+
+def test_decode_delta():
+    """
+    Test `decode_delta()` function.
+    """
+    delta = (
+        b'\x00\x01N' + b'\x02\x00' + b'\x01\x00\x07\x09' + b'\x10\x00\x08\x11'
+    )
+    position, changes = decode_delta(delta)
+    assert position == b'\x00\x01N'
+    assert changes['cell'].tolist() == [1, 16]
+    assert changes['distance'].tolist() == [7, 8]
+    assert changes['walls'].tolist() == [9, 17]
+
+
+def test_apply_delta():
+    """
+    Test `apply_delta()` function.
+    """
+    distances = numpy.ones((16, 16), dtype='uint8')
+    walls = numpy.zeros((16, 16), dtype='uint8')
+    delta = (
+        b'\x00\x01N' + b'\x02\x00' + b'\x01\x00\x07\x09' + b'\x10\x00\x08\x11'
+    )
+    _, changes = decode_delta(delta)
+    new_distances, new_walls = apply_delta(distances, walls, changes)
+    assert new_distances[0][1] == 7
+    assert new_walls[0][1] == 9
+    assert new_distances[1][0] == 8
+    assert new_walls[1][0] == 17
+    assert new_distances.sum() == 254 + 7 + 8
+    assert new_walls.sum() == 9 + 17
+    assert distances.sum() == 256
+    assert walls.sum() == 0
+
+
+def test_apply_delta_no_state():
+    """
+    Deltas applied to no previous state are applied on an empty state.
+    """
+    delta = b'\x03\x04S' + b'\x01\x00' + b'\x05\x00\x02\x03'
+    _, changes = decode_delta(delta)
+    distances, walls = apply_delta(None, None, changes)
+    assert distances[0][5] == 2
+    assert distances.sum() == 2
+    assert walls.sum() == 3
@@ -0,0 +1,104 @@
+import numpy
+
+import pytest
+from mmsim.generator import generate_mazes
+from mmsim.mazes import EAST_BIT
+from mmsim.mazes import NORTH_BIT
+from mmsim.mazes import SOUTH_BIT
+from mmsim.mazes import WEST_BIT
+from mmsim.mazes import save_maze
+from mmsim.symmetry import TRANSFORMS
+from mmsim.symmetry import build_index
+from mmsim.symmetry import canonical_form
+from mmsim.symmetry import canonical_hash
+from mmsim.symmetry import canonical_hashes
+from mmsim.symmetry import duplicates
+from mmsim.symmetry import load_index
+from mmsim.symmetry import save_index
+from mmsim.symmetry import transform
+
+MAZE_00 = numpy.array(
+    [
+        [28, 12, 10, 10, 24],
+        [20, 20, 12, 24, 20],
+        [4, 16, 6, 16, 22],
+        [20, 4, 26, 6, 24],
+        [22, 6, 10, 10, 18],
+    ]
+)
+
+
+def consistent(walls):
+    """
+    Check whether neighboring cells agree on the walls between them.
+    """
+    east = (walls[:-1] & EAST_BIT > 0) == (walls[1:] & WEST_BIT > 0)
+    north = (walls[:, :-1] & NORTH_BIT > 0) == (walls[:, 1:] & SOUTH_BIT > 0)
+    return east.all() and north.all()
+
+
+@pytest.mark.parametrize('index', range(len(TRANSFORMS)))
+def test_transform(index):
+    """
+    Test `transform()` function.
+    """
+    result = transform(MAZE_00, index)
+    assert consistent(result)
+    assert (result & EAST_BIT > 0)[-1].all()
+    assert (result & SOUTH_BIT > 0)[:, 0].all()
+    assert (result & WEST_BIT > 0)[0].all()
+    assert (result & NORTH_BIT > 0)[:, -1].all()
+    assert canonical_hash(result) == canonical_hash(MAZE_00)
+
+
+def test_transform_rotation():
+    """
+    Rotating 90 degrees counter-clockwise moves the east walls to the north.
+    """
+    index = TRANSFORMS.index((True, True, False))
+    result = transform(MAZE_00, index)
+    # Starting cell, only open to the east, moves to the south-east corner
+    assert MAZE_00[0, 0] == NORTH_BIT | WEST_BIT | SOUTH_BIT
+    assert result[4, 0] == EAST_BIT | SOUTH_BIT | WEST_BIT
+    assert len({transform(MAZE_00, i).tobytes() for i in range(8)}) == 8
+
+
+def test_canonical_form():
+    """
+    Test `canonical_form()` function.
+    """
+    versions = [transform(MAZE_00, i).tobytes() for i in range(8)]
+    assert canonical_form(MAZE_00).tobytes() == min(versions)
+    visited = MAZE_00 | 1
+    assert (canonical_form(visited) == canonical_form(MAZE_00)).all()
+
+
+def test_canonical_hashes():
+    """
+    Test `canonical_hashes()` function.
+    """
+    mazes = generate_mazes(50, size=8, seed=0, jobs=1)
+    hashes = canonical_hashes(mazes)
+    assert len(set(hashes)) == 50
+    rotated = canonical_hashes(transform(mazes, 3))
+    assert hashes == rotated
+    assert hashes[0] == canonical_hash(mazes[0])
+
+
+def test_index(tmp_path):
+    """
+    Test building, saving and loading a duplicates index.
+    """
+    path = tmp_path
+    mazes = generate_mazes(2, size=8, seed=0, jobs=1)
+    for name, maze in [
+        ('a.txt', mazes[0]),
+        ('b.txt', mazes[1]),
+        ('c.txt', transform(mazes[0], 6)),
+    ]:
+        save_maze(maze, path / name)
+    index = build_index(path)
+    assert len(index) == 2
+    assert list(duplicates(index)) == [['a.txt', 'c.txt']]
+    save_index(index, path / 'index.json')
+    assert load_index(path / 'index.json') == index
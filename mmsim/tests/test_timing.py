@@ -0,0 +1,15 @@
+import pytest
+from mmsim.timing import ThinkTimer
+
+
+def test_think_timer():
+    """
+    Test `ThinkTimer` class, tracking each client separately.
+    """
+    timer = ThinkTimer()
+    assert timer.received(b'a', now=1.0) is None
+    timer.replied_walls(b'a', now=2.0)
+    timer.replied_walls(b'b', now=2.5)
+    assert timer.received(b'a', now=2.25) == pytest.approx(0.25)
+    assert timer.received(b'a', now=3.0) is None
+    assert timer.received(b'b', now=4.0) == pytest.approx(1.5)
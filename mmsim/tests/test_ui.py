@@ -0,0 +1,149 @@
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+import numpy
+import zmq
+
+import pytest
+from mmsim.client import Client
+from mmsim.ui import MainWindow
+from mmsim.ui import remote_map
+from PyQt5 import QtWidgets
+
+
+def free_port():
+    """
+    Find a free local TCP port.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def window(tmpdir):
+    """
+    Simulator interface listening on free local ports, with no mazes.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    port, router_port = free_port(), free_port()
+    main = MainWindow(
+        host='127.0.0.1',
+        port=port,
+        path=Path(str(tmpdir)),
+        router_port=router_port,
+    )
+    main.app = app
+    main.endpoint = 'tcp://127.0.0.1:{}'.format(port)
+    main.router_endpoint = 'tcp://127.0.0.1:{}'.format(router_port)
+    yield main
+    main.close()
+    main.context.destroy(linger=0)
+
+
+class Frame:
+    """
+    Received message frame, with the given peer address.
+    """
+
+    def __init__(self, message, address):
+        self.bytes = message
+        self.address = address
+
+    def get(self, name):
+        assert name == 'Peer-Address'
+        if self.address is None:
+            raise zmq.ZMQError(zmq.EINVAL)
+        return self.address
+
+
+@pytest.mark.parametrize(
+    'message,address,expected',
+    [
+        (b'M/tmp/states', '127.0.0.1', False),
+        (b'M/tmp/states', '::1', False),
+        (b'M/tmp/states', None, False),
+        (b'M/tmp/states', '192.0.2.2', True),
+        (b'M/tmp/states', 'fd00::2', True),
+        (b'M/tmp/states', '', True),
+        (b'M/tmp/states', 'localhost', True),
+        (b'ping', '192.0.2.2', False),
+    ],
+)
+def test_remote_map(message, address, expected):
+    """
+    Test `remote_map()` function.
+    """
+    assert remote_map(Frame(message, address)) is expected
+
+
+def run_clients(window, *functions):
+    """
+    Run client functions in threads while processing the interface events.
+
+    Returns
+    -------
+        The result of each function.
+    """
+    results = {}
+    threads = [
+        threading.Thread(
+            target=lambda i=i, f=f: results.update({i: f()}), daemon=True
+        )
+        for i, f in enumerate(functions)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + 5
+    while any(t.is_alive() for t in threads):
+        assert time.perf_counter() < deadline, 'The server stalled'
+        window.app.processEvents()
+        time.sleep(0.001)
+    return [results[i] for i in range(len(functions))]
+
+
+def test_invalid_messages(window):
+    """
+    Test the interface replying with an error to invalid messages, while
+    still processing the following ones.
+    """
+
+    def requests():
+        client = Client(window.endpoint)
+        replies = [
+            client.request(b'unknown'),
+            client.request(b'D\x00'),
+            client.ping(),
+        ]
+        client.close()
+        return replies
+
+    assert run_clients(window, requests) == [[b'error', b'error', b'pong']]
+
+
+def test_think_time_clients(window):
+    """
+    Test the interface measuring the think time of each REQ client.
+    """
+    window.session.maze = numpy.zeros((16, 16), dtype='uint8')
+    cells = bytes(256)
+
+    def requests():
+        first, second = Client(window.endpoint), Client(window.endpoint)
+        first.reset()
+        first.read_walls(0, 0, 'N')
+        time.sleep(0.2)
+        second.read_walls(0, 0, 'N')
+        first.send_state(0, 0, 'N', cells, cells)
+        second.send_state(0, 0, 'N', cells, cells)
+        first.close()
+        second.close()
+
+    run_clients(window, requests)
+    think_times = window.session.history.states['think_time']
+    assert think_times[0] >= 0.2
+    assert think_times[1] < 0.2
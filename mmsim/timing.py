@@ -0,0 +1,70 @@
+"""
+Client think time measurement.
+
+The think time of a client is the time between the server replying to one of
+its wall readings and receiving its next message (i.e.: the time the client
+spent processing the walls, such as updating its distances and choosing the
+next move). Times are measured in the listener thread, when messages are
+actually sent and received, so they do not include the time messages wait to
+be processed by the interface.
+"""
+import threading
+import time
+from typing import Hashable
+from typing import Optional
+
+
+class ThinkTimer:
+    """
+    Per-client think time tracker.
+
+    Clients are identified by any hashable key (i.e.: the socket the client
+    is connected to and its identity).
+    """
+
+    def __init__(self):
+        self.replied = {}
+        self.lock = threading.Lock()
+
+    def replied_walls(self, client: Hashable, now: Optional[float] = None):
+        """
+        Record that a wall reading reply was sent to a client.
+
+        Parameters
+        ----------
+        client
+            The client key.
+        now
+            Time of the reply, in seconds. Defaults to `time.perf_counter()`.
+        """
+        if now is None:
+            now = time.perf_counter()
+        with self.lock:
+            self.replied[client] = now
+
+    def received(
+        self, client: Hashable, now: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Record that a message was received from a client.
+
+        Parameters
+        ----------
+        client
+            The client key.
+        now
+            Time of the message, in seconds. Defaults to
+            `time.perf_counter()`.
+
+        Returns
+        -------
+            The client think time, in seconds, or `None` if the previous
+            message from the client was not a wall reading.
+        """
+        if now is None:
+            now = time.perf_counter()
+        with self.lock:
+            replied = self.replied.pop(client, None)
+        if replied is None:
+            return None
+        return now - replied
@@ -1,10 +1,18 @@
+import ipaddress
 import struct
 import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy
 import zmq
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
+from PyQt5.QtWidgets import QCheckBox
+from PyQt5.QtWidgets import QHBoxLayout
+from PyQt5.QtWidgets import QLabel
 from PyQt5.QtWidgets import QLineEdit
 from PyQt5.QtWidgets import QListWidget
 from PyQt5.QtWidgets import QSlider
@@ -13,30 +21,144 @@ from PyQt5.QtWidgets import QStatusBar
 from PyQt5.QtWidgets import QVBoxLayout
 from PyQt5.QtWidgets import QWidget
 from pyqtgraph import GraphicsLayoutWidget
-
+from pyqtgraph import InfiniteLine
+from pyqtgraph import PlotWidget
+
+from .analytics import VisitHeatmap
+from .analytics import summary
+from .analytics import think_time_percentiles
+from .cache import LRUCache
+from .features import INDEX_FILE
+from .features import is_predicate
+from .features import load_features
+from .features import query
 from .graphics import MazeItem
+from .graphics import maze_template
+from .ingress import IngressQueue
 from .mazes import load_maze
+from .profiling import Profiler
+from .session import Session
+from .shared import SEQUENCE
+from .shared import SharedStates
+from .shared import is_mapped_state
+from .solvers import UNREACHABLE
+from .solvers import solve
+from .states import POSITION_SIZE
+from .timing import ThinkTimer
+
+STREAM_HWM = 100
+# Maximum number of queued messages processed at once by the interface
+DRAIN_BATCH = 100
+# Maximum number of loaded mazes kept in memory
+MAZE_CACHE_SIZE = 64
+# Minimum time between run summary updates, in milliseconds
+SUMMARY_INTERVAL = 200
+SUMMARY_FORMAT = (
+    'Steps: {steps} | Discovered: {discovered} | Visited: {visited} | '
+    'Revisits: {revisits} | Backtracking: {backtracking:.0%} | '
+    'Goal at: {time_to_goal}'
+)
+THINK_TIME_FORMAT = (
+    'Think time: p50 {p50:.1f} ms | p95 {p95:.1f} ms | p99 {p99:.1f} ms | '
+    'max {max:.1f} ms'
+)
+# Tags of the sockets requests are received from, prepended to their routes
+REQ_SOCKET = b'REQ'
+DEALER_SOCKET = b'DEALER'
+
+LoadedMaze = namedtuple('LoadedMaze', ['walls', 'solution', 'geometry'])
+
+
+def prepare_maze(fname):
+    """
+    Load a maze file, solve it and compute its template geometry.
+    """
+    walls = load_maze(fname)
+    return LoadedMaze(walls, solve(walls), maze_template(walls))
+
+
+def remote_map(frame) -> bool:
+    """
+    Whether a message is a shared memory request from another host.
+
+    Mapping a file makes the server open the given local path, so it is only
+    allowed to clients on the same host. Messages received through in-process
+    transports have no peer address and are always local, while peers with
+    an address that is not an IP address are always remote.
+    """
+    if frame.bytes[:1] != b'M':
+        return False
+    try:
+        address = frame.get('Peer-Address')
+    except zmq.ZMQError:
+        return False
+    try:
+        return not ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        return True
 
 
 class ZMQListener(QtCore.QObject):
 
-    message = QtCore.pyqtSignal(bytes)
-
-    def __init__(self, context, host, port):
+    wakeup = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        context,
+        host,
+        port,
+        queue,
+        router_port=None,
+        stream_port=None,
+        profiler=None,
+    ):
         super().__init__()
-
-        self.rep = context.socket(zmq.REP)
-        self.rep.bind('tcp://{host}:{port}'.format(host=host, port=port))
+        self.queue = queue
+        self.profiler = profiler
+        self.think = ThinkTimer()
+
+        # REQ clients are served by a ROUTER socket, instead of a REP socket,
+        # so that each of them is told apart by its identity
+        self.front = context.socket(zmq.ROUTER)
+        self.front.bind('tcp://{host}:{port}'.format(host=host, port=port))
         self.pull = context.socket(zmq.PULL)
         self.pull.bind('inproc://reply')
 
+        self.handlers = {
+            self.front: self.receive_routed_request,
+            self.pull: self.receive_reply,
+        }
+        self.tags = {self.front: REQ_SOCKET}
+        self.sockets = {REQ_SOCKET: self.front}
+
+        self.router = None
+        if router_port is not None:
+            self.router = context.socket(zmq.ROUTER)
+            self.router.bind(
+                'tcp://{host}:{port}'.format(host=host, port=router_port)
+            )
+            self.handlers[self.router] = self.receive_routed_request
+            self.tags[self.router] = DEALER_SOCKET
+            self.sockets[DEALER_SOCKET] = self.router
+
+        self.stream = None
+        if stream_port is not None:
+            self.stream = context.socket(zmq.PULL)
+            self.stream.setsockopt(zmq.RCVHWM, STREAM_HWM)
+            self.stream.bind(
+                'tcp://{host}:{port}'.format(host=host, port=stream_port)
+            )
+            self.handlers[self.stream] = self.receive_streamed_request
+
         self.poller = zmq.Poller()
-        self.poller.register(self.rep, zmq.POLLIN)
-        self.poller.register(self.pull, zmq.POLLIN)
+        for socket in self.handlers:
+            self.poller.register(socket, zmq.POLLIN)
 
         self.running = True
 
     def loop(self):
+        if self.profiler is not None:
+            self.profiler.sampler.name_thread('ZMQListener')
         while self.running:
             events = dict(self.poller.poll(10))
             if not events:
@@ -47,14 +169,67 @@ class ZMQListener(QtCore.QObject):
         for socket in events:
             if events[socket] != zmq.POLLIN:
                 continue
-            if socket == self.rep:
-                self.message.emit(socket.recv())
-            elif socket == self.pull:
-                self.rep.send(socket.recv())
+            self.handlers[socket](socket)
+
+    def enqueue(self, route, message, think_time=None):
+        """
+        Queue a message for the interface, waking it up if it was idle.
+        """
+        if self.queue.put(route, message, think_time=think_time):
+            self.wakeup.emit()
+
+    def receive_routed_request(self, socket):
+        """
+        Queue a request, routed with the tag of the socket it came from and
+        its envelope (the client identity followed by an empty delimiter for
+        REQ clients, or by the request sequence number for DEALER clients).
+        """
+        frames = socket.recv_multipart(copy=False)
+        if remote_map(frames[-1]):
+            socket.send_multipart(frames[:-1] + [b'error'])
+            return
+        route = [self.tags[socket]] + [frame.bytes for frame in frames[:-1]]
+        think_time = self.think.received(tuple(route[:2]))
+        self.enqueue(route, frames[-1].bytes, think_time)
+
+    def receive_streamed_request(self, socket):
+        frame = socket.recv(copy=False)
+        if not remote_map(frame):
+            self.enqueue(None, frame.bytes)
+
+    def receive_reply(self, socket):
+        """
+        Forward a reply from the interface, which is prefixed with the
+        request type, to track the client think time after wall readings.
+        """
+        frames = socket.recv_multipart()
+        self.send_reply(frames[1:])
+        if frames[0] == b'W':
+            self.think.replied_walls(tuple(frames[1:3]))
+
+    def send_reply(self, frames):
+        """
+        Send a reply back through the socket the request came from.
+
+        Replies are prefixed with the request route: the tag of the socket
+        and the request envelope.
+        """
+        self.sockets[frames[0]].send_multipart(frames[1:])
 
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self, host, port, path, parent=None):
+    def __init__(
+        self,
+        host,
+        port,
+        path,
+        router_port=None,
+        stream_port=None,
+        profiler=None,
+        queue_size=1000,
+        overflow='coalesce',
+        parent=None,
+    ):
         super().__init__(parent)
 
         self.path = path
@@ -63,11 +238,36 @@ class MainWindow(QtWidgets.QMainWindow):
             for fname in self.path.glob('**/*.txt')
             if fname.is_file()
         )
+        self.features = None
+        if (self.path / INDEX_FILE).is_file():
+            self.features = load_features(self.path / INDEX_FILE)
 
         self.setWindowTitle('Micromouse maze simulator')
         self.resize(800, 600)
 
-        self.history = []
+        self.session = Session()
+        self.solution = None
+        self.mazes = LRUCache(MAZE_CACHE_SIZE)
+        self.prefetching = {}
+        self.prefetcher = ThreadPoolExecutor(max_workers=1)
+
+        self.requests = {
+            b'ping': self.request_ping,
+            b'reset': self.request_reset,
+            b'goals': self.request_goals,
+            b'distances': self.request_distances,
+            b'length': self.request_length,
+            b'path': self.request_path,
+            b'show-path': self.request_show_path,
+            b'hide-path': self.request_hide_path,
+        }
+        self.prefixed_requests = {
+            b'W': self.request_walls,
+            b'S': self.request_state,
+            b'D': self.request_delta,
+            b'M': self.request_map,
+        }
+        self.shared = None
 
         self.status = QStatusBar()
         self.setStatusBar(self.status)
@@ -89,6 +289,25 @@ class MainWindow(QtWidgets.QMainWindow):
         self.slider.setPageStep(10)
         self.slider.setTickPosition(QSlider.TicksAbove)
         self.slider.valueChanged.connect(self.slider_value_changed)
+
+        self.heatmap = VisitHeatmap()
+        self.heatmap_check = QCheckBox('Heatmap')
+        self.heatmap_check.toggled.connect(self.update_heatmap)
+
+        self.timeline = PlotWidget()
+        self.timeline.setMaximumHeight(120)
+        self.timeline.setLabel('left', 'Think', units='s')
+        self.timeline.hideButtons()
+        self.think_curve = self.timeline.plot(pen=(255, 200, 0))
+        self.timeline_cursor = InfiniteLine(angle=90, pen=(255, 0, 0))
+        self.timeline.addItem(self.timeline_cursor)
+        self.think_time = None
+
+        self.summary = QLabel()
+        self.summary_timer = QtCore.QTimer()
+        self.summary_timer.setSingleShot(True)
+        self.summary_timer.setInterval(SUMMARY_INTERVAL)
+        self.summary_timer.timeout.connect(self.update_summary)
         self.reset()
 
         files_layout = QVBoxLayout()
@@ -101,6 +320,11 @@ class MainWindow(QtWidgets.QMainWindow):
         graphics_layout.setContentsMargins(0, 0, 0, 0)
         graphics_layout.addWidget(self.graphics)
         graphics_layout.addWidget(self.slider)
+        graphics_layout.addWidget(self.timeline)
+        summary_layout = QHBoxLayout()
+        summary_layout.addWidget(self.summary, stretch=1)
+        summary_layout.addWidget(self.heatmap_check)
+        graphics_layout.addLayout(summary_layout)
         graphics_widget = QWidget()
         graphics_widget.setLayout(graphics_layout)
         central_splitter = QSplitter()
@@ -120,89 +344,359 @@ class MainWindow(QtWidgets.QMainWindow):
         self.reply = self.context.socket(zmq.PUSH)
         self.reply.connect('inproc://reply')
 
+        self.ingress = IngressQueue(queue_size, policy=overflow)
         self.thread = QtCore.QThread()
-        self.zeromq_listener = ZMQListener(self.context, host=host, port=port)
+        self.zeromq_listener = ZMQListener(
+            self.context,
+            host=host,
+            port=port,
+            queue=self.ingress,
+            router_port=router_port,
+            stream_port=stream_port,
+            profiler=profiler,
+        )
         self.zeromq_listener.moveToThread(self.thread)
 
         self.thread.started.connect(self.zeromq_listener.loop)
-        self.zeromq_listener.message.connect(self.signal_received)
+        self.zeromq_listener.wakeup.connect(self.drain_ingress)
 
         QtCore.QTimer.singleShot(0, self.thread.start)
 
+        self.profiler = profiler
+        if profiler is not None:
+            self.start_profiling()
+
+    def start_profiling(self):
+        """
+        Sample the GUI thread and start the event-loop lag and memory timers.
+        """
+        self.profiler.sampler.name_thread('GUI', threading.get_ident())
+        self.lag_timer = QtCore.QTimer()
+        self.lag_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.lag_timer.setInterval(int(self.profiler.lag.interval * 1000))
+        self.lag_timer.timeout.connect(self.profiler.lag.tick)
+        self.lag_timer.start()
+        self.memory_timer = QtCore.QTimer()
+        self.memory_timer.setInterval(
+            int(self.profiler.memory_interval * 1000)
+        )
+        self.memory_timer.timeout.connect(self.snapshot_memory)
+        self.memory_timer.start()
+
+    def snapshot_memory(self):
+        history = self.session.history
+        self.profiler.memory.snapshot(len(history), history.array.nbytes)
+
     def filter_mazes(self, text):
-        keywords = text.lower().split(' ')
+        keywords = text.lower().split()
+        predicates = [key for key in keywords if is_predicate(key)]
+        keywords = [key for key in keywords if not is_predicate(key)]
+        selected = self.query_mazes(' '.join(predicates))
         self.files.clear()
         for fname in self.maze_files:
-            for key in keywords:
-                if key not in str(fname).lower():
-                    break
-            else:
+            if selected is not None and str(fname) not in selected:
+                continue
+            if all(key in str(fname).lower() for key in keywords):
                 self.files.addItem(str(fname))
         self.files.setCurrentRow(0)
 
+    def query_mazes(self, predicates):
+        """
+        Select the maze files matching the predicates in the features index.
+
+        Returns
+        -------
+            The set of matching maze files, or `None` if there are no
+            predicates to match.
+        """
+        if not predicates:
+            return None
+        if self.features is None:
+            self.status.showMessage('No features index (run `mmsim index`)')
+            return set()
+        try:
+            mask = query(self.features, predicates)
+        except ValueError as error:
+            self.status.showMessage(str(error))
+            return set()
+        return set(self.features['name'][mask])
+
     def list_value_changed(self, after, before):
         if not after:
             return
         self.set_maze(after.text())
 
     def set_maze(self, fname):
-        template_file = Path(fname)
-        template = load_maze(self.path / template_file)
-        self.maze.reset(template)
+        loaded = self.get_maze(fname)
+        self.maze.reset(loaded.walls, geometry=loaded.geometry)
+        self.session.maze = loaded.walls
+        self.solution = loaded.solution
         self.reset()
+        QtCore.QTimer.singleShot(0, self.prefetch_neighbors)
+
+    def get_maze(self, fname):
+        """
+        Get a loaded maze from the cache, waiting for it if it is being
+        prefetched, or loading it otherwise.
+        """
+        loaded = self.mazes.get(fname)
+        if loaded is not None:
+            return loaded
+        future = self.prefetching.pop(fname, None)
+        if future is not None:
+            return future.result()
+        loaded = prepare_maze(self.path / fname)
+        self.mazes.put(fname, loaded)
+        return loaded
+
+    def prefetch(self, fname):
+        loaded = prepare_maze(self.path / fname)
+        self.mazes.put(fname, loaded)
+        return loaded
+
+    def prefetch_neighbors(self):
+        """
+        Load the previous and next mazes in the list in the background.
+        """
+        self.prefetching = {
+            fname: future
+            for fname, future in self.prefetching.items()
+            if not future.done()
+        }
+        row = self.files.currentRow()
+        for item in (self.files.item(row + 1), self.files.item(row - 1)):
+            if item is None or row < 0:
+                continue
+            fname = item.text()
+            if fname in self.mazes or fname in self.prefetching:
+                continue
+            future = self.prefetcher.submit(self.prefetch, fname)
+            self.prefetching[fname] = future
 
     def reset(self):
-        self.history = []
+        self.session.reset()
+        self.heatmap.reset()
         self.slider.setValue(-1)
         self.slider.setRange(-1, -1)
         self.status.showMessage('Ready')
+        self.update_summary()
+
+    def update_summary(self):
+        goals = self.solution.goals if self.solution else None
+        result = summary(self.session.history.states, goals=goals)
+        if result['time_to_goal'] < 0:
+            result['time_to_goal'] = '-'
+        self.summary.setText(SUMMARY_FORMAT.format(**result))
+        self.update_timeline()
+
+    def update_timeline(self):
+        states = self.session.history.states
+        self.think_curve.setData(states['think_time'], connect='finite')
+        result = think_time_percentiles(states)
+        if not result['count']:
+            self.timeline.setTitle('Think time: -', size='8pt')
+            return
+        milliseconds = {key: value * 1000 for key, value in result.items()}
+        title = THINK_TIME_FORMAT.format(**milliseconds)
+        self.timeline.setTitle(title, size='8pt')
 
     def slider_update(self):
-        self.slider.setTickInterval(len(self.history) / 10)
-        self.slider.setRange(0, len(self.history) - 1)
+        self.heatmap.update(self.session.history.states)
+        self.slider.setTickInterval(len(self.session) // 10)
+        self.slider.setRange(0, len(self.session) - 1)
         self.status_set_slider(self.slider.value())
+        if not self.summary_timer.isActive():
+            self.summary_timer.start()
 
     def slider_value_changed(self, value):
         self.status_set_slider(value)
-        if not len(self.history):
+        if not len(self.session):
             return
-        state = self.history[value]
-        position = state[:3]
-        discovery = state[3:]
-        self.maze.update_position(position)
-        self.maze.update_discovery(discovery)
+        x, y, direction, distances, walls = self.session[value]
+        self.timeline_cursor.setValue(value)
+        self.maze.update_position(x, y, direction)
+        self.maze.update_discovery(distances, walls)
+        self.update_heatmap()
+
+    def update_heatmap(self):
+        value = self.slider.value()
+        if not self.heatmap_check.isChecked() or value < 0:
+            self.maze.update_heatmap(None, None)
+            return
+        self.maze.update_heatmap(*self.heatmap.at(value))
 
     def status_set_slider(self, value):
-        self.status.showMessage('{}/{}'.format(value, len(self.history) - 1))
-
-    def signal_received(self, message):
-        if message.startswith(b'W'):
-            walls = self.maze.read_position_walls(message.lstrip(b'W'))
-            self.reply.send(struct.pack('3B', *walls))
-            return
-        if message.startswith(b'S'):
-            message = message.lstrip(b'S')
-            self.history.append(message)
-            self.reply.send(b'ok')
-            self.slider_update()
-            return
-        if message == b'reset':
-            self.reset()
-            self.reply.send(b'ok')
-            return
-        if message == b'ping':
-            self.reply.send(b'pong')
+        self.status.showMessage('{}/{}'.format(value, len(self.session) - 1))
+
+    def drain_ingress(self):
+        """
+        Process a batch of queued messages, yielding to the event loop
+        before processing the next batch.
+        """
+        try:
+            for route, message, think_time in self.ingress.get(DRAIN_BATCH):
+                self.signal_received(route, message, think_time)
+        finally:
+            if len(self.ingress):
+                QtCore.QTimer.singleShot(0, self.drain_ingress)
+
+    def signal_received(self, route, message, think_time=None):
+        """
+        Process a message, replying with an `error` if it fails, so that the
+        client is never left waiting for the reply.
+        """
+        self.think_time = think_time
+        try:
+            reply = self.process_message(message)
+        except Exception as error:
+            self.status.showMessage('Error: {}'.format(error))
+            message, reply = b'', b'error'
+        if route is None:
             return
+        self.reply.send_multipart([message[:1]] + route + [reply])
+
+    def process_message(self, message):
+        if message in self.requests:
+            return self.requests[message]()
+        if message[:1] in self.prefixed_requests:
+            return self.prefixed_requests[message[:1]](message[1:])
         raise ValueError('Unknown message received! "{}"'.format(message))
 
+    def request_ping(self):
+        return b'pong'
+
+    def request_reset(self):
+        self.reset()
+        return b'ok'
+
+    def request_walls(self, position):
+        x, y, direction = struct.unpack('3B', position)
+        walls = self.session.read_walls(x, y, chr(direction))
+        return struct.pack('3B', *walls)
+
+    def request_state(self, state):
+        if is_mapped_state(state):
+            return self.request_mapped_state(state)
+        self.session.push_encoded_state(state)
+        self.state_received()
+        return b'ok'
+
+    def request_map(self, fname):
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+        try:
+            self.shared = SharedStates(Path(fname.decode()))
+        except (OSError, ValueError):
+            return b'error'
+        return b'ok'
+
+    def request_mapped_state(self, state):
+        if self.shared is None:
+            return b'error'
+        sequence = SEQUENCE.unpack_from(state, POSITION_SIZE + 1)[0]
+        try:
+            distances, walls = self.shared.read(sequence)
+        except ValueError:
+            return b'error'
+        x, y, direction = state[:POSITION_SIZE]
+        self.session.push_state(x, y, chr(direction), distances, walls)
+        self.state_received()
+        return b'ok'
+
+    def state_received(self):
+        """
+        Store the client think time of the last state and update the slider.
+        """
+        if self.think_time is not None:
+            self.session.history.states['think_time'][-1] = self.think_time
+        self.slider_update()
+
+    def request_delta(self, delta):
+        self.session.push_encoded_delta(delta)
+        self.state_received()
+        return b'ok'
+
+    def request_goals(self):
+        if self.solution is None:
+            return b''
+        return numpy.array(self.solution.goals, dtype='uint8').tobytes()
+
+    def request_distances(self):
+        if self.solution is None:
+            return b''
+        distances = self.solution.distances.clip(None, 254)
+        distances[distances == UNREACHABLE] = 255
+        return distances.astype('uint8').tobytes()
+
+    def request_length(self):
+        if self.solution is None or not len(self.solution.path):
+            return struct.pack('<H', 0xFFFF)
+        return struct.pack('<H', len(self.solution.path) - 1)
+
+    def request_path(self):
+        if self.solution is None:
+            return b''
+        return self.solution.path.astype('uint8').tobytes()
+
+    def request_show_path(self):
+        if self.solution is not None:
+            self.maze.update_path(self.solution.path)
+        return b'ok'
+
+    def request_hide_path(self):
+        self.maze.update_path(None)
+        return b'ok'
+
     def closeEvent(self, event):
         self.zeromq_listener.running = False
+        self.ingress.close()
+        self.prefetcher.shutdown(wait=False)
         self.thread.quit()
         self.thread.wait()
 
 
-def run(host, port, path):
+def run(
+    host,
+    port,
+    path,
+    router_port=None,
+    stream_port=None,
+    profile=None,
+    queue_size=1000,
+    overflow='coalesce',
+):
+    """
+    Run the simulator interface.
+
+    Received messages are queued, up to `queue_size`, before being processed
+    by the interface. See `mmsim.ingress` for the `overflow` policies.
+
+    If `profile` is given, the interface is profiled and, on exit, the report
+    and the folded stacks are written to `profile` with `.txt` and `.folded`
+    suffixes (see `mmsim.profiling`).
+    """
+    profiler = None
+    if profile is not None:
+        profiler = Profiler()
+        profiler.start()
     app = QtWidgets.QApplication(sys.argv)
-    main = MainWindow(host=host, port=port, path=path)
+    main = MainWindow(
+        host=host,
+        port=port,
+        path=path,
+        router_port=router_port,
+        stream_port=stream_port,
+        profiler=profiler,
+        queue_size=queue_size,
+        overflow=overflow,
+    )
     main.show()
-    sys.exit(app.exec_())
+    code = app.exec_()
+    if profiler is not None:
+        main.snapshot_memory()
+        for key, value in main.ingress.stats().items():
+            profiler.counters['ingress_' + key] = value
+        profiler.stop()
+        profiler.save(profile)
+    sys.exit(code)
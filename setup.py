@@ -1,9 +1,15 @@
 """
 Setup module.
 """
+import re
+from pathlib import Path
+
 from setuptools import setup
 
-from mmsim import __version__
+# Read the version without importing the package and its dependencies
+__version__ = re.search(
+    r"__version__ = '(.*)'", Path('mmsim/__init__.py').read_text()
+).group(1)
 
 setup(
     name='mmsim',
@@ -25,7 +31,7 @@ setup(
         'Programming Language :: Python :: Implementation :: CPython',
     ],
     keywords='micromouse maze server simulator',
-    entry_points={'console_scripts': ['mmsim = mmsim.commands:launch']},
+    entry_points={'console_scripts': ['mmsim = mmsim.commands:main']},
     packages=['mmsim'],
     install_requires=['click', 'numpy', 'pyqtgraph', 'pyqt5', 'pyzmq'],
     extras_require={